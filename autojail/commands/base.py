@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import ruamel.yaml
 from cleo import Command
@@ -8,14 +8,7 @@ from ..model.board import Board
 from ..model.config import AutojailConfig
 from ..model.jailhouse import JailhouseConfig
 from ..model.test import TestConfig
-
-automate_available = False
-try:
-    import automate
-
-    automate_available = True
-except ImportError:
-    automate_available = False
+from ..utils.model_cache import load_yaml_model
 
 
 class BaseCommand(Command):
@@ -48,10 +41,7 @@ class BaseCommand(Command):
             )
             return None
 
-        with config_path.open() as f:
-            yaml = ruamel.yaml.YAML()
-            cells_dict = yaml.load(f)
-            cells_info = JailhouseConfig(**cells_dict)
+        cells_info = load_yaml_model(config_path, JailhouseConfig)
 
         return cells_info
 
@@ -63,10 +53,7 @@ class BaseCommand(Command):
             self.line("Please run <comment>automate extract</comment> first")
             return None
 
-        with self.board_config_path.open() as f:
-            yaml = ruamel.yaml.YAML()
-            board_dict = yaml.load(f)
-            board_info = Board(**board_dict)
+        board_info = load_yaml_model(self.board_config_path, Board)
 
         return board_info
 
@@ -88,15 +75,36 @@ class BaseCommand(Command):
     def __init__(self) -> None:
         super().__init__()
 
-        self.autojail_config = None
+        # autojail.yml and the automate context are only loaded on first
+        # use, all commands are instantiated for every invocation
         self.config_path = Path.cwd() / self.CONFIG_NAME
-        if self.config_path.exists():
-            with self.config_path.open() as f:
-                yaml = ruamel.yaml.YAML()
-                config_dict = yaml.load(f)
-                self.autojail_config = AutojailConfig(**config_dict)
-
-        self.automate_context = None
-        if automate_available:
+        self._autojail_config: Optional[AutojailConfig] = None
+        self._autojail_config_loaded = False
+        self._automate_context: Any = None
+        self._automate_context_loaded = False
+
+    @property
+    def autojail_config(self) -> Optional[AutojailConfig]:
+        if not self._autojail_config_loaded:
+            self._autojail_config_loaded = True
+            if self.config_path.exists():
+                with self.config_path.open() as f:
+                    yaml = ruamel.yaml.YAML()
+                    config_dict = yaml.load(f)
+                    self._autojail_config = AutojailConfig(**config_dict)
+
+        return self._autojail_config
+
+    @property
+    def automate_context(self) -> Any:
+        if not self._automate_context_loaded:
+            self._automate_context_loaded = True
+            try:
+                import automate
+            except ImportError:
+                return None
+
             automate_config = automate.AutomateConfig()
-            self.automate_context = automate.AutomateContext(automate_config)
+            self._automate_context = automate.AutomateContext(automate_config)
+
+        return self._automate_context
@@ -1,17 +1,15 @@
 import logging
+from typing import TYPE_CHECKING
 
 from autojail.model.jailhouse import JailhouseConfig
 
-from ..config import (
-    InmateConfigArgs,
-    InmateConfigWizard,
-    RootConfigArgs,
-    RootConfigWizard,
-)
 from ..model.datatypes import ByteSize, IntegerList
 from ..utils.save_config import save_jailhouse_config
 from .base import BaseCommand
 
+if TYPE_CHECKING:
+    from ..config import InmateConfigArgs, RootConfigArgs
+
 
 class ConfigCommandBase(BaseCommand):
     def _save_jailhouse_config(self, config: JailhouseConfig):
@@ -30,7 +28,8 @@ class InitCommand(ConfigCommandBase):
         {--flags= : Jailhouse flags for root cell}
     """  # noqa
 
-    def _parse_args(self) -> RootConfigArgs:
+    def _parse_args(self) -> "RootConfigArgs":
+        from ..config import RootConfigArgs
 
         name = self.option("root-name")
         memory = self.option("root-memory")
@@ -57,6 +56,8 @@ class InitCommand(ConfigCommandBase):
         return args
 
     def handle(self) -> None:
+        from ..config import RootConfigWizard
+
         args = self._parse_args()
         if self.cells_config_path.exists() and not self.option("force"):
             self.line(
@@ -86,7 +87,9 @@ class AddCommand(ConfigCommandBase):
         {--C|cpus= : comma separated list of cpus for inmate}
     """  # noqa
 
-    def _parse_args(self):
+    def _parse_args(self) -> "InmateConfigArgs":
+        from ..config import InmateConfigArgs
+
         name = self.argument("name")
         type = self.option("type")
         memory = self.option("memory")
@@ -118,6 +121,8 @@ class AddCommand(ConfigCommandBase):
         return args
 
     def handle(self):
+        from ..config import InmateConfigWizard
+
         args = self._parse_args()
         board_info = self.load_board_info()
         if not board_info:
@@ -139,6 +144,8 @@ class RemoveCommand(ConfigCommandBase):
     """  # noqa
 
     def handle(self):
+        from ..config import InmateConfigWizard
+
         name = self.argument("name")
         board_info = self.load_board_info()
         if not board_info:
@@ -159,6 +166,8 @@ class ConfigCommand(ConfigCommandBase):
     commands = [InitCommand(), AddCommand(), RemoveCommand()]
 
     def handle(self) -> int:
+        from ..config import RootConfigArgs, RootConfigWizard
+
         # FIXME replace in v0.3 with:
         # return logging.warning("directly calling jailhouse config has been deprecated")
 
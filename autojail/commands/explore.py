@@ -1,20 +1,16 @@
+import math
+import os
 from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
-import numpy
-import ruamel.yaml
-
-try:
-    from hannah_optimizer.aging_evolution import AgingEvolution
-
-    hannah_optimizer_available = True
-except ImportError:
-    hannah_optimizer_available = False
-
-from ..config import JailhouseConfigurator
-from ..model import Board
-from ..model.parameters import GenerateParameters
+from ..model.parameters import GenerateConfig, GenerateParameters
 from .base import BaseCommand
 
+if TYPE_CHECKING:
+    from ..explore import CostModel, ExploreDatabase, Optimizer
+    from ..explore.build import BuildResult
+    from ..model import Board
+
 
 class ExploreCommand(BaseCommand):
     """Explore jailhouse configuration space to optimize configuration
@@ -22,17 +18,33 @@ class ExploreCommand(BaseCommand):
     explore
     {--skip-check : Do not statically check generated configs}
     {--p|print-after-all : print cell config after each transformation step}
+    {--steps=20 : number of explored configurations}
+    {--optimizer=evolution : search strategy, random or evolution}
+    {--population=10 : population size of the evolutionary search}
+    {--sample=3 : number of candidates competing for mutation in the evolutionary search}
+    {--metric=p99_latency : test metric to minimize}
+    {--test=cyclictest_all : test providing the metric, use all tests if empty}
+    {--reduce=max : reduction of the metric samples, min, mean, max or p99}
+    {--seed=1234 : seed of the random number generator}
+    {--j|jobs= : number of configurations built in parallel, defaults to the number of cpus}
+    {--restart : Discard the results of earlier explorations}
+    {--cost-model=linear : static cost model ranking the configurations}
+    {--prune=0 : fraction of each batch that is not tested on the board, the configurations with the highest predicted cost are pruned}
     """  # noqa
 
+    EXPLORE_DIR = "explore"
+    DATABASE_NAME = "results.yml"
+
     def handle(self) -> int:
-        if not hannah_optimizer_available:
-            self.line(
-                "<error>autojail explore currently depends on unreleased package hannah-tvm</error>"
-            )
-            self.line(
-                "Please contact christoph.gerum@uni-tuebingen.de if you want to use it."
-            )
-            return 1
+        import random
+
+        from ..explore import (
+            COST_MODELS,
+            OPTIMIZERS,
+            ExploreDatabase,
+            SearchSpace,
+        )
+        from ..explore.database import project_hash
 
         if not self.autojail_config:
             self.line(f"<error>could not find {self.CONFIG_NAME}</error>")
@@ -46,92 +58,353 @@ class ExploreCommand(BaseCommand):
             )
             return 1
 
-        board_yml_path = Path.cwd() / self.BOARD_CONFIG_NAME
-        if not board_yml_path.exists():
-            self.line(f"<error>{board_yml_path} could not be found</error>")
-            self.line("Please run <comment>automate extract</comment> first")
+        board_info = self.load_board_info()
+        if board_info is None:
             return 1
 
-        with board_yml_path.open() as f:
-            yaml = ruamel.yaml.YAML()
-            board_dict = yaml.load(f)
-            board_info = Board(**board_dict)
+        self.board_info: "Board" = board_info
 
-        self.board_info = board_info
+        optimizer_name = self.option("optimizer")
+        if optimizer_name not in OPTIMIZERS:
+            self.line(
+                f"<error>unknown optimizer {optimizer_name}, choose one of {', '.join(OPTIMIZERS)}</error>"
+            )
+            return 1
 
+        cost_model_name = self.option("cost-model")
+        if cost_model_name not in COST_MODELS:
+            self.line(
+                f"<error>unknown cost model {cost_model_name}, choose one of {', '.join(COST_MODELS)}</error>"
+            )
+            return 1
+        self.cost_model: "CostModel" = COST_MODELS[cost_model_name]()
+
+        self.prune = float(self.option("prune"))
+        if not 0.0 <= self.prune < 1.0:
+            self.line("<error>--prune must be in the range [0, 1)</error>")
+            return 1
+
+        database_path = Path.cwd() / self.EXPLORE_DIR / self.DATABASE_NAME
+        if self.option("restart") and database_path.exists():
+            database_path.unlink()
+        database = ExploreDatabase(
+            database_path,
+            project=project_hash(
+                self.config_path,
+                self.cells_yml_path,
+                self.board_config_path,
+                self.test_config_path,
+            ),
+        )
+
+        jobs = self.option("jobs")
+        self.jobs = int(jobs) if jobs else os.cpu_count() or 1
+
+        # The default configuration is built first, its passes
+        # also fill in the choices of the search space
         gen_params = GenerateParameters()
-        set_params = None
+        objective = self._evaluate(database, [None], gen_params)[0]
+        self.line(f"Default configuration: objective {objective}")
+
+        space = SearchSpace(gen_params)
+        if not space.dimensions:
+            self.line(
+                "<comment>Nothing to explore for this configuration</comment>"
+            )
+            return 0
 
-        step = 0
+        rng = random.Random(int(self.option("seed")))
+        if optimizer_name == "evolution":
+            optimizer = OPTIMIZERS[optimizer_name](
+                space,
+                rng,
+                population_size=int(self.option("population")),
+                sample_size=int(self.option("sample")),
+            )
+        else:
+            optimizer = OPTIMIZERS[optimizer_name](space, rng)
 
-        result = self._run_config(step, set_params, gen_params)
-        print(result)
+        # Resume from the configurations explored earlier
+        for entry in database.project_entries:
+            if entry.config is not None:
+                optimizer.tell(entry.config, entry.objective)
+        if optimizer.history:
+            self.line(
+                f"Resuming after {len(optimizer.history)} explored configurations"
+            )
 
-        optimizer = AgingEvolution(
-            10,
-            1,
-            0.1,
-            {"test", 0.5},
-            gen_params.dict(),
-            numpy.random.RandomState(1234),
-        )
-        for _step in range(1, 20):
-            set_params = optimizer.ask()
-            from devtools import debug
+        remaining = int(self.option("steps"))
+        while remaining > 0:
+            batch = [
+                optimizer.ask() for _num in range(min(self.jobs, remaining))
+            ]
+            remaining -= len(batch)
+
+            objectives = self._evaluate(database, batch)
+            for set_params, objective in zip(batch, objectives):
+                optimizer.tell(set_params, objective)
+                self.line(f"{set_params.dict()}: objective {objective}")
 
-            debug(set_params.flatten())
+        self._report(optimizer)
 
         return 0
 
-    def _run_config(self, step, set_params, gen_params):
-        board_info = self.board_info
-        cells_yml_path = self.cells_yml_path
-        build_dir = Path.cwd() / "explore" / str(step) / "build"
-        deploy_dir = Path.cwd() / "explore" / str(step) / "deploy"
+    def _evaluate(
+        self,
+        database: "ExploreDatabase",
+        batch: List[Optional[GenerateConfig]],
+        gen_params: Optional[GenerateParameters] = None,
+    ) -> List[float]:
+        """Objectives of a batch of configurations
 
-        build_dir.mkdir(exist_ok=True, parents=True)
-        deploy_dir.mkdir(exist_ok=True, parents=True)
+        Configurations found in the database are not evaluated again. The
+        others are built concurrently in a process pool, and deployed and
+        tested one after the other in the order their builds finish. With
+        pruning, the builds of the batch are ranked by the cost model, and
+        the worst are not tested.
+        If gen_params is given, the configurations are always built to fill
+        in the parameters.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
 
-        self.autojail_config.build_dir = str(build_dir)
-        self.autojail_config.deploy_dir = str(deploy_dir)
+        from ..explore.build import build_candidate
+        from ..explore.database import config_hash
+
+        assert self.autojail_config is not None
 
-        configurator = JailhouseConfigurator(
-            board_info,
-            self.autojail_config,
-            print_after_all=self.option("print-after-all"),
-            context=self.automate_context,
-            set_params=set_params,
-            gen_params=gen_params,
+        objectives: Dict[str, float] = {}
+        steps: Dict[str, int] = {}
+        pending: Dict[str, Optional[GenerateConfig]] = {}
+        next_step = database.next_step
+        for set_params in batch:
+            key = config_hash(set_params)
+            entry = database.entry(set_params)
+            if entry is not None:
+                objectives[key] = entry.objective
+                steps[key] = entry.step
+                if gen_params is None:
+                    continue
+            if key not in pending:
+                if key not in steps:
+                    steps[key] = next_step
+                    next_step += 1
+                pending[key] = set_params
+
+        if not pending:
+            return [objectives[config_hash(config)] for config in batch]
+
+        # Successful builds ranked by the cost model before testing
+        builds: Dict[str, "BuildResult"] = {}
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            futures = {
+                pool.submit(
+                    build_candidate,
+                    self.board_info,
+                    self.autojail_config,
+                    self.cells_yml_path,
+                    self._step_dir(steps[key]) / "build",
+                    self._step_dir(steps[key]) / "deploy",
+                    set_params=set_params,
+                    gen_params=gen_params,
+                    skip_check=self.option("skip-check"),
+                    print_after_all=self.option("print-after-all"),
+                ): key
+                for key, set_params in pending.items()
+            }
+
+            for future in as_completed(futures):
+                key = futures[future]
+                result = future.result()
+                if gen_params is not None and result.gen_params is not None:
+                    # The passes have filled in the parameters in the worker
+                    for name, value in result.gen_params:
+                        setattr(gen_params, name, value)
+
+                if key in objectives:
+                    continue
+
+                if self.prune and not result.ret:
+                    builds[key] = result
+                    continue
+
+                objectives[key] = self._measure(
+                    database, pending[key], steps[key], result
+                )
+
+        if builds:
+            self.cost_model.calibrate(database.measurements())
+            features = {key: self._features(steps[key]) for key in builds}
+            ranked = sorted(
+                builds, key=lambda key: self.cost_model.predict(features[key])
+            )
+            tested = len(ranked) - int(len(ranked) * self.prune)
+            for key in ranked[:tested]:
+                objectives[key] = self._measure(
+                    database, pending[key], steps[key], builds[key]
+                )
+            for key in ranked[tested:]:
+                predicted = self.cost_model.predict(features[key])
+                self.line(
+                    f"Step {steps[key]} pruned by the cost model, predicted {predicted}"
+                )
+                # Predictions are only used for ranking, a pruned configuration
+                # must not be selected without being measured
+                database.add(
+                    pending[key],
+                    math.inf,
+                    steps[key],
+                    features=features[key],
+                    pruned=True,
+                )
+                objectives[key] = math.inf
+
+        return [objectives[config_hash(config)] for config in batch]
+
+    def _features(self, step: int) -> Dict[str, float]:
+        from ..model import JailhouseConfig
+        from ..utils.model_cache import load_yaml_model
+
+        jailhouse_config = load_yaml_model(
+            self._step_dir(step) / "build" / "report" / "generated_cells.yml",
+            JailhouseConfig,
         )
-        configurator.read_cell_yml(str(cells_yml_path))
-        configurator.prepare()
-        ret = configurator.write_config(self.autojail_config.build_dir)
+        return self.cost_model.features(self.board_info, jailhouse_config)
+
+    def _measure(
+        self,
+        database: "ExploreDatabase",
+        set_params: Optional[GenerateConfig],
+        step: int,
+        build: "BuildResult",
+    ) -> float:
+        """Test a candidate on the board and store its objective"""
+        features = self._features(step) if not build.ret else {}
+        objective = self._run_config(step, build)
+        database.add(set_params, objective, step, features=features)
+        return objective
+
+    def _step_dir(self, step: int) -> Path:
+        return Path.cwd() / self.EXPLORE_DIR / str(step)
+
+    def _report(self, optimizer: "Optimizer") -> None:
+        import ruamel.yaml
+
+        from ..utils.report import Table
 
-        ret = configurator.build_config(
-            build_dir, skip_check=self.option("skip-check")
+        table = Table(headers=["Step", "Objective", "Parameters"])
+        for step, candidate in enumerate(optimizer.history, start=1):
+            table.append(
+                [
+                    str(step),
+                    str(candidate.objective),
+                    str(candidate.config.dict()),
+                ]
+            )
+        self.line(str(table))
+
+        best = optimizer.best
+        if best is None or math.isinf(best.objective):
+            self.line("<error>No feasible configuration has been found</error>")
+            return
+
+        best_path = Path.cwd() / self.EXPLORE_DIR / "set-params.yml"
+        with best_path.open("w") as f:
+            yaml = ruamel.yaml.YAML()
+            config = best.config.dict()
+            config["mem_io_merge_threshold"] = int(
+                config["mem_io_merge_threshold"]
+            )
+            yaml.dump(config, f)
+
+        self.line(
+            f"Best objective {best.objective}, parameters written to {best_path}"
+        )
+        self.line(
+            f"Use autojail generate --set-params {best_path} to apply them"
         )
 
-        ret = configurator.deploy(build_dir, deploy_dir,)
-        print(ret)
+    def _run_config(self, step: int, build: "BuildResult") -> float:
+        """Deploy and test a built configuration
+
+        Returns the objective, or inf if any of the steps failed
+        """
+        from ..config import JailhouseConfigurator
+        from ..explore import objective_value
+        from ..model import JailhouseConfig
+        from ..model.config import TargetBoard
+        from ..test import BoardPoolRunner, TestRunner
+        from ..utils.model_cache import load_yaml_model
+
+        assert self.autojail_config is not None
+
+        if build.ret:
+            if build.error:
+                self.line(f"<error>Step {step} failed: {build.error}</error>")
+            return math.inf
+
+        build_dir = self._step_dir(step) / "build"
+        deploy_dir = self._step_dir(step) / "deploy"
+        deploy_dir.mkdir(exist_ok=True, parents=True)
+
+        self.autojail_config.build_dir = str(build_dir)
+        self.autojail_config.deploy_dir = str(deploy_dir)
 
-        test_jailhouse_config = self.load_jailhouse_config(
-            Path("report/generated_cells.yml")
+        test_jailhouse_config = load_yaml_model(
+            build_dir / "report" / "generated_cells.yml", JailhouseConfig
         )
-        if not test_jailhouse_config:
-            return 1
+
+        try:
+            # make install runs in the shared jailhouse source tree,
+            # so deploys are not run in the build pool
+            configurator = JailhouseConfigurator(
+                self.board_info,
+                self.autojail_config,
+                context=self.automate_context,
+            )
+            configurator.config = test_jailhouse_config
+            if configurator.deploy(build_dir, deploy_dir):
+                return math.inf
+        except Exception as e:
+            self.line(f"<error>Step {step} failed: {e}</error>")
+            return math.inf
 
         test_config = self.load_test_config()
         if not test_config:
-            return 1
+            return math.inf
 
-        # automate_context = self.automate_context
+        # Only the test of the objective is run, the generated tests
+        # start the cells themselves
+        test = self.option("test") or None
+        select = [test] if test is not None else None
 
-        # runner = TestRunner(
-        #     self.autojail_config,
-        #     board_info,
-        #     test_jailhouse_config,
-        #     test_config,
-        #     automate_context,
-        # )
+        runner: Union[TestRunner, BoardPoolRunner]
+        if self.autojail_config.test_pool:
+            boards = [
+                TargetBoard(login=self.autojail_config.login)
+            ] + self.autojail_config.test_pool
+            runner = BoardPoolRunner(
+                self.autojail_config,
+                self.board_info,
+                test_jailhouse_config,
+                test_config,
+                self.automate_context,
+                boards,
+                select=select,
+            )
+        else:
+            runner = TestRunner(
+                self.autojail_config,
+                self.board_info,
+                test_jailhouse_config,
+                test_config,
+                self.automate_context,
+                select=select,
+            )
+        results = runner.run()
 
-        # runner.run()
+        return objective_value(
+            results,
+            self.option("metric"),
+            test=test,
+            reduce=self.option("reduce"),
+        )
@@ -2,15 +2,20 @@ import os
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from shutil import rmtree
-from typing import Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 import ruamel.yaml
-from fabric.connection import Connection
+from dataclasses import dataclass
 
-from ..extract import BoardInfoExtractor, ClockInfoExtractor
 from ..model import (
+    AutojailConfig,
+    AutojailLogin,
+    Board,
     ByteSize,
     ExpressionInt,
     HexInt,
@@ -18,21 +23,57 @@ from ..model import (
     JailhouseFlagList,
 )
 from ..utils import connect, start_board, stop_board, which
+from ..utils.connection import connection_pool, is_healthy
 from .base import BaseCommand
 
+if TYPE_CHECKING:
+    from fabric.connection import Connection
+
+    from ..extract import ClockInfoExtractor
+
+
+class BatchExtractTimeout(Exception):
+    pass
+
+
+@dataclass
+class BatchExtractJob:
+    """Extraction of one board in a batch extract"""
+
+    target: str
+    config: AutojailConfig
+    board_yml: Path
+    cwd: Optional[Path] = None
+    status: str = "pending"
+    message: str = ""
+    started: Optional[float] = None
+    duration: float = 0.0
+    connection: Any = None
+
+    def abort(self) -> None:
+        """Unblocks the worker thread of a timed out job"""
+        self.status = "timeout"
+        connection = self.connection
+        if connection is not None:
+            connection.close()
+
 
 class ExtractCommand(BaseCommand):
     """ Extracts hardware specific information from target board
 
     extract
+        {targets?* : project directories or login specs of boards to extract in parallel}
         {--b|base-folder= : base folder containing relevant /proc/ and /sys/ entries of target board}
         {--cwd= : current working directory to locate start files, if necessary}
+        {--j|jobs=4 : number of boards to extract concurrently}
+        {--timeout=900 : timeout in seconds for the extraction of each board}
     """
 
-    def handle(self) -> None:
+    STOP_TIMEOUT = 60
+
+    def handle(self) -> Optional[int]:
         base_folder = self.option("base-folder")
         tmp_folder = False
-        connection = None
 
         dtc_path = which("dtc")
         if dtc_path is None:
@@ -44,6 +85,9 @@ class ExtractCommand(BaseCommand):
             )
             sys.exit(-1)
 
+        if self.argument("targets"):
+            return self._handle_batch(self.argument("targets"))
+
         assert self.autojail_config is not None
         try:
             if not base_folder or not Path(base_folder).exists():
@@ -67,38 +111,233 @@ class ExtractCommand(BaseCommand):
             else:
                 self.line(f"Extracting target data from folder {base_folder}")
 
-            extractor = BoardInfoExtractor(
-                self.autojail_config.name,
-                self.autojail_config.board,
-                base_folder,
+            board_data = self._extract_board_info(
+                self.autojail_config, base_folder
+            )
+            self._write_board_info(
+                board_data, Path.cwd() / self.BOARD_CONFIG_NAME
             )
-            board_data = extractor.extract()
-
-            with (Path.cwd() / self.BOARD_CONFIG_NAME).open("w") as f:
-                yaml = ruamel.yaml.YAML()
-                yaml.register_class(HexInt)
-                yaml.register_class(ByteSize)
-                yaml.register_class(IntegerList)
-                yaml.register_class(JailhouseFlagList)
-                yaml.register_class(ExpressionInt)
-                yaml.dump(board_data.dict(), f)
         finally:
-            if connection:
-                connection.close()
-
             if tmp_folder:
                 rmtree(base_folder, ignore_errors=True)
 
+        return None
+
+    def _extract_board_info(
+        self, config: AutojailConfig, base_folder: Union[str, Path]
+    ) -> Board:
+        from ..extract import BoardInfoExtractor
+
+        extractor = BoardInfoExtractor(config.name, config.board, base_folder)
+        return extractor.extract()
+
+    def _write_board_info(self, board_data: Board, board_yml: Path) -> None:
+        with board_yml.open("w") as f:
+            yaml = ruamel.yaml.YAML()
+            yaml.register_class(HexInt)
+            yaml.register_class(ByteSize)
+            yaml.register_class(IntegerList)
+            yaml.register_class(JailhouseFlagList)
+            yaml.register_class(ExpressionInt)
+            yaml.dump(board_data.dict(), f)
+
+    def _batch_jobs(self, targets: List[str]) -> List[BatchExtractJob]:
+        """Create extraction jobs for project directories and login specs
+
+        Project directories are extracted with their own autojail.yml into
+        their board.yml. Login specs use the autojail.yml of the current
+        project with the login replaced, and are written to
+        boards/<host>/board.yml. The start and stop commands of the current
+        project are not run for them.
+        """
+        jobs = []
+        for target in targets:
+            project_dir = Path(target)
+            if project_dir.is_dir():
+                project_dir = project_dir.absolute()
+                config_path = project_dir / self.CONFIG_NAME
+                with config_path.open() as f:
+                    yaml = ruamel.yaml.YAML()
+                    config = AutojailConfig(**yaml.load(f))
+                kernel_dir = project_dir / config.kernel_dir
+                config = config.copy(update={"kernel_dir": str(kernel_dir)})
+                jobs.append(
+                    BatchExtractJob(
+                        target,
+                        config,
+                        project_dir / self.BOARD_CONFIG_NAME,
+                        cwd=project_dir,
+                    )
+                )
+            else:
+                if self.autojail_config is None:
+                    raise Exception(
+                        f"Login spec {target} needs {self.CONFIG_NAME} in the current directory"
+                    )
+                login = AutojailLogin.validate(target)
+                config = self.autojail_config.copy(
+                    update={
+                        "login": login,
+                        "start_command": [],
+                        "stop_command": [],
+                    }
+                )
+                board_dir = Path.cwd() / "boards" / login.host
+                board_dir.mkdir(exist_ok=True, parents=True)
+                jobs.append(
+                    BatchExtractJob(
+                        target, config, board_dir / self.BOARD_CONFIG_NAME
+                    )
+                )
+
+        return jobs
+
+    def _handle_batch(self, targets: List[str]) -> int:
+        from ..extract import ClockInfoExtractor
+
+        jobs = self._batch_jobs(targets)
+        max_workers = int(self.option("jobs"))
+        timeout = float(self.option("timeout"))
+
+        # The clock extraction module is built once per target kernel
+        module_root = Path(tempfile.mkdtemp(prefix="aj-extract-modules"))
+        clock_info_extractors: Dict[
+            Tuple[str, str, str], Tuple[ClockInfoExtractor, threading.Lock]
+        ] = {}
+        for job in jobs:
+            key = ClockInfoExtractor.kernel_key(job.config)
+            if key not in clock_info_extractors:
+                module_dir = module_root / str(len(clock_info_extractors))
+                clock_info_extractors[key] = (
+                    ClockInfoExtractor(job.config, module_dir),
+                    threading.Lock(),
+                )
+
+        def run_job(job: BatchExtractJob) -> None:
+            job.started = time.monotonic()
+            job.status = "running"
+            try:
+                extractor, lock = clock_info_extractors[
+                    ClockInfoExtractor.kernel_key(job.config)
+                ]
+                with lock:
+                    extractor.prepare()
+                self._extract_job(job, extractor, timeout)
+                if job.status == "running":
+                    job.status = "ok"
+            except Exception as e:
+                if job.status == "running":
+                    job.status = "failed"
+                    job.message = str(e)
+            finally:
+                job.duration = time.monotonic() - job.started
+
+        # Create the automate context before the workers share it
+        self.automate_context
+
+        self.line(f"Extracting {len(jobs)} boards with {max_workers} workers")
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(run_job, job): job for job in jobs}
+                pending = set(futures)
+                while pending:
+                    _done, pending = wait(
+                        pending, timeout=1.0, return_when=FIRST_COMPLETED
+                    )
+                    now = time.monotonic()
+                    for future in pending:
+                        job = futures[future]
+                        if (
+                            job.status == "running"
+                            and job.started is not None
+                            and now - job.started > timeout
+                        ):
+                            job.message = f"no result after {timeout:.0f}s"
+                            job.abort()
+        finally:
+            rmtree(module_root, ignore_errors=True)
+
+        from ..utils.report import Table
+
+        summary = Table(
+            headers=["Target", "Board", "Status", "Time", "Message"]
+        )
+        for job in jobs:
+            summary.append(
+                [
+                    job.target,
+                    str(job.board_yml),
+                    job.status,
+                    f"{job.duration:.1f}s",
+                    job.message,
+                ]
+            )
+        self.line("")
+        self.line(str(summary))
+
+        failed = [job for job in jobs if job.status != "ok"]
+        return 1 if failed else 0
+
+    def _extract_job(
+        self,
+        job: BatchExtractJob,
+        clock_info_extractor: "ClockInfoExtractor",
+        timeout: float,
+    ) -> None:
+        def remaining() -> float:
+            assert job.started is not None
+            left = timeout - (time.monotonic() - job.started)
+            if left <= 0 or job.status == "timeout":
+                raise BatchExtractTimeout(job.target)
+            return left
+
+        base_folder = tempfile.mkdtemp(prefix="aj-extract")
+        try:
+            start_board(job.config, job.cwd, timeout=remaining())
+            try:
+                remaining()
+                job.connection = connect(
+                    job.config, self.automate_context, passwd_retries=0
+                )
+                if not is_healthy(job.connection):
+                    raise Exception(f"Could not connect to {job.config.login}")
+                self._sync(
+                    job.connection,
+                    base_folder,
+                    job.config,
+                    clock_info_extractor,
+                )
+            finally:
+                # Boards are stopped even after a timeout
+                stop_board(job.config, job.cwd, timeout=self.STOP_TIMEOUT)
+
+            remaining()
+            board_data = self._extract_board_info(job.config, base_folder)
+            remaining()
+            self._write_board_info(board_data, job.board_yml)
+        finally:
+            connection_pool.close(job.config.login)
+            rmtree(base_folder, ignore_errors=True)
+
     def _sync(
-        self, connection: Connection, base_folder: Union[str, Path]
+        self,
+        connection: "Connection",
+        base_folder: Union[str, Path],
+        config: Optional[AutojailConfig] = None,
+        clock_info_extractor: Optional["ClockInfoExtractor"] = None,
     ) -> None:
-        assert self.autojail_config
+        from ..extract import ClockInfoExtractor
+
+        if config is None:
+            config = self.autojail_config
+        assert config
 
         base_folder = Path(base_folder)
         if not base_folder.exists():
             base_folder.mkdir(exist_ok=True, parents=True)
 
-        clock_info_extractor = ClockInfoExtractor(self.autojail_config)
+        if clock_info_extractor is None:
+            clock_info_extractor = ClockInfoExtractor(config)
         clock_info_extractor.prepare()
         clock_info_extractor.start(connection)
         try:
@@ -160,4 +399,6 @@ class ExtractCommand(BaseCommand):
         "/proc/cpuinfo",
         "/proc/cmdline",
         "/proc/ioports",
+        "/proc/interrupts",
+        "/proc/uptime",
     ]
@@ -2,8 +2,6 @@ from pathlib import Path
 
 import ruamel.yaml
 
-from ..config import JailhouseConfigurator
-from ..model import Board
 from ..model.parameters import (
     GenerateConfig,
     GenerateParameters,
@@ -26,6 +24,8 @@ class GenerateCommand(BaseCommand):
     """
 
     def handle(self) -> int:
+        from ..config import JailhouseConfigurator
+
         if not self.autojail_config:
             self.line(f"<error>could not find {self.CONFIG_NAME}</error>")
             return 1
@@ -36,17 +36,10 @@ class GenerateCommand(BaseCommand):
             self.line(f"<error>{cells_yml_path} could not be found</error>")
             return 1
 
-        board_yml_path = Path.cwd() / self.BOARD_CONFIG_NAME
-        if not board_yml_path.exists():
-            self.line(f"<error>{board_yml_path} could not be found</error>")
-            self.line("Please run <comment>automate extract</comment> first")
+        board_info = self.load_board_info()
+        if board_info is None:
             return 1
 
-        with board_yml_path.open() as f:
-            yaml = ruamel.yaml.YAML()
-            board_dict = yaml.load(f)
-            board_info = Board(**board_dict)
-
         set_params = None
         if self.option("set-params"):
             params_yml_path = self.option("set-params")
@@ -1,16 +1,37 @@
 from pathlib import Path
+from typing import TYPE_CHECKING, Union
 
-from ..test import TestRunner
 from .base import BaseCommand
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from ..test.results import RunInfo
+
 
 class TestCommand(BaseCommand):
     """ Run tests to verify generated jailhouse configuration
 
     test
+        {--batch : Run all tests in a single session on the target}
+        {--timeout= : Upper limit for the run time of all tests in seconds}
+        {--compare : Compare the metrics against the stored results of earlier runs on the same board}
+        {--baseline= : Restrict the compared runs to a git revision, config hash or run id}
+        {--metrics=.*latency : Regular expression selecting the compared metrics}
     """
 
+    RESULTS_PATH = Path("test_results") / "metrics.csv"
+
     def handle(self) -> int:
+        from ..model import TargetBoard
+        from ..test import BoardPoolRunner, TestRunner
+        from ..test.results import (
+            ResultStore,
+            RunInfo,
+            config_hash,
+            git_revision,
+        )
+
         board_info = self.load_board_info()
         if not board_info:
             return 1
@@ -31,14 +52,124 @@ class TestCommand(BaseCommand):
 
         automate_context = self.automate_context
 
-        runner = TestRunner(
-            autojail_config,
-            board_info,
-            jailhouse_config,
-            test_config,
-            automate_context,
+        timeout = self.option("timeout")
+        runner: Union[TestRunner, BoardPoolRunner]
+        if autojail_config.test_pool:
+            if self.option("batch"):
+                self.line(
+                    "<comment>Batch mode is not supported on a test pool, running tests individually</comment>"
+                )
+            boards = [
+                TargetBoard(login=autojail_config.login)
+            ] + autojail_config.test_pool
+            runner = BoardPoolRunner(
+                autojail_config,
+                board_info,
+                jailhouse_config,
+                test_config,
+                automate_context,
+                boards,
+                timeout=float(timeout) if timeout else None,
+            )
+        else:
+            runner = TestRunner(
+                autojail_config,
+                board_info,
+                jailhouse_config,
+                test_config,
+                automate_context,
+                batch=self.option("batch"),
+                timeout=float(timeout) if timeout else None,
+            )
+
+        results = runner.run()
+
+        store = ResultStore(Path(autojail_config.build_dir) / self.RESULTS_PATH)
+        history = store.load()
+        info = RunInfo(
+            board=autojail_config.board,
+            config_hash=config_hash(jailhouse_config),
+            revision=git_revision(),
+        )
+        current = store.append(info, results)
+
+        if self.option("compare"):
+            return self._compare(info, current, history)
+
+        return 0
+
+    def _compare(
+        self, info: "RunInfo", current: "pd.DataFrame", history: "pd.DataFrame"
+    ) -> int:
+        from ..test.results import compare, summarize
+        from ..utils.report import Table
+
+        baseline = history[history["board"] == info.board]
+        selector = self.option("baseline")
+        if selector:
+            baseline = baseline[
+                (baseline["revision"] == selector)
+                | (baseline["config_hash"] == selector)
+                | (baseline["run"] == selector)
+            ]
+
+        summary = Table(
+            headers=["Test", "Metric", "Count", "Min", "Avg", "Max", "p99"]
         )
+        for row in summarize(current).itertuples(index=False):
+            summary.append(
+                [
+                    row.test,
+                    row.metric,
+                    str(row.count),
+                    f"{row.min:.2f}",
+                    f"{row.avg:.2f}",
+                    f"{row.max:.2f}",
+                    f"{row.p99:.2f}",
+                ]
+            )
+        self.line(str(summary))
 
-        runner.run()
+        if baseline.empty:
+            self.line(
+                "<comment>No baseline results to compare against</comment>"
+            )
+            return 0
+
+        comparisons = compare(current, baseline, metrics=self.option("metrics"))
+        table = Table(
+            headers=[
+                "Test",
+                "Metric",
+                "Baseline avg",
+                "Avg",
+                "Baseline p99",
+                "p99",
+                "p-value",
+                "Status",
+            ]
+        )
+        for comparison in comparisons:
+            table.append(
+                [
+                    comparison.test,
+                    comparison.metric,
+                    f"{comparison.baseline_avg:.2f}",
+                    f"{comparison.current_avg:.2f}",
+                    f"{comparison.baseline_p99:.2f}",
+                    f"{comparison.current_p99:.2f}",
+                    f"{comparison.p_value:.4f}",
+                    "REGRESSION" if comparison.regression else "ok",
+                ]
+            )
+        self.line("")
+        self.line(str(table))
+
+        regressions = [c for c in comparisons if c.regression]
+        if regressions:
+            self.line(
+                f"<error>Found {len(regressions)} latency regressions</error>"
+            )
+            return 1
 
         return 0
@@ -6,8 +6,6 @@ import sys
 from pathlib import Path
 from typing import List, Optional, Union
 
-import ruamel.yaml
-
 from .. import utils
 from ..model import (
     AutojailConfig,
@@ -20,17 +18,20 @@ from ..model import (
     ShMemNetRegion,
 )
 from ..model.parameters import GenerateConfig, GenerateParameters
+from ..utils.model_cache import load_yaml_model
 from ..utils.report import Report, Section, Table
 from ..utils.save_config import save_jailhouse_config
 from .board_info import TransferBoardInfoPass
 from .cpu import CPUAllocatorPass
 from .devices import LowerDevicesPass
 from .devicetree import GenerateDeviceTreePass
-from .irq import PrepareIRQChipsPass
+from .irq import PlanIRQsPass, PrepareIRQChipsPass, cpu_cells, interrupt_load
 from .memory import (
     AllocateMemoryPass,
     MergeIoRegionsPass,
     PrepareMemoryRegionsPass,
+    dram_bank_usage,
+    format_ranges,
 )
 from .network import NetworkConfigPass
 from .root_shared import InferRootSharedPass
@@ -65,6 +66,7 @@ class JailhouseConfigurator:
             MergeIoRegionsPass(self.set_params, self.gen_params),
             AllocateMemoryPass(),
             CPUAllocatorPass(self.set_params, self.gen_params),
+            PlanIRQsPass(),
             ConfigSHMemRegionsPass(),
             InferRootSharedPass(),
             GenerateDeviceTreePass(self.autojail_config),
@@ -478,6 +480,20 @@ class JailhouseConfigurator:
                     + str(cell.platform_info.pci_domain)
                     + ","
                 )
+                if cell.platform_info.color_way_size:
+                    f.write("\n\t\t.color = {")
+                    f.write(
+                        "\n\t\t\t.way_size = "
+                        + hex(cell.platform_info.color_way_size)
+                        + ","
+                    )
+                    if cell.platform_info.color_root_map_offset:
+                        f.write(
+                            "\n\t\t\t.root_map_offset = "
+                            + hex(cell.platform_info.color_root_map_offset)
+                            + ","
+                        )
+                    f.write("\n\t\t},")
                 f.write("\n\t\t.arm = {")
                 arm_values = cell.platform_info.arch
 
@@ -580,6 +596,8 @@ class JailhouseConfigurator:
                     f.write(
                         "\n\t\t.flags = " + str(s.join(jailhouse_flags)) + ","
                     )
+                    if v.colors is not None:
+                        f.write("\n\t\t.colors = " + hex(v.colors) + ",")
                     f.write("\n\t},\n")
 
                 if isinstance(v, GroupedMemoryRegion):
@@ -588,10 +606,14 @@ class JailhouseConfigurator:
                 elif isinstance(v, MemoryRegionData):
                     write_mem_region(v)
                 elif isinstance(v, ShMemNetRegion):
-                    f.write(f"\t/* {k} */\n")
-                    f.write(
-                        f"\tJAILHOUSE_SHMEM_NET_REGIONS(0x{v.start_addr:x}, {v.device_id}),\n"
-                    )
+                    if v.output_size is None:
+                        f.write(f"\t/* {k} */\n")
+                        f.write(
+                            f"\tJAILHOUSE_SHMEM_NET_REGIONS(0x{v.start_addr:x}, {v.device_id}),\n"
+                        )
+                    else:
+                        for region in v.regions():
+                            write_mem_region(region)
 
             f.write("\t},")
             f.write("\n\t.irqchips = {")
@@ -667,17 +689,25 @@ class JailhouseConfigurator:
 
     def read_cell_yml(self, cells_yml: str) -> None:
         self.logger.info("Reading cell configuration %s", str(cells_yml))
-        with open(cells_yml, "r") as stream:
-            yaml = ruamel.yaml.YAML()
-            yaml_info = yaml.load(stream)
-            config = JailhouseConfig(**yaml_info)
-            self.config = config
+        self.config = load_yaml_model(Path(cells_yml), JailhouseConfig)
+
+    @staticmethod
+    def _format_colors(colors: int) -> str:
+        """Color ranges of a color bitmap, e.g. 0-3 (0xf)"""
+        bits = [bit for bit in range(colors.bit_length()) if colors >> bit & 1]
+        return f"{format_ranges(bits)} ({hex(colors)})"
 
     def report(self, show=True):
         self.logger.info("Generating reports")
 
         report = Report("Jailhouse Config")
 
+        bank_usage = {}
+        if self.board.dram_mapping and any(
+            cell.dram_banks for cell in self.config.cells.values()
+        ):
+            bank_usage = dram_bank_usage(self.board, self.config)
+
         for cell_id, cell in self.config.cells.items():
             cell_section = Section(cell.name)
             report.add(cell_section)
@@ -688,6 +718,34 @@ class JailhouseConfigurator:
             cell_info_table.append(
                 ["CPUs", ", ".join((str(c) for c in cell.cpus))]
             )
+            colors = {
+                region.colors
+                for region in cell.memory_regions.values()
+                if isinstance(region, MemoryRegionData)
+                and region.colors is not None
+            }
+            if colors:
+                cell_info_table.append(
+                    [
+                        "Cache Colors",
+                        ", ".join(self._format_colors(c) for c in colors),
+                    ]
+                )
+            if cell.dram_banks and cell_id in bank_usage:
+                banks = bank_usage[cell_id]
+                shared_with = [
+                    other.name
+                    for other_id, other in self.config.cells.items()
+                    if other_id != cell_id and banks & bank_usage[other_id]
+                ]
+                isolation = (
+                    f"shared with {', '.join(shared_with)}"
+                    if shared_with
+                    else "isolated"
+                )
+                cell_info_table.append(
+                    ["DRAM Banks", f"{format_ranges(banks)} ({isolation})"]
+                )
             cell_section.add(cell_info_table)
 
             if cell.pci_devices:
@@ -807,6 +865,19 @@ class JailhouseConfigurator:
                 )
             memory_section.add(memory_table)
 
+        if self.board.interrupt_stats:
+            load_section = Section("Interrupt Load")
+            report.add(load_section)
+            load_table = Table(["CPU", "Cell", "Interrupts/s"])
+            owners = cpu_cells(self.config)
+            for cpu, rate in sorted(
+                interrupt_load(self.board, self.config).items()
+            ):
+                load_table.append(
+                    [str(cpu), owners.get(cpu, "-"), f"{rate:.1f}"]
+                )
+            load_section.add(load_table)
+
         # Save report
         build_path = Path(self.autojail_config.build_dir) / "report"
         build_path.mkdir(parents=True, exist_ok=True)
@@ -1,9 +1,23 @@
-from typing import Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
 
+from ..model import Board
 from ..model.parameters import GenerateConfig, GenerateParameters, Partitions
 from .passes import BasePass
 
 
+def cache_domains(board: Board) -> Dict[Optional[str], List[int]]:
+    """CPUs grouped by their next level cache, or cluster if unknown
+
+    CPUs without any topology information are grouped under None.
+    """
+    domains: Dict[Optional[str], List[int]] = OrderedDict()
+    for cpu in sorted(board.cpuinfo.values(), key=lambda cpu: cpu.num):
+        domain = cpu.next_level_cache or cpu.cluster
+        domains.setdefault(domain, []).append(cpu.num)
+    return domains
+
+
 class CPUAllocatorPass(BasePass):
     def __init__(
         self,
@@ -33,7 +47,7 @@ class CPUAllocatorPass(BasePass):
                 if not cell_cpus:
                     no_cpus_total += 1
 
-                reserved_cpus.update(cell.cpus)
+                reserved_cpus.update(cell.cpus or [])
 
         if self.gen_params and no_cpus_total > 0:
             avail_cpus = {i for i in range(len(board.cpuinfo))} - reserved_cpus
@@ -49,6 +63,21 @@ class CPUAllocatorPass(BasePass):
 
             self.gen_params.cpu_allocation = partitions
 
+        if not self.set_parameters:
+            # Placement policies are applied in order of their constraints,
+            # isolated cells need complete clusters
+            for placement in ("isolated", "packed"):
+                for cell in config.cells.values():
+                    if (
+                        cell.type != "root"
+                        and not cell.cpus
+                        and cell.cpu_placement == placement
+                    ):
+                        cell.cpus = self._place(
+                            board, config, cell, reserved_cpus
+                        )
+                        reserved_cpus.update(cell.cpus)
+
         no_cpus_index = 0
         for cell in config.cells.values():
             if not cell.cpus:
@@ -78,3 +107,66 @@ class CPUAllocatorPass(BasePass):
                 assert len(cell.cpus) > 0
 
         return board, config
+
+    def _place(self, board, config, cell, reserved_cpus: Set[int]) -> List[int]:
+        """CPUs of a cell according to its cpu_placement
+
+        The lowest free CPU stays with the root cell. Falls back to the
+        lowest free CPU if the topology does not allow the placement.
+        """
+        domains = cache_domains(board)
+        free_cpus = sorted(
+            {cpu.num for cpu in board.cpuinfo.values()} - reserved_cpus
+        )
+        if len(free_cpus) < 2:
+            raise Exception(
+                f"Not enough free CPUs to place cell {cell.name} next to the root cell"
+            )
+        root_cpu = free_cpus[0]
+
+        # Domains of the cpus assigned to other guest cells
+        guest_domains: Dict[Optional[str], Set[str]] = {}
+        for other in config.cells.values():
+            if other.type == "root" or not other.cpus:
+                continue
+            for domain, cpus in domains.items():
+                if set(cpus) & set(other.cpus):
+                    guest_domains.setdefault(domain, set()).add(
+                        other.cpu_placement
+                    )
+
+        if cell.cpu_placement == "isolated":
+            for domain, cpus in domains.items():
+                if domain is None or root_cpu in cpus:
+                    continue
+                if set(cpus) & reserved_cpus:
+                    continue
+                self.logger.info(
+                    "Placing cell %s on cpus %s sharing %s",
+                    cell.name,
+                    ",".join(str(cpu) for cpu in cpus),
+                    domain,
+                )
+                return list(cpus)
+
+            self.logger.warning(
+                "Could not find a cluster that is not shared with other cells for cell %s",
+                cell.name,
+            )
+        else:
+            # Prefer clusters of packed cells, then the cluster of the root cell
+            def preference(cpu: int) -> int:
+                for domain, cpus in domains.items():
+                    if domain is None or cpu not in cpus:
+                        continue
+                    if "isolated" in guest_domains.get(domain, set()):
+                        return 3
+                    if "packed" in guest_domains.get(domain, set()):
+                        return 0
+                    if root_cpu in cpus:
+                        return 1
+                return 2
+
+            return [min(free_cpus[1:], key=lambda cpu: (preference(cpu), cpu))]
+
+        return [free_cpus[1]]
@@ -27,12 +27,7 @@ class LowerDevicesPass(BasePass):
     def _find_device(
         self, board: Board, name: str
     ) -> Tuple[Optional[str], Optional[DeviceMemoryRegion]]:
-        for device_name, device in board.memory_regions.items():
-            if isinstance(device, DeviceMemoryRegion):
-                if name in device.aliases or device.path == name:
-                    return device_name, device
-
-        return None, None
+        return board.index.mapped_device(name)
 
     def _lower_console(self, board: Board, config: JailhouseConfig) -> None:
         for cell in config.cells.values():
@@ -196,6 +196,7 @@ class GenerateDeviceTreePass(BasePass):
 
     def __init__(self, config: AutojailConfig):
         self.autojail_config = config
+        self._clock_paths: Dict[Tuple[int, int], List[Tuple[str, ...]]] = {}
         super(GenerateDeviceTreePass, self).__init__()
 
     def _prepare_device_regions(self, memory_regions):
@@ -215,81 +216,94 @@ class GenerateDeviceTreePass(BasePass):
 
     def _find_timer(self):
         timer_compatibles = ["arm,armv8-timer", "arm,armv7-timer"]
-        for device in self.board.devices.values():
-            for compatible in timer_compatibles:
-                if compatible in device.compatible:
-                    return device
+        timer = self.board.index.first_compatible(timer_compatibles)
+        if timer is None:
+            return None
 
-        return None
+        _, device = timer
+        return device
 
-    def _build_clock_dict(self):
-        clocks = {}
-        worklist = list(self.board.clock_tree.items())
-        while worklist:
-            path, clock = worklist.pop()
-            clocks[path] = clock
+    def _find_clock_parent(self, handle):
+        return self.board.index.by_phandle(handle)
 
-            for name, derived_clock in clock.derived_clocks.items():
-                worklist.append((name, derived_clock))
+    def _clock_output_paths(
+        self, handle: int, clock_num: int
+    ) -> List[Tuple[str, ...]]:
+        """Clock paths of output clock_num of the clock provider with phandle handle
 
-        return clocks
+        The same providers are referenced by most devices of all cells,
+        so the results are cached for the current board.
+        """
+        key = (handle, clock_num)
+        if key in self._clock_paths:
+            return self._clock_paths[key]
+
+        # Break reference cycles in malformed device trees
+        self._clock_paths[key] = []
+
+        paths: List[Tuple[str, ...]] = []
+        found = self._find_clock_parent(handle)
+        if found is None:
+            self.logger.warning(
+                "Could not find clock provider with phandle %d", handle
+            )
+        else:
+            _parent_name, parent = found
+            if parent.clock_output_names:
+                if clock_num < len(parent.clock_output_names):
+                    paths = [(parent.clock_output_names[clock_num],)]
+            else:
+                paths = self._extract_clock_paths(parent)
 
-    def _find_clock_parent(self, handle):
-        # print("Searching for parent", handle)
-        for name, device in self.board.devices.items():
-            if device.phandle == handle:
-                # print("Found parent", name, "handle is", handle)
-                return name, device
+        self._clock_paths[key] = paths
+        return paths
 
-    def _extract_clock_paths(self, device):
+    def _extract_clock_paths(self, device) -> List[Tuple[str, ...]]:
         device_clocks = list(reversed(device.clocks))
         paths = []
 
-        # print("Device clocks: ", ",".join(device_clocks))
         while device_clocks:
             clock_parent_handle = int(device_clocks.pop())
-            parent_name, parent = self._find_clock_parent(clock_parent_handle)
+            found = self._find_clock_parent(clock_parent_handle)
+            if found is None:
+                self.logger.warning(
+                    "Could not find clock provider with phandle %d",
+                    clock_parent_handle,
+                )
+                break
+            _parent_name, parent = found
 
             if parent.clock_cells == 0:
                 clock_num = 0
-            elif parent.clock_cells == 1:
+            elif parent.clock_cells == 1 and device_clocks:
                 clock_num = int(device_clocks.pop())
             else:
-                raise Exception(
+                self.logger.warning(
                     "Unhandled number of clock_cells: %d", parent.clock_cells
                 )
+                del device_clocks[-parent.clock_cells :]
+                continue
 
+            parent_paths = self._clock_output_paths(
+                clock_parent_handle, clock_num
+            )
             for compatible in device.compatible:
-                if parent.clock_output_names:
-                    parent_path = (parent.clock_output_names[clock_num],)
+                for parent_path in parent_paths:
                     paths.append((compatible,) + parent_path)
-                else:
-                    parent_paths = self._extract_clock_paths(parent)
-                    # print("Searching for clock", clock_num)
-                    for parent_path in parent_paths:
-                        paths.append((compatible,) + parent_path)
 
         return paths
 
     def _find_clock_rate(self, clock_name):
-        worklist = list(self.board.clock_tree.values())
-
-        while worklist:
-            current_clock = worklist.pop()
-
-            # print(current_clock.name, clock_name)
-            if current_clock.name == clock_name:
-                return current_clock.rate
+        clock = self.board.index.clock(clock_name)
+        if clock is None:
+            return -1
 
-            worklist.extend(current_clock.derived_clocks.values())
-
-        return -1
+        return clock.rate
 
     def _find_clocks(self, device_regions: Dict[str, DeviceMemoryRegion]):
 
-        # clock_paths_dict = self._build_clock_dict()
-
         dt_clocks: List[DTClock] = []
+        dt_clocks_by_rate: Dict[int, DTClock] = {}
         clock_mapping_dict: MutableMapping[
             str, List[Optional[DTClock]]
         ] = defaultdict(list)
@@ -319,10 +333,7 @@ class GenerateDeviceTreePass(BasePass):
                     clock_rate = self._find_clock_rate(clock_name)
                     selected_clock = None
                     if clock_rate > 0:
-                        for dt_clock in dt_clocks:
-                            if dt_clock.rate == clock_rate:
-                                selected_clock = dt_clock
-                                break
+                        selected_clock = dt_clocks_by_rate.get(clock_rate)
                         if selected_clock is None:
                             selected_clock = DTClock(
                                 name=f"fixed_{clock_rate}Hz",
@@ -330,6 +341,7 @@ class GenerateDeviceTreePass(BasePass):
                                 label_name=f"fixed{len(dt_clocks)}",
                             )
                             dt_clocks.append(selected_clock)
+                            dt_clocks_by_rate[clock_rate] = selected_clock
 
                     assert device.name
                     clock_mapping_dict[device.name].append(selected_clock)
@@ -468,6 +480,7 @@ class GenerateDeviceTreePass(BasePass):
         dts_names = []
 
         self.board = board
+        self._clock_paths = {}
 
         (
             pci_mmconfig_base,
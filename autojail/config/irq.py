@@ -1,12 +1,87 @@
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import tabulate
 
 from autojail.model.board import Board
 from autojail.model.jailhouse import CellConfig, JailhouseConfig
 
 from ..model import IRQChip
+from ..utils.logging import getLogger
+from .cpu import cache_domains
+from .memory import format_ranges
 from .passes import BasePass
 
 
+def interrupt_rate(board: Board, irq: int) -> float:
+    """Interrupts per second of a GIC interrupt
+
+    Without the uptime of the board the count since boot is returned.
+    """
+    stats = board.interrupt_stats.get(irq)
+    if stats is None:
+        return 0.0
+    return sum(stats.counts) / (board.uptime or 1.0)
+
+
+def _cell_interrupts(cell: CellConfig) -> Set[int]:
+    return {
+        irq
+        for irqchip in (cell.irqchips or {}).values()
+        for irq in irqchip.interrupts
+    }
+
+
+def cpu_cells(config: JailhouseConfig) -> Dict[int, str]:
+    """Name of the cell running on each cpu once all cells are started"""
+    cells: Dict[int, str] = {}
+    for cell in config.cells.values():
+        for cpu in cell.cpus or []:
+            if cell.type != "root" or cpu not in cells:
+                cells[cpu] = cell.name
+    return cells
+
+
+def interrupt_load(board: Board, config: JailhouseConfig) -> Dict[int, float]:
+    """Expected interrupts per second handled by each cpu
+
+    Private interrupts are counted on the cpu that received them on the
+    board. Interrupts of the guest cells are spread over the cpus of their
+    cell, interrupts of the root cell over their affinity or the cpus that
+    are left to the root cell.
+    """
+    load = {cpu.num: 0.0 for cpu in board.cpuinfo.values()}
+
+    root_cell = config.root_cell
+    guest_cells = [
+        cell for cell in config.cells.values() if cell.type != "root"
+    ]
+    guest_cpus = {cpu for cell in guest_cells for cpu in cell.cpus or []}
+    root_cpus = sorted(set(root_cell.cpus or list(load)) - guest_cpus)
+
+    for irq, stats in board.interrupt_stats.items():
+        # Private interrupts stay on the cpu that received them
+        if irq < 32:
+            for cpu, count in enumerate(stats.counts):
+                if cpu in load:
+                    load[cpu] += count / (board.uptime or 1.0)
+            continue
+
+        cpus: List[int] = []
+        for cell in guest_cells:
+            if irq in _cell_interrupts(cell):
+                cpus = list(cell.cpus or [])
+                break
+        else:
+            if irq in _cell_interrupts(root_cell):
+                cpus = root_cell.irq_affinity.get(irq, root_cpus)
+
+        rate = interrupt_rate(board, irq)
+        for cpu in cpus:
+            load[cpu] = load.get(cpu, 0.0) + rate / len(cpus)
+
+    return load
+
+
 class PrepareIRQChipsPass(BasePass):
     def __init__(self) -> None:
         self.board: Optional[Board] = None
@@ -72,3 +147,151 @@ class PrepareIRQChipsPass(BasePass):
         for name, chip in new_irqchips.items():
             if len(chip.interrupts) > 0:
                 cell.irqchips[name] = chip
+
+
+class PlanIRQsPass(BasePass):
+    """Plans the interrupts of the cells using the interrupt counts of the board
+
+    SPIs that are neither used by a device of the board nor by a cell are
+    removed from the root cell. High rate interrupts of the root cell are
+    bound to the root cpus that do not share a cache with latency critical
+    cells, i.e. cells with isolated cpu placement.
+    Without interrupt counts the configuration is not changed.
+    """
+
+    # Interrupts per second from which on an interrupt is high rate
+    HIGH_RATE = 100.0
+
+    def __init__(self) -> None:
+        self.logger = getLogger()
+
+    def __call__(
+        self, board: Board, config: JailhouseConfig
+    ) -> Tuple[Board, JailhouseConfig]:
+        if not board.interrupt_stats:
+            return board, config
+
+        self.board = board
+        self.config = config
+
+        self._prune_root_interrupts()
+        self._place_interrupts()
+        self._log_load()
+
+        return board, config
+
+    def _used_interrupts(self) -> Set[int]:
+        used = set(self.board.interrupt_stats)
+
+        devices: List[Any] = list(self.board.devices.values())
+        devices.extend(self.board.memory_regions.values())
+        for device in devices:
+            for interrupt in getattr(device, "interrupts", []):
+                used.add(interrupt.to_jailhouse())
+
+        for cell in self.config.cells.values():
+            if cell.type != "root":
+                used |= _cell_interrupts(cell)
+            # Legacy interrupts of the virtual PCI devices
+            if cell.vpci_irq_base is not None:
+                used |= set(range(cell.vpci_irq_base, cell.vpci_irq_base + 32))
+
+        return used
+
+    def _prune_root_interrupts(self) -> None:
+        root_cell = self.config.root_cell
+        assert root_cell.irqchips is not None
+
+        used = self._used_interrupts()
+        removed: List[int] = []
+        # Empty irqchips are kept, later passes add the legacy interrupts
+        # of the virtual PCI devices to the first irqchip of the root cell
+        for irqchip in root_cell.irqchips.values():
+            removed.extend(irq for irq in irqchip.interrupts if irq not in used)
+            irqchip.interrupts[:] = [
+                irq for irq in irqchip.interrupts if irq in used
+            ]
+
+        if removed:
+            self.logger.info(
+                "Removing unused interrupts from the root cell: %s",
+                format_ranges(removed),
+            )
+
+    def _place_interrupts(self) -> None:
+        root_cell = self.config.root_cell
+        guest_cells = [
+            cell for cell in self.config.cells.values() if cell.type != "root"
+        ]
+        guest_cpus = {cpu for cell in guest_cells for cpu in cell.cpus or []}
+        critical_cells = [
+            cell for cell in guest_cells if cell.cpu_placement == "isolated"
+        ]
+        if not critical_cells:
+            return
+
+        for cell in critical_cells:
+            for irq in sorted(_cell_interrupts(cell)):
+                rate = interrupt_rate(self.board, irq)
+                if rate >= self.HIGH_RATE:
+                    self.logger.warning(
+                        "Latency critical cell %s handles interrupt %d (%s) with %.0f interrupts/s",
+                        cell.name,
+                        irq,
+                        self.board.interrupt_stats[irq].name,
+                        rate,
+                    )
+
+        critical_cpus = {
+            cpu for cell in critical_cells for cpu in cell.cpus or []
+        }
+        critical_domains = [
+            cpus
+            for domain, cpus in cache_domains(self.board).items()
+            if domain is not None and critical_cpus & set(cpus)
+        ]
+        root_cpus = sorted(set(root_cell.cpus or []) - guest_cpus)
+        cpus = [
+            cpu
+            for cpu in root_cpus
+            if not any(cpu in domain for domain in critical_domains)
+        ]
+        if not cpus:
+            self.logger.warning(
+                "All root cpus share a cache with latency critical cells, interrupts are not placed"
+            )
+            return
+
+        guest_interrupts = set()
+        for cell in guest_cells:
+            guest_interrupts |= _cell_interrupts(cell)
+        high_rate = sorted(
+            (
+                (interrupt_rate(self.board, irq), irq)
+                for irq in _cell_interrupts(root_cell) - guest_interrupts
+                if interrupt_rate(self.board, irq) >= self.HIGH_RATE
+            ),
+            reverse=True,
+        )
+
+        # Balance the high rate interrupts over the remaining cpus
+        load = {cpu: 0.0 for cpu in cpus}
+        for rate, irq in high_rate:
+            cpu = min(cpus, key=lambda cpu: (load[cpu], cpu))
+            root_cell.irq_affinity[irq] = [cpu]
+            load[cpu] += rate
+
+    def _log_load(self) -> None:
+        load = interrupt_load(self.board, self.config)
+        owners = cpu_cells(self.config)
+
+        self.logger.info("Expected interrupt load:")
+        self.logger.info(
+            tabulate.tabulate(
+                [
+                    [cpu, owners.get(cpu, "-"), f"{rate:.1f}"]
+                    for cpu, rate in sorted(load.items())
+                ],
+                headers=["CPU", "Cell", "Interrupts/s"],
+            )
+        )
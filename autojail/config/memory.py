@@ -12,6 +12,7 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Set,
     Tuple,
     Union,
 )
@@ -21,15 +22,18 @@ from ortools.sat.python import cp_model
 
 from ..model import (
     Board,
+    Cache,
     CellConfig,
     DeviceMemoryRegion,
+    DRAMMapping,
+    GroupedMemoryRegion,
     HypervisorMemoryRegion,
     JailhouseConfig,
     MemoryRegion,
     MemoryRegionData,
     ShMemNetRegion,
 )
-from ..model.datatypes import HexInt
+from ..model.datatypes import ByteSize, HexInt
 from ..model.parameters import GenerateConfig, GenerateParameters, ScalarChoice
 from ..utils import get_overlap
 from .passes import BasePass
@@ -152,7 +156,7 @@ class MemoryConstraint(object):
         alignment = self.alignment
         if other.alignment:
             if alignment:
-                alignment = (self.alignment * other.alignment) / math.gcd(
+                alignment = (self.alignment * other.alignment) // math.gcd(
                     self.alignment, other.alignment
                 )
             else:
@@ -181,6 +185,8 @@ class MemoryConstraint(object):
 
         mc.resolved = resolved
 
+        return mc
+
 
 class NoOverlapConstraint(object):
     """Implements a generic no-overlap constraint"""
@@ -297,9 +303,164 @@ class CPMemorySolver(object):
             self.model.Add(first.bound_vars[1] == second.bound_vars[1])
 
 
+def last_level_caches(board: Board) -> List[Cache]:
+    """Caches at the end of the cache hierarchies of the cpus"""
+    llcs: List[Cache] = []
+    for cpu in board.cpuinfo.values():
+        cache = None
+        name = cpu.next_level_cache
+        visited = set()
+        while name in board.caches and name not in visited:
+            visited.add(name)
+            cache = board.caches[name]
+            name = cache.next_level_cache
+        if cache is not None and cache not in llcs:
+            llcs.append(cache)
+    return llcs
+
+
+def color_footprint(
+    size: int, colors: int, way_size: int, pagesize: int
+) -> int:
+    """Size of the physical address range holding size bytes of colored memory
+
+    Each way of the cache contains one page of each color, so a region
+    allocated with the colors of the bitmap colors uses one page of each
+    way_size bytes per color.
+    """
+    num_colors = bin(colors).count("1")
+    return math.ceil(size / (num_colors * pagesize)) * way_size
+
+
+def huge_page_size(pagesize: int) -> int:
+    """Size of the block mapped by one last level page table"""
+    return pagesize * (pagesize // 8)
+
+
+def _dram_masks(mapping: DRAMMapping) -> List[int]:
+    """Masks of all bank index bits, the most significant bit first"""
+    return [
+        int(mask)
+        for field in (mapping.channel, mapping.rank, mapping.bank)
+        for mask in reversed(field)
+    ]
+
+
+def dram_bank(mapping: DRAMMapping, addr: int) -> int:
+    """Index of the DRAM bank containing addr
+
+    Banks are numbered by their channel, rank and bank bits, the channel
+    bits are the most significant ones.
+    """
+    index = 0
+    for mask in _dram_masks(mapping):
+        index = (index << 1) | (bin(addr & mask).count("1") & 1)
+    return index
+
+
+def dram_block_size(mapping: DRAMMapping) -> int:
+    """Size of the aligned blocks of physical memory that lie in a single bank"""
+    used_bits = reduce(lambda a, b: a | b, _dram_masks(mapping), 0)
+    if not used_bits:
+        raise Exception("The DRAM mapping of the board does not use any bits")
+    return used_bits & -used_bits
+
+
+def dram_bank_runs(
+    mapping: DRAMMapping, banks: Set[int], start: int, end: int
+) -> List[Tuple[int, int]]:
+    """Maximal address ranges in [start, end) that only contain the given banks
+
+    The bank of an address only depends on the address bits up to the
+    highest bit used by the mapping, so the runs are computed for one
+    period of these bits and repeated over the range.
+    """
+    block = dram_block_size(mapping)
+    used_bits = reduce(lambda a, b: a | b, _dram_masks(mapping), 0)
+    period = 1 << used_bits.bit_length()
+
+    pattern: List[Tuple[int, int]] = []
+    for addr in range(0, period, block):
+        if dram_bank(mapping, addr) in banks:
+            if pattern and pattern[-1][1] == addr:
+                pattern[-1] = (pattern[-1][0], addr + block)
+            else:
+                pattern.append((addr, addr + block))
+
+    first = -(-start // block) * block
+    last = end // block * block
+    runs: List[Tuple[int, int]] = []
+    for base in range(first // period * period, last, period):
+        for run_start, run_end in pattern:
+            run_start = max(base + run_start, first)
+            run_end = min(base + run_end, last)
+            if run_start >= run_end:
+                continue
+            if runs and runs[-1][1] == run_start:
+                runs[-1] = (runs[-1][0], run_end)
+            else:
+                runs.append((run_start, run_end))
+    return runs
+
+
+def dram_bank_usage(
+    board: Board, config: JailhouseConfig
+) -> Dict[str, Set[int]]:
+    """DRAM banks used by the RAM regions of each cell"""
+    assert board.dram_mapping is not None
+    block = dram_block_size(board.dram_mapping)
+
+    usage: Dict[str, Set[int]] = {}
+    for cell_name, cell in config.cells.items():
+        banks: Set[int] = set()
+        for region in (cell.memory_regions or {}).values():
+            regions: List[Any] = (
+                list(region.regions)
+                if isinstance(region, GroupedMemoryRegion)
+                else [region]
+            )
+            for sub_region in regions:
+                if not isinstance(sub_region, MemoryRegion) or isinstance(
+                    sub_region, (DeviceMemoryRegion, HypervisorMemoryRegion)
+                ):
+                    continue
+                if {"MEM_IO", "MEM_COMM_REGION"} & set(sub_region.flags):
+                    continue
+                if (
+                    sub_region.physical_start_addr is None
+                    or not sub_region.size
+                ):
+                    continue
+                start = int(sub_region.physical_start_addr)
+                addr = start - start % block
+                while addr < start + int(sub_region.size):
+                    banks.add(dram_bank(board.dram_mapping, addr))
+                    addr += block
+        usage[cell_name] = banks
+    return usage
+
+
+def format_ranges(values: Iterable[int]) -> str:
+    """Compact representation of a set of integers, e.g. 0-3,6"""
+    ranges: List[List[int]] = []
+    for value in sorted(values):
+        if ranges and ranges[-1][1] == value - 1:
+            ranges[-1][1] = value
+        else:
+            ranges.append([value, value])
+    return ",".join(
+        str(first) if first == last else f"{first}-{last}"
+        for first, last in ranges
+    )
+
+
 class AllocateMemoryPass(BasePass):
     """Implements a simple MemoryAllocator for AutoJail"""
 
+    # Upper bound for the number of sub regions of a region
+    # that is restricted to DRAM banks
+    MAX_DRAM_CHUNKS = 64
+
     def __init__(self) -> None:
         self.logger = logging.getLogger("autojail")
         self.config: Optional[JailhouseConfig] = None
@@ -324,6 +485,34 @@ class AllocateMemoryPass(BasePass):
             MemoryConstraint, AllocatorSegment
         ] = dict()
 
+        # Cache coloring: bitmap of the colors of each colored cell
+        self.colors: Dict[str, int] = {}
+        self.color_way_size: Optional[int] = None
+
+        # Bank partitioning: banks of each partitioned cell, and the
+        # physical chunk constraints of their segments
+        self.banks: Dict[str, Set[int]] = {}
+        self.bank_runs: Dict[str, List[Tuple[int, int]]] = {}
+        self.bank_chunks: Dict[AllocatorSegment, List[MemoryConstraint]] = {}
+
+    def _align_shmem(self) -> None:
+        """Align the regions of shmem-net links that use huge pages"""
+        assert self.config is not None
+        assert self.board is not None
+
+        for name, shmem_config in (self.config.shmem or {}).items():
+            if not getattr(shmem_config, "huge_pages", False):
+                continue
+
+            regions = self.config.cells[shmem_config.peers[0]].memory_regions
+            assert regions is not None
+            region = regions[name]
+            assert isinstance(region, MemoryRegion)
+            assert region.size is not None
+            mc = MemoryConstraint(int(region.size), False)
+            mc.alignment = huge_page_size(self.board.pagesize)
+            self.per_region_constraints[name] = mc
+
     def _iter_constraints(self, f_no_overlap, f_mc):
         for cell_name, no_overlap in self.no_overlap_constraints.items():
             if not f_no_overlap(cell_name, no_overlap):
@@ -431,6 +620,10 @@ class AllocateMemoryPass(BasePass):
                 self.root_cell_id = id
                 break
 
+        self._assign_colors()
+        self._assign_banks()
+        self._align_shmem()
+
         vmem_size = 2 ** 32
         if self.board.virtual_address_bits > 32:
             vmem_size = 2 ** (self.board.virtual_address_bits - 1)
@@ -475,6 +668,9 @@ class AllocateMemoryPass(BasePass):
             assert seg.size > 0
             assert seg.shared_regions
 
+            colors = self._segment_colors(seg)
+            chunks = self._segment_chunks(seg)
+
             mc_global = None
             for sharer, regions in seg.shared_regions.items():
                 mc_seg = seg.constraint
@@ -501,6 +697,20 @@ class AllocateMemoryPass(BasePass):
                 if mc_seg and mc_seg.virtual:
                     mc_local.resolved = mc_seg.resolved
 
+                if chunks is not None:
+                    # Partitioned segments are placed by their chunks,
+                    # loadable copies in the root cell map each chunk
+                    # at its physical address
+                    if sharer == self.root_cell_id:
+                        for chunk in chunks:
+                            mc_chunk = MemoryConstraint(chunk.size, True)
+                            mc_chunk.equal_constraint = chunk
+                            self.no_overlap_constraints[
+                                sharer
+                            ].add_memory_constraint(mc_chunk)
+                        continue
+                    mc_global = chunks[0]
+
                 if not mc_global:
                     mc_global = copy.deepcopy(mc_local)
                     mc_global.virtual = False
@@ -521,6 +731,22 @@ class AllocateMemoryPass(BasePass):
                     if mc_seg and not mc_seg.virtual:
                         mc_global.resolved = mc_seg.resolved
 
+                    # Colored segments spread over the ways of the cache
+                    if colors is not None:
+                        assert self.color_way_size is not None
+                        mc_global.size = color_footprint(
+                            mc_global.size,
+                            colors,
+                            self.color_way_size,
+                            self.board.pagesize,
+                        )
+                        alignment = mc_global.alignment or self.board.pagesize
+                        mc_global.alignment = (
+                            alignment
+                            * self.color_way_size
+                            // math.gcd(alignment, self.color_way_size)
+                        )
+
                     if mc_global.start_addr and mc_global.size:
                         print(
                             f"Adding global no-overlapp (shared): [0x{mc_global.start_addr:x}, 0x{mc_global.start_addr + mc_global.size:x}]"
@@ -546,6 +772,13 @@ class AllocateMemoryPass(BasePass):
                 )
                 self.memory_constraints[mc_local] = seg
 
+            if colors is not None:
+                for regions in seg.shared_regions.values():
+                    for region in regions:
+                        region.colors = HexInt(colors)
+                        if "MEM_COLORED" not in region.flags:
+                            region.flags.append("MEM_COLORED")
+
         # Add virtually reserved segments
         for cell_name, cell in self.config.cells.items():
             assert cell.memory_regions is not None
@@ -623,6 +856,9 @@ class AllocateMemoryPass(BasePass):
                         if region.virtual_start_addr is None:
                             region.virtual_start_addr = HexInt(start)
 
+        self._split_bank_regions()
+        self._log_bank_isolation()
+
         self._remove_allocatable()
 
         return self.board, self.config
@@ -660,14 +896,403 @@ class AllocateMemoryPass(BasePass):
                 )
                 constraint.add_memory_constraint(mc)
 
+    def _assign_colors(self) -> None:
+        """Assigns disjoint ranges of cache colors to the cells with a color budget
+
+        The colors of a page are given by its index in a way of the last
+        level cache. The root cell is not colored.
+        """
+        assert self.config is not None
+        assert self.board is not None
+
+        self.colors = {}
+        self.color_way_size = None
+
+        budgets = {
+            cell_name: cell.cache_colors
+            for cell_name, cell in self.config.cells.items()
+            if cell.type != "root" and cell.cache_colors is not None
+        }
+        if not budgets:
+            return
+
+        for cell_name, budget in budgets.items():
+            if budget <= 0:
+                raise Exception(
+                    f"Cell {cell_name} requests {budget} cache colors, the number of cache colors must be positive"
+                )
+
+        way_sizes = [
+            cache.waysize
+            for cache in last_level_caches(self.board)
+            if cache.waysize
+        ]
+        if not way_sizes:
+            raise Exception(
+                "Cache coloring needs the way size of the last level cache, add it to the caches in board.yml"
+            )
+        way_size = max(way_sizes)
+
+        num_colors = way_size // self.board.pagesize
+        # Colors of a memory region are a 64 bit bitmap in jailhouse
+        if num_colors > 64:
+            raise Exception(
+                f"Cache coloring supports up to 64 colors, the last level cache has {num_colors}"
+            )
+
+        requested = sum(budgets.values())
+        if requested > num_colors:
+            raise Exception(
+                f"Cells request {requested} cache colors, but the last level cache only has {num_colors}"
+            )
+
+        table = []
+        next_color = 0
+        for cell_name, budget in budgets.items():
+            self.colors[cell_name] = ((1 << budget) - 1) << next_color
+            table.append(
+                [
+                    cell_name,
+                    f"{next_color}-{next_color + budget - 1}",
+                    hex(self.colors[cell_name]),
+                ]
+            )
+            next_color += budget
+
+        self.color_way_size = way_size
+        if self.root_cell and self.root_cell.platform_info:
+            self.root_cell.platform_info.color_way_size = HexInt(way_size)
+
+        self.logger.info(
+            "Cache coloring with %d colors of way size 0x%x",
+            num_colors,
+            way_size,
+        )
+        self.logger.info(
+            tabulate.tabulate(table, headers=["Cell", "Colors", "Bitmap"])
+        )
+
+    def _colorable(self, cell_name: str, region: Any) -> bool:
+        """Regions allocated with the cache colors of their cell"""
+        if cell_name not in self.colors:
+            return False
+        if not isinstance(region, MemoryRegion):
+            return False
+        if isinstance(
+            region,
+            (DeviceMemoryRegion, GroupedMemoryRegion, HypervisorMemoryRegion),
+        ):
+            return False
+        if region.shared:
+            return False
+        return not {"MEM_IO", "MEM_COMM_REGION"} & set(region.flags)
+
+    def _segment_colors(self, seg: AllocatorSegment) -> Optional[int]:
+        """Color bitmap of a segment, None if it is not colored"""
+        if not seg.shared_regions or len(seg.shared_regions) != 1:
+            return None
+
+        cell_name, regions = next(iter(seg.shared_regions.items()))
+        if not all(self._colorable(cell_name, region) for region in regions):
+            return None
+
+        return self.colors[cell_name]
+
+    def _assign_banks(self) -> None:
+        """Assigns disjoint sets of DRAM banks to the cells with a bank budget
+
+        Banks are assigned in the order of their index, so cells
+        with large budgets get whole ranks or channels.
+        """
+        assert self.config is not None
+        assert self.board is not None
+
+        self.banks = {}
+        self.bank_runs = {}
+        self.bank_chunks = {}
+
+        budgets = {
+            cell_name: cell.dram_banks
+            for cell_name, cell in self.config.cells.items()
+            if cell.type != "root" and cell.dram_banks is not None
+        }
+        if not budgets:
+            return
+
+        for cell_name, budget in budgets.items():
+            if budget <= 0:
+                raise Exception(
+                    f"Cell {cell_name} requests {budget} DRAM banks, the number of DRAM banks must be positive"
+                )
+
+        mapping = self.board.dram_mapping
+        if mapping is None:
+            raise Exception(
+                "DRAM bank partitioning needs the dram_mapping of the board, add it to board.yml"
+            )
+
+        for cell_name in budgets:
+            if cell_name in self.colors:
+                raise Exception(
+                    f"Cell {cell_name} can not use cache coloring and DRAM bank partitioning at the same time"
+                )
+
+        num_banks = 2 ** len(_dram_masks(mapping))
+        requested = sum(budgets.values())
+        if requested > num_banks:
+            raise Exception(
+                f"Cells request {requested} DRAM banks, but the board only has {num_banks}"
+            )
+
+        next_bank = 0
+        for cell_name, budget in budgets.items():
+            self.banks[cell_name] = set(range(next_bank, next_bank + budget))
+            next_bank += budget
+
+    def _partitionable(self, cell_name: str, region: Any) -> bool:
+        """Regions allocated in the DRAM banks of their cell"""
+        if cell_name not in self.banks:
+            return False
+        if not isinstance(region, MemoryRegion):
+            return False
+        if isinstance(
+            region,
+            (DeviceMemoryRegion, GroupedMemoryRegion, HypervisorMemoryRegion),
+        ):
+            return False
+        if region.shared:
+            return False
+        return not {"MEM_IO", "MEM_COMM_REGION"} & set(region.flags)
+
+    def _segment_chunks(
+        self, seg: AllocatorSegment
+    ) -> Optional[List[MemoryConstraint]]:
+        """Fixed physical constraints of the chunks of a bank partitioned segment
+
+        A segment is partitioned if it belongs to a single cell with a
+        bank budget, the root cell may only map loadable copies of it.
+        Returns None for other segments.
+        """
+        if not self.banks:
+            return None
+
+        assert self.board is not None
+        assert self.board.dram_mapping is not None
+
+        if seg in self.bank_chunks:
+            return self.bank_chunks[seg]
+
+        assert seg.shared_regions is not None
+
+        cells = [
+            cell_name
+            for cell_name in seg.shared_regions
+            if cell_name != self.root_cell_id
+        ]
+        if len(cells) != 1:
+            return None
+        cell_name = cells[0]
+
+        regions = seg.shared_regions[cell_name]
+        if len(regions) != 1 or not self._partitionable(cell_name, regions[0]):
+            return None
+        for _sharer, sharer_regions in seg.shared_regions.items():
+            if any(region.shared for region in sharer_regions):
+                return None
+
+        if cell_name not in self.bank_runs:
+            intervals = self.physical_domain.FlattenedIntervals()
+            self.bank_runs[cell_name] = dram_bank_runs(
+                self.board.dram_mapping,
+                self.banks[cell_name],
+                intervals[0],
+                intervals[-1] + 1,
+            )
+        runs = self.bank_runs[cell_name]
+        if not runs:
+            raise Exception(
+                f"No physical memory is left in the DRAM banks of cell {cell_name}"
+            )
+
+        # Chunks are the largest blocks that fit the runs of the banks
+        # and divide the size of the segment
+        size = seg.size
+        chunk_size = dram_block_size(self.board.dram_mapping)
+        while (
+            size % (2 * chunk_size) == 0
+            and all(
+                start % (2 * chunk_size) == 0 and end % (2 * chunk_size) == 0
+                for start, end in runs
+            )
+            and 2 * chunk_size <= size
+        ):
+            chunk_size *= 2
+        if size % chunk_size != 0:
+            raise Exception(
+                f"Size of {seg.name} in cell {cell_name} is not a multiple of the DRAM bank block size 0x{chunk_size:x}"
+            )
+
+        num_chunks = size // chunk_size
+        if num_chunks > self.MAX_DRAM_CHUNKS:
+            raise Exception(
+                f"{seg.name} in cell {cell_name} would be split into {num_chunks} regions to fit its DRAM banks, "
+                f"the limit is {self.MAX_DRAM_CHUNKS}"
+            )
+
+        # The chunks are placed at the lowest free addresses of the banks
+        # before solving, the solver allocates the other segments around
+        # them. Restricting the solver domain to the banks does not scale
+        # to the number of intervals of realistic mappings.
+        occupied = [
+            (mc.start_addr, mc.start_addr + mc.size)
+            for mc in self.global_no_overlap.constraints
+            if mc.start_addr is not None
+        ]
+
+        chunks: List[MemoryConstraint] = []
+        for start, end in runs:
+            addr = start
+            while addr + chunk_size <= end and len(chunks) < num_chunks:
+                if not any(
+                    addr < occupied_end and occupied_start < addr + chunk_size
+                    for occupied_start, occupied_end in occupied
+                ):
+                    chunk = MemoryConstraint(chunk_size, False, addr)
+                    self.global_no_overlap.add_memory_constraint(chunk)
+                    chunks.append(chunk)
+                addr += chunk_size
+
+        if len(chunks) < num_chunks:
+            raise Exception(
+                f"Not enough free memory in the DRAM banks of cell {cell_name} for {seg.name}"
+            )
+
+        self.logger.info(
+            "Splitting %s of cell %s into %d chunks of 0x%x bytes in DRAM banks %s",
+            seg.name,
+            cell_name,
+            num_chunks,
+            chunk_size,
+            format_ranges(self.banks[cell_name]),
+        )
+
+        self.bank_chunks[seg] = chunks
+        return chunks
+
+    def _split_bank_regions(self) -> None:
+        """Replaces the regions of partitioned segments by their chunks
+
+        Physically contiguous chunks are merged, the sub regions of a cell
+        stay contiguous in its virtual address space.
+        """
+        assert self.config is not None
+
+        for seg, chunks in self.bank_chunks.items():
+            starts = []
+            for chunk in chunks:
+                assert chunk.allocated_range is not None
+                starts.append(chunk.allocated_range[0])
+
+            pieces: List[List[int]] = []
+            for start in sorted(starts):
+                if pieces and pieces[-1][0] + pieces[-1][1] == start:
+                    pieces[-1][1] += chunks[0].size
+                else:
+                    pieces.append([start, chunks[0].size])
+
+            assert seg.shared_regions
+            for sharer, regions in seg.shared_regions.items():
+                cell = self.config.cells[sharer]
+                assert cell.memory_regions is not None
+                for region in regions:
+                    assert isinstance(region, MemoryRegion)
+                    virtual_start = region.virtual_start_addr
+                    if len(pieces) == 1:
+                        region.physical_start_addr = HexInt(pieces[0][0])
+                        if virtual_start is None:
+                            region.virtual_start_addr = HexInt(pieces[0][0])
+                        continue
+
+                    sub_regions: List[MemoryRegion] = []
+                    offset = 0
+                    for start, size in pieces:
+                        sub_region = region.copy(
+                            update={
+                                "physical_start_addr": HexInt(start),
+                                "virtual_start_addr": HexInt(
+                                    virtual_start + offset
+                                    if virtual_start is not None
+                                    else start
+                                ),
+                                "size": ByteSize(size),
+                                "flags": list(region.flags),
+                            }
+                        )
+                        sub_regions.append(sub_region)
+                        offset += size
+
+                    grouped_region = GroupedMemoryRegion(regions=sub_regions)
+                    grouped_region.flags = list(region.flags)
+                    for name, cell_region in cell.memory_regions.items():
+                        if cell_region is region:
+                            cell.memory_regions[name] = grouped_region
+                            break
+
+    def _log_bank_isolation(self) -> None:
+        """Logs the DRAM banks used by each cell"""
+        if not self.banks:
+            return
+
+        assert self.board is not None
+        assert self.config is not None
+
+        usage = dram_bank_usage(self.board, self.config)
+        table = []
+        for cell_name, banks in usage.items():
+            shared_with = [
+                other
+                for other, other_banks in usage.items()
+                if other != cell_name and banks & other_banks
+            ]
+            table.append(
+                [
+                    cell_name,
+                    format_ranges(self.banks.get(cell_name, [])) or "-",
+                    format_ranges(banks) or "-",
+                    ", ".join(shared_with) or "isolated",
+                ]
+            )
+
+        self.logger.info("DRAM bank isolation:")
+        self.logger.info(
+            tabulate.tabulate(
+                table, headers=["Cell", "Assigned", "Used", "Shared with"]
+            )
+        )
+
     def _lift_loadable(self):
         root_cell = self.root_cell
+        root_map_offset = None
+        if root_cell.platform_info is not None:
+            root_map_offset = root_cell.platform_info.color_root_map_offset
+
         for cell_name, cell in self.config.cells.items():
             if cell.type == "root":
                 continue
 
             for name, region in cell.memory_regions.items():
-                if region.flags and "MEM_LOADABLE" in region.flags:
+                loadable = region.flags and "MEM_LOADABLE" in region.flags
+
+                # Colored regions are loaded through the root_map_offset
+                # of the coloring extension
+                if self._colorable(cell_name, region):
+                    if loadable and not root_map_offset:
+                        raise Exception(
+                            f"Colored loadable region {name} of cell {cell_name} needs a color_root_map_offset in the platform_info of the root cell"
+                        )
+                    continue
+
+                if loadable:
                     root_region_name = f"{name}@{cell_name}"
                     print("Adding region:", root_region_name, "to root cell")
 
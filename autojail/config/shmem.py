@@ -9,9 +9,82 @@ from ..model import (
     JailhouseConfig,
     MemoryRegion,
     PCIDevice,
+    ShmemConfigNet,
+    ShMemNetRegion,
 )
+from .memory import huge_page_size
 from .passes import BasePass
 
+# Limits of the ivshmem-net driver, see drivers/net/ivshmem-net.c
+IVSHMEM_NET_VQ_ALIGN = 64
+IVSHMEM_NET_MAX_QLEN = 4096
+IVSHMEM_NET_MIN_QLEN = 32
+ETH_MIN_MTU = 68
+
+
+def _align(value: int, alignment: int) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def _vring_size(qlen: int, align: int) -> int:
+    # descriptors and available ring, followed by the used ring
+    size = _align(16 * qlen + 2 * (3 + qlen), align)
+    return size + 2 * 3 + 8 * qlen
+
+
+def ivshmem_net_queue(output_size: int) -> Tuple[int, int]:
+    """Queue length and vring size of ivshmem-net for an output region
+
+    Replicates ivshm_net_calc_qsize, the vrings take at most an eighth
+    of the output region.
+    """
+    qlen = IVSHMEM_NET_MAX_QLEN
+    vrsize = 0
+    while qlen > IVSHMEM_NET_MIN_QLEN:
+        vrsize = _align(
+            _vring_size(qlen, IVSHMEM_NET_VQ_ALIGN), IVSHMEM_NET_VQ_ALIGN
+        )
+        if vrsize < output_size // 8:
+            break
+        qlen >>= 1
+
+    return qlen, vrsize
+
+
+def check_ivshmem_net_sizes(
+    name: str,
+    state_table_size: int,
+    rw_size: int,
+    output_size: int,
+    pagesize: int,
+) -> None:
+    """Raise if the regions of a shmem-net link can not be used by ivshmem-net"""
+
+    for region, size in (
+        ("state table", state_table_size),
+        ("read write region", rw_size),
+        ("output region", output_size),
+    ):
+        if size % pagesize != 0:
+            raise Exception(
+                f"shmem {name}: size of {region} {hex(size)} is not a multiple of the page size {hex(pagesize)}"
+            )
+
+    if state_table_size == 0:
+        raise Exception(f"shmem {name}: state table must not be empty")
+
+    # queue sizes are unsigned int in the driver
+    if output_size >= 2 ** 32:
+        raise Exception(
+            f"shmem {name}: output region {hex(output_size)} exceeds 4 GiB"
+        )
+
+    _qlen, vrsize = ivshmem_net_queue(output_size)
+    if vrsize > output_size or output_size - vrsize < 4 * ETH_MIN_MTU:
+        raise Exception(
+            f"shmem {name}: output region {hex(output_size)} is too small for the queues of ivshmem-net"
+        )
+
 
 class ConfigSHMemRegionsPass(BasePass):
     """Set flags for shmem regions according to global config"""
@@ -105,6 +178,7 @@ class LowerSHMemPass(BasePass):
         self.config = config
 
         self._create_vpci_base()
+        self._check_net_regions()
         self._lower_shmem_config()
 
         return self.board, self.config
@@ -151,12 +225,16 @@ class LowerSHMemPass(BasePass):
 
             mem_regions = list()
 
+            table_region_size = 0x1000
             if shmem_config.protocol == "SHMEM_PROTO_VETH":
-                common_output_region_size = 0
-                per_device_region_size = self.board.pagesize
+                (
+                    table_region_size,
+                    common_output_region_size,
+                    per_device_region_size,
+                ) = self._net_region_sizes(name, shmem_config)
 
             table_region = MemoryRegion(
-                size=0x1000,
+                size=table_region_size,
                 allocatable=False,
                 flags=["MEM_READ", "MEM_ROOTSHARED"],
                 shared=True,
@@ -228,6 +306,62 @@ class LowerSHMemPass(BasePass):
 
             current_device += 1
 
+    def _net_region_sizes(
+        self, name: str, shmem_config: ShmemConfigNet
+    ) -> Tuple[int, int, int]:
+        """Sizes of the state table, read write and output regions of a shmem-net link
+
+        With huge pages the output regions are rounded to huge pages, and
+        the read write region pads the state table to a huge page boundary.
+        """
+        assert self.board is not None
+
+        pagesize = self.board.pagesize
+        state_table_size = int(shmem_config.state_table_size or pagesize)
+        rw_size = int(shmem_config.common_output_region_size or 0)
+        output_size = int(shmem_config.per_device_region_size or pagesize)
+
+        if shmem_config.huge_pages:
+            huge_page = huge_page_size(pagesize)
+            output_size = _align(output_size, huge_page)
+            rw_size = (
+                _align(state_table_size + rw_size, huge_page) - state_table_size
+            )
+
+        check_ivshmem_net_sizes(
+            name, state_table_size, rw_size, output_size, pagesize
+        )
+
+        qlen, vrsize = ivshmem_net_queue(output_size)
+        self.logger.info(
+            "shmem %s: output regions %s, %d descriptors, %s for the queue",
+            name,
+            hex(output_size),
+            qlen,
+            hex(output_size - vrsize),
+        )
+
+        return state_table_size, rw_size, output_size
+
+    def _check_net_regions(self) -> None:
+        """Check manually configured shmem-net regions"""
+        assert self.config is not None
+        assert self.board is not None
+
+        for cell in self.config.cells.values():
+            for name, region in (cell.memory_regions or {}).items():
+                if (
+                    isinstance(region, ShMemNetRegion)
+                    and region.output_size is not None
+                ):
+                    check_ivshmem_net_sizes(
+                        name,
+                        0x1000,
+                        0,
+                        int(region.output_size),
+                        self.board.pagesize,
+                    )
+
     def _create_vpci_base(self) -> None:
         assert self.config is not None
         assert self.board is not None
@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Set, Tuple
 
 from mako.template import Template
 
@@ -10,6 +10,8 @@ from ..model import AutojailConfig, Board, CellConfig, JailhouseConfig
 from ..utils.logging import getLogger
 from .passes import BasePass
 
+LINUX_KERNEL = "/boot/vmlinuz-5.4.16"
+
 _root_template = Template(
     """
 
@@ -44,9 +46,9 @@ enable_${name}()
     if ! $(jailhouse_enabled); then
         enable_root;
     fi
-    jailhouse cell create ${cell_config}
+    jailhouse cell create ${cell_config} || return 1
     %if cell_image:
-    /usr/sbin/jailhouse cell load --name "${cell_name}" ${cell_image}
+    /usr/sbin/jailhouse cell load --name "${cell_name}" ${cell_image} || return 1
     /usr/sbin/jailhouse cell start --name "${cell_name}"
     %endif
 } 
@@ -54,8 +56,7 @@ enable_${name}()
 )
 
 _all_template = Template(
-    """
-#!/bin/bash
+    """#!/bin/bash
 
 jailhouse_loaded()
 {
@@ -84,16 +85,88 @@ ${enable_root}
 ${enable_cells[cell]}
 
 %endfor
+%if irq_affinity:
+
+gic_irq()
+{
+    awk -v hwirq=$1 '$1 ~ /^[0-9]+:$/ {
+        for (i = 2; i < NF; i++)
+            if ($i ~ /^GIC/ && $(i + 1) == hwirq) {
+                sub(":", "", $1); print $1; exit
+            }
+    }' /proc/interrupts
+}
+
+set_irq_affinity()
+{
+%for hwirq, mask in irq_affinity:
+    irq=$(gic_irq ${hwirq})
+    if [ -n "$irq" ]; then
+        echo ${mask} > /proc/irq/$irq/smp_affinity
+    fi
+%endfor
+}
+%endif
+%if images:
+
+prefetch_images()
+{
+%for image in images:
+    cat ${image} > /dev/null 2>&1 &
+%endfor
+}
+%endif
+
+<%text>start_cells()
+{
+    local cells=("$@")
+    local pids=()
+    local failed=0
+
+    for cell in "${cells[@]}"; do
+        enable_${cell} &
+        pids+=($!)
+    done
+
+    for i in "${!pids[@]}"; do
+        if ! wait ${pids[$i]}; then
+            echo "Could not start cell ${cells[$i]}" >&2
+            failed=1
+        fi
+    done
+
+    return $failed
+}</%text>
 
 enable()
 {
+%if images:
+    prefetch_images;
+%endif
     if ! jailhouse_enabled ; then
-        enable_root;
+        enable_root || return 1;
+    fi
+
+%for stage in stages:
+    start_cells ${" ".join(stage)} || return 1;
+%endfor
+%if irq_affinity:
+    set_irq_affinity;
+%endif
+}
+
+enable_sequential()
+{
+    if ! jailhouse_enabled ; then
+        enable_root || return 1;
     fi
 
 %for cell_name in cell_names:
-    enable_${cell_name};
+    enable_${cell_name} || return 1;
 %endfor
+%if irq_affinity:
+    set_irq_affinity;
+%endif
 }
 
 disable()
@@ -119,6 +192,9 @@ if test $# -gt 0; then
         start)
         enable;
         ;;
+        start_sequential)
+        enable_sequential;
+        ;;
         stop)
         disable;
         ;;
@@ -132,6 +208,47 @@ fi
 )
 
 
+def startup_stages(config: JailhouseConfig) -> List[List[str]]:
+    """Guest cells grouped into stages that are started concurrently
+
+    The root cell is always enabled first. Each guest cell is started in the
+    stage after the last of the cells in its start_after.
+    """
+    guests = [
+        cell_id for cell_id, cell in config.cells.items() if cell.type != "root"
+    ]
+
+    dependencies: Dict[str, Set[str]] = {}
+    for cell_id in guests:
+        cell = config.cells[cell_id]
+        dependencies[cell_id] = set()
+        for dependency in cell.start_after:
+            if dependency not in config.cells:
+                raise Exception(
+                    f"Cell {cell_id} is started after unknown cell {dependency}"
+                )
+            if config.cells[dependency].type != "root":
+                dependencies[cell_id].add(dependency)
+
+    stages: List[List[str]] = []
+    started: Set[str] = set()
+    while len(started) < len(guests):
+        stage = [
+            cell_id
+            for cell_id in guests
+            if cell_id not in started and dependencies[cell_id] <= started
+        ]
+        if not stage:
+            raise Exception(
+                "Cyclic start_after dependencies between cells "
+                + ", ".join(sorted(set(guests) - started))
+            )
+        stages.append(stage)
+        started.update(stage)
+
+    return stages
+
+
 class GenerateStartupPass(BasePass):
     def __init__(self, config: AutojailConfig):
         self.logger = getLogger()
@@ -157,11 +274,23 @@ class GenerateStartupPass(BasePass):
                     cell_name, cell
                 )
                 cell_names.append(cell.name.lower().replace(" ", "_"))
+        stages = [
+            [self._function_name(config.cells[cell_id]) for cell_id in stage]
+            for stage in startup_stages(config)
+        ]
+        for num, stage in enumerate(stages, start=1):
+            self.logger.info(
+                "Startup stage %d: %s", num, ", ".join(stage),
+            )
+
         startup_code = _all_template.render(
             enable_root=root_startup,
             enable_cells=guest_startups,
             cell_names=cell_names,
             root_cell_name=root_cell_name,
+            irq_affinity=self._irq_affinity(),
+            images=self._images(),
+            stages=stages,
         )
 
         deploy_path = Path(self.autojail_config.deploy_dir)
@@ -175,6 +304,37 @@ class GenerateStartupPass(BasePass):
 
         return board, config
 
+    def _function_name(self, cell: CellConfig) -> str:
+        return cell.name.lower().replace(" ", "_")
+
+    def _images(self) -> List[str]:
+        """Images loaded by the guest cells
+
+        They are read into the page cache while the hypervisor is enabled,
+        so that the cells started concurrently do not wait for the storage.
+        """
+        images = []
+        for cell in self.config.cells.values():
+            if cell.type == "root":
+                continue
+            if cell.type == "linux":
+                images.append(LINUX_KERNEL)
+            if cell.image:
+                images.append("/usr/share/jailhouse/" + Path(cell.image).name)
+        return sorted(set(images))
+
+    def _irq_affinity(self) -> List[Tuple[int, str]]:
+        """GIC interrupt numbers and cpu masks of the planned root cell interrupts
+
+        Linux irq numbers are not stable across boots, they are looked up
+        from the GIC interrupt numbers in /proc/interrupts at runtime.
+        """
+        affinity = []
+        for irq, cpus in sorted(self.config.root_cell.irq_affinity.items()):
+            mask = sum(1 << cpu for cpu in cpus)
+            affinity.append((irq, f"{mask:x}"))
+        return affinity
+
     def _generate_root_startup(self, cell: CellConfig):
         cell_name = cell.name.lower().replace(" ", "_")
         cell_name_escaped = cell.name.lower().replace(" ", "-")
@@ -196,7 +356,7 @@ class GenerateStartupPass(BasePass):
             cell_image = ""
 
         if cell.type == "linux":
-            kernel = "/boot/vmlinuz-5.4.16"
+            kernel = LINUX_KERNEL
             dtb = "-d /etc/jailhouse/dts/" + cell_name_escaped + ".dtb"
             ip_config = ""
 
@@ -0,0 +1,26 @@
+from .cost import COST_MODELS, CostModel, LinearCostModel
+from .database import ExploreDatabase, ExploreEntry
+from .objective import objective_value
+from .optimizer import (
+    OPTIMIZERS,
+    AgingEvolution,
+    Candidate,
+    Optimizer,
+    RandomSearch,
+)
+from .space import SearchSpace
+
+__all__ = [
+    "COST_MODELS",
+    "CostModel",
+    "LinearCostModel",
+    "OPTIMIZERS",
+    "AgingEvolution",
+    "Candidate",
+    "ExploreDatabase",
+    "ExploreEntry",
+    "Optimizer",
+    "RandomSearch",
+    "SearchSpace",
+    "objective_value",
+]
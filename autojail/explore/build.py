@@ -0,0 +1,61 @@
+""" Host side stages of the evaluation of explored configurations """
+
+from pathlib import Path
+from typing import Optional
+
+from dataclasses import dataclass
+
+from ..model import AutojailConfig, Board
+from ..model.parameters import GenerateConfig, GenerateParameters
+
+
+@dataclass
+class BuildResult:
+    ret: int
+    gen_params: Optional[GenerateParameters] = None
+    error: str = ""
+
+
+def build_candidate(
+    board: Board,
+    autojail_config: AutojailConfig,
+    cells_yml: Path,
+    build_dir: Path,
+    deploy_dir: Path,
+    set_params: Optional[GenerateConfig] = None,
+    gen_params: Optional[GenerateParameters] = None,
+    skip_check: bool = False,
+    print_after_all: bool = False,
+) -> BuildResult:
+    """Run the configuration passes and compile the cell configurations
+
+    This runs in a worker process, so all arguments and the result are
+    pickled. The filled in gen_params are returned to the caller.
+    """
+    from ..config import JailhouseConfigurator
+
+    build_dir.mkdir(exist_ok=True, parents=True)
+    deploy_dir.mkdir(exist_ok=True, parents=True)
+    autojail_config = autojail_config.copy(
+        update={"build_dir": str(build_dir), "deploy_dir": str(deploy_dir)}
+    )
+
+    try:
+        configurator = JailhouseConfigurator(
+            board,
+            autojail_config,
+            print_after_all=print_after_all,
+            set_params=set_params,
+            gen_params=gen_params,
+        )
+        configurator.read_cell_yml(str(cells_yml))
+        configurator.prepare()
+        ret = configurator.write_config(str(build_dir))
+        if not ret:
+            ret = configurator.build_config(
+                str(build_dir), skip_check=skip_check
+            )
+    except Exception as e:
+        return BuildResult(1, gen_params, repr(e))
+
+    return BuildResult(ret, gen_params)
@@ -0,0 +1,202 @@
+""" Static cost models to rank explore candidates before hardware runs """
+
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..model import Board, JailhouseConfig
+from ..model.board import DeviceMemoryRegion, MemoryRegionData
+
+MIB = 1024 * 1024
+
+
+def _cell_cpus(config: JailhouseConfig) -> Dict[str, Set[int]]:
+    """CPUs used by each cell, the root cell keeps the unassigned cpus"""
+    cpus = {name: set(cell.cpus or []) for name, cell in config.cells.items()}
+    guest_cpus: Set[int] = set()
+    for name, cell in config.cells.items():
+        if cell.type != "root":
+            guest_cpus |= cpus[name]
+    for name, cell in config.cells.items():
+        if cell.type == "root":
+            cpus[name] -= guest_cpus
+    return cpus
+
+
+def shared_cache_cpus(board: Board, config: JailhouseConfig) -> float:
+    """Number of guest cell cpus sharing their next level cache with another cell"""
+    caches = {cpu.num: cpu.next_level_cache for cpu in board.cpuinfo.values()}
+
+    users: Dict[str, Set[str]] = {}
+    for name, cpus in _cell_cpus(config).items():
+        for cpu in cpus:
+            cache = caches.get(cpu)
+            if cache:
+                users.setdefault(cache, set()).add(name)
+
+    shared = 0
+    for name, cpus in _cell_cpus(config).items():
+        if config.cells[name].type == "root":
+            continue
+        for cpu in cpus:
+            cache = caches.get(cpu)
+            if cache and len(users[cache]) > 1:
+                shared += 1
+
+    return float(shared)
+
+
+def _merge(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _io_intervals(regions: Iterable[object]) -> List[Tuple[int, int]]:
+    intervals = []
+    for region in regions:
+        if not isinstance(region, MemoryRegionData):
+            continue
+        if not (
+            isinstance(region, DeviceMemoryRegion) or "MEM_IO" in region.flags
+        ):
+            continue
+        if region.physical_start_addr is None or region.size is None:
+            continue
+        start = int(region.physical_start_addr)
+        intervals.append((start, start + int(region.size)))
+    return _merge(intervals)
+
+
+def unused_io_size(board: Board, config: JailhouseConfig) -> float:
+    """MiB of mmio mapped into the cells that are not backed by a device"""
+    devices = _io_intervals(board.memory_regions.values())
+
+    unused = 0
+    for cell in config.cells.values():
+        for start, end in _io_intervals((cell.memory_regions or {}).values()):
+            covered = sum(
+                max(0, min(end, dev_end) - max(start, dev_start))
+                for dev_start, dev_end in devices
+            )
+            unused += end - start - covered
+
+    return unused / MIB
+
+
+def guest_irqs(board: Board, config: JailhouseConfig) -> float:
+    """Number of interrupt lines routed to the guest cells"""
+    return float(
+        sum(
+            len(irqchip.interrupts)
+            for cell in config.cells.values()
+            if cell.type != "root"
+            for irqchip in (cell.irqchips or {}).values()
+        )
+    )
+
+
+FEATURES: Dict[str, Callable[[Board, JailhouseConfig], float]] = {
+    "shared_cache_cpus": shared_cache_cpus,
+    "unused_io_size": unused_io_size,
+    "guest_irqs": guest_irqs,
+}
+
+
+class CostModel(ABC):
+    """Base class of the cost models
+
+    Cost models predict the objective of a generated configuration from
+    static features of the board and the configuration. Predictions are
+    used to rank candidates, a calibrated model predicts the objective in
+    the units of the measured metric.
+    """
+
+    def __init__(self) -> None:
+        self.calibrated = False
+
+    def features(
+        self, board: Board, config: JailhouseConfig
+    ) -> Dict[str, float]:
+        return {
+            name: feature(board, config) for name, feature in FEATURES.items()
+        }
+
+    @abstractmethod
+    def predict(self, features: Dict[str, float]) -> float:
+        pass
+
+    def calibrate(
+        self, samples: Iterable[Tuple[Dict[str, float], float]]
+    ) -> None:
+        """Fit the model to the measured objectives
+
+        Models without parameters are never calibrated, they only rank
+        the candidates.
+        """
+        self.calibrated = False
+
+
+class LinearCostModel(CostModel):
+    """Weighted sum of the features
+
+    Until it is calibrated with least squares on the measured history,
+    the model uses prior weights that are only meaningful for ranking.
+    """
+
+    PRIORS = {
+        "shared_cache_cpus": 1.0,
+        "unused_io_size": 0.01,
+        "guest_irqs": 0.1,
+    }
+
+    # Regularization of the least squares fit towards zero weights
+    RIDGE = 1e-3
+
+    def __init__(
+        self, weights: Optional[Dict[str, float]] = None, bias: float = 0.0
+    ) -> None:
+        super().__init__()
+        self.weights = dict(weights if weights is not None else self.PRIORS)
+        self.bias = bias
+
+    def predict(self, features: Dict[str, float]) -> float:
+        return self.bias + sum(
+            weight * features.get(name, 0.0)
+            for name, weight in self.weights.items()
+        )
+
+    def calibrate(
+        self, samples: Iterable[Tuple[Dict[str, float], float]]
+    ) -> None:
+        names = list(self.weights)
+        rows = []
+        targets = []
+        for features, objective in samples:
+            if not math.isfinite(objective):
+                continue
+            rows.append([features.get(name, 0.0) for name in names] + [1.0])
+            targets.append(objective)
+
+        # At least one sample more than parameters
+        if len(rows) <= len(names) + 1:
+            return
+
+        x = np.asarray(rows)
+        y = np.asarray(targets)
+        regularization = self.RIDGE * np.eye(len(names) + 1)
+        regularization[-1, -1] = 0.0
+        solution = np.linalg.solve(x.T @ x + regularization, x.T @ y)
+
+        self.weights = dict(zip(names, solution[:-1].tolist()))
+        self.bias = float(solution[-1])
+        self.calibrated = True
+
+
+COST_MODELS = {"linear": LinearCostModel}
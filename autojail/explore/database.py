@@ -0,0 +1,141 @@
+""" Persistent database of the objectives of explored configurations """
+
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import ruamel.yaml
+from dataclasses import asdict, dataclass, field
+
+from ..model.parameters import GenerateConfig
+
+# Key of the configuration generated without set parameters
+DEFAULT_KEY = "default"
+
+
+def _canonical(config: GenerateConfig) -> Dict[str, Any]:
+    values = config.dict()
+    values["mem_io_merge_threshold"] = int(values["mem_io_merge_threshold"])
+    return values
+
+
+def config_hash(config: Optional[GenerateConfig]) -> str:
+    """Canonical hash of a configuration, independent of key order"""
+    if config is None:
+        return DEFAULT_KEY
+    canonical = json.dumps(_canonical(config), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def project_hash(*paths: Path) -> str:
+    """Hash of the project files an exploration depends on"""
+    digest = hashlib.sha256()
+    for path in paths:
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class ExploreEntry:
+    key: str
+    project: str
+    step: int
+    objective: float
+    params: Optional[Dict[str, Any]] = None
+    # Static features of the generated configuration
+    features: Dict[str, float] = field(default_factory=dict)
+    # The configuration has been pruned by the cost model without a test
+    pruned: bool = False
+
+    @property
+    def config(self) -> Optional[GenerateConfig]:
+        if self.params is None:
+            return None
+        return GenerateConfig(**self.params)
+
+
+class ExploreDatabase:
+    """Objectives of all evaluated configurations in a yaml file
+
+    Entries are keyed by the hash of the configuration and of the project
+    files, so resumed explorations only evaluate new configurations, and
+    changes to the project invalidate earlier results.
+    """
+
+    def __init__(self, path: Path, project: str = "") -> None:
+        self.path = Path(path)
+        self.project = project
+        self.entries: List[ExploreEntry] = []
+
+        if self.path.exists():
+            with self.path.open() as f:
+                yaml = ruamel.yaml.YAML(typ="safe")
+                data = yaml.load(f) or []
+            self.entries = [ExploreEntry(**entry) for entry in data]
+
+    @property
+    def project_entries(self) -> List[ExploreEntry]:
+        """Entries of the project, without the pruned entries"""
+        return [
+            entry
+            for entry in self.entries
+            if entry.project == self.project and not entry.pruned
+        ]
+
+    @property
+    def next_step(self) -> int:
+        return max((entry.step for entry in self.entries), default=-1) + 1
+
+    def entry(self, config: Optional[GenerateConfig]) -> Optional[ExploreEntry]:
+        key = config_hash(config)
+        for entry in self.project_entries:
+            if entry.key == key:
+                return entry
+        return None
+
+    def get(self, config: Optional[GenerateConfig]) -> Optional[float]:
+        entry = self.entry(config)
+        if entry is None:
+            return None
+        return entry.objective
+
+    def add(
+        self,
+        config: Optional[GenerateConfig],
+        objective: float,
+        step: int,
+        features: Optional[Dict[str, float]] = None,
+        pruned: bool = False,
+    ) -> None:
+        if objective is None or math.isnan(objective):
+            objective = math.inf
+        self.entries.append(
+            ExploreEntry(
+                key=config_hash(config),
+                project=self.project,
+                step=step,
+                objective=float(objective),
+                params=_canonical(config) if config is not None else None,
+                features=dict(features or {}),
+                pruned=pruned,
+            )
+        )
+        self.save()
+
+    def measurements(self) -> List[Tuple[Dict[str, float], float]]:
+        """Features and measured objectives to calibrate cost models"""
+        return [
+            (entry.features, entry.objective)
+            for entry in self.project_entries
+            if entry.features
+        ]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        with self.path.open("w") as f:
+            yaml = ruamel.yaml.YAML(typ="safe")
+            yaml.default_flow_style = False
+            yaml.dump([asdict(entry) for entry in self.entries], f)
@@ -0,0 +1,46 @@
+""" Objective values of explored configurations from test results """
+
+import math
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ..test.runner import TestResult
+
+REDUCTIONS: Dict[str, Callable[[np.ndarray], float]] = {
+    "min": np.min,
+    "mean": np.mean,
+    "max": np.max,
+    "p99": lambda values: np.percentile(values, 99),
+}
+
+
+def objective_value(
+    results: Dict[str, "TestResult"],
+    metric: str,
+    test: Optional[str] = None,
+    reduce: str = "max",
+) -> float:
+    """Reduce all samples of metric to a single value to minimize
+
+    Configurations whose test fails, any test if no test is given, or
+    without any sample of the metric, are infeasible and get an objective
+    of inf.
+    """
+    if not results:
+        return math.inf
+
+    values = []
+    for name, result in results.items():
+        if test is not None and name != test:
+            continue
+        if not result.passed:
+            return math.inf
+        if metric in result.metrics:
+            values.extend(result.metrics[metric].dropna().tolist())
+
+    if not values:
+        return math.inf
+
+    return float(REDUCTIONS[reduce](np.asarray(values, dtype=float)))
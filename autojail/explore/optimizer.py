@@ -0,0 +1,92 @@
+""" Search strategies for the exploration of generate parameters """
+
+import math
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, List, Optional
+
+from dataclasses import dataclass
+
+from ..model.parameters import GenerateConfig
+from .space import SearchSpace
+
+
+@dataclass
+class Candidate:
+    config: GenerateConfig
+    objective: float = math.inf
+
+
+class Optimizer(ABC):
+    """Base class of the search strategies, which minimize the objective
+
+    Configurations are evaluated in ask/tell loops, failed evaluations
+    should be reported with an objective of inf.
+    """
+
+    def __init__(self, space: SearchSpace, rng: random.Random) -> None:
+        self.space = space
+        self.rng = rng
+        self.history: List[Candidate] = []
+
+    @property
+    def best(self) -> Optional[Candidate]:
+        if not self.history:
+            return None
+        return min(self.history, key=lambda candidate: candidate.objective)
+
+    @abstractmethod
+    def ask(self) -> GenerateConfig:
+        pass
+
+    def tell(self, config: GenerateConfig, objective: Optional[float]) -> None:
+        if objective is None or math.isnan(objective):
+            objective = math.inf
+        self.history.append(Candidate(config, objective))
+
+
+class RandomSearch(Optimizer):
+    def ask(self) -> GenerateConfig:
+        return self.space.sample(self.rng)
+
+
+class AgingEvolution(Optimizer):
+    """Regularized evolution
+
+    Until the population is complete new configurations are sampled at
+    random. Afterwards the best of sample_size random members of the
+    population is mutated, and the oldest member is removed for each new
+    one.
+    """
+
+    def __init__(
+        self,
+        space: SearchSpace,
+        rng: random.Random,
+        population_size: int = 10,
+        sample_size: int = 3,
+    ) -> None:
+        super().__init__(space, rng)
+        self.population_size = population_size
+        self.sample_size = sample_size
+        self.population: Deque[Candidate] = deque()
+
+    def ask(self) -> GenerateConfig:
+        if len(self.population) < self.population_size:
+            return self.space.sample(self.rng)
+
+        sample = self.rng.sample(
+            list(self.population), min(self.sample_size, len(self.population))
+        )
+        parent = min(sample, key=lambda candidate: candidate.objective)
+        return self.space.mutate(parent.config, self.rng)
+
+    def tell(self, config: GenerateConfig, objective: Optional[float]) -> None:
+        super().tell(config, objective)
+        self.population.append(self.history[-1])
+        if len(self.population) > self.population_size:
+            self.population.popleft()
+
+
+OPTIMIZERS = {"random": RandomSearch, "evolution": AgingEvolution}
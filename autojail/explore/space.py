@@ -0,0 +1,194 @@
+""" Search space of the generate parameters """
+
+import math
+import random
+from typing import Any, List, Optional
+
+from ..model.parameters import (
+    GenerateConfig,
+    GenerateParameters,
+    Partitions,
+    ScalarChoice,
+)
+
+# Choices that are assigned to no partition
+UNASSIGNED = -1
+
+
+def _scalar_bounds(choice: ScalarChoice) -> List[float]:
+    lower = choice.lower if choice.lower is not None else 0.0
+    upper = choice.upper
+    if upper is None:
+        step = choice.step if choice.step is not None else 1.0
+        upper = lower + 100 * step
+    return [lower, upper]
+
+
+def _quantize(choice: ScalarChoice, value: float) -> float:
+    lower, upper = _scalar_bounds(choice)
+    if choice.step:
+        value = lower + round((value - lower) / choice.step) * choice.step
+    value = min(max(value, lower), upper)
+    if choice.integer:
+        value = int(round(value))
+    return value
+
+
+def sample_scalar(choice: ScalarChoice, rng: random.Random) -> float:
+    lower, upper = _scalar_bounds(choice)
+    if choice.log and lower > 0:
+        value = math.exp(rng.uniform(math.log(lower), math.log(upper)))
+    else:
+        value = rng.uniform(lower, upper)
+    return _quantize(choice, value)
+
+
+def mutate_scalar(
+    choice: ScalarChoice, value: float, rng: random.Random
+) -> float:
+    """Gaussian perturbation with 1/6 of the (logarithmic) range as sigma"""
+    lower, upper = _scalar_bounds(choice)
+    if choice.log and lower > 0 and value > 0:
+        sigma = (math.log(upper) - math.log(lower)) / 6
+        mutated = math.exp(rng.gauss(math.log(value), sigma))
+    else:
+        mutated = rng.gauss(value, (upper - lower) / 6)
+
+    mutated = _quantize(choice, mutated)
+    if mutated == value and choice.step:
+        # Move at least one step, away from the bounds
+        direction = rng.choice([-1, 1])
+        mutated = _quantize(choice, value + direction * choice.step)
+        if mutated == value:
+            mutated = _quantize(choice, value - direction * choice.step)
+    return mutated
+
+
+def _groups(partitions: Partitions, assignment: List[int]) -> List[List[Any]]:
+    groups: List[List[Any]] = [[] for _ in range(partitions.partitions)]
+    for choice, group in zip(partitions.choices, assignment):
+        if group != UNASSIGNED:
+            groups[group].append(choice)
+    if not partitions.ordered:
+        groups.sort()
+    return groups
+
+
+def _assignment(partitions: Partitions, groups: List[List[Any]]) -> List[int]:
+    assignment = [UNASSIGNED] * len(partitions.choices)
+    for num, group in enumerate(groups):
+        for choice in group:
+            assignment[partitions.choices.index(choice)] = num
+    return assignment
+
+
+def _valid(partitions: Partitions, assignment: List[int]) -> bool:
+    return all(group in assignment for group in range(partitions.partitions))
+
+
+def sample_partitions(
+    partitions: Partitions, rng: random.Random
+) -> List[List[Any]]:
+    """Random non empty partitions of a subset of the choices"""
+    if partitions.partitions > len(partitions.choices):
+        raise ValueError(
+            f"Can not partition {len(partitions.choices)} choices into {partitions.partitions} partitions"
+        )
+
+    # Every partition gets one choice, the remaining choices are assigned
+    # to a random partition or left unassigned
+    order = list(range(len(partitions.choices)))
+    rng.shuffle(order)
+    assignment = [UNASSIGNED] * len(partitions.choices)
+    for group, index in enumerate(order[: partitions.partitions]):
+        assignment[index] = group
+    for index in order[partitions.partitions :]:
+        assignment[index] = rng.randrange(UNASSIGNED, partitions.partitions)
+
+    return _groups(partitions, assignment)
+
+
+def mutate_partitions(
+    partitions: Partitions, groups: List[List[Any]], rng: random.Random
+) -> List[List[Any]]:
+    """Move one choice to another partition, or swap two choices"""
+    assignment = _assignment(partitions, groups)
+    current = _groups(partitions, assignment)
+    for _try in range(10):
+        mutated = list(assignment)
+        first = rng.randrange(len(mutated))
+        if rng.random() < 0.5:
+            second = rng.randrange(len(mutated))
+            mutated[first], mutated[second] = mutated[second], mutated[first]
+        else:
+            mutated[first] = rng.randrange(UNASSIGNED, partitions.partitions)
+        if not _valid(partitions, mutated):
+            continue
+        # Unordered partitions may be unchanged by a swap of two groups
+        mutated_groups = _groups(partitions, mutated)
+        if mutated_groups != current:
+            return mutated_groups
+
+    return sample_partitions(partitions, rng)
+
+
+class SearchSpace:
+    """Configurations that can be chosen for the GenerateParameters
+
+    The parameters are filled by the configuration passes during prepare,
+    parameters that have not been filled keep their default.
+    """
+
+    DEFAULT_MEM_IO_MERGE_THRESHOLD = 64 * 1024
+
+    def __init__(self, params: GenerateParameters) -> None:
+        self.params = params
+
+    @property
+    def dimensions(self) -> List[str]:
+        return [
+            name
+            for name, value in self.params
+            if isinstance(value, (Partitions, ScalarChoice))
+        ]
+
+    def default(self) -> GenerateConfig:
+        return GenerateConfig(
+            cpu_allocation=[],
+            mem_io_merge_threshold=self.DEFAULT_MEM_IO_MERGE_THRESHOLD,
+        )
+
+    def _sample(self, choice: Any, rng: random.Random) -> Any:
+        if isinstance(choice, Partitions):
+            return sample_partitions(choice, rng)
+        return sample_scalar(choice, rng)
+
+    def sample(self, rng: random.Random) -> GenerateConfig:
+        values = self.default().dict()
+        for name in self.dimensions:
+            values[name] = self._sample(getattr(self.params, name), rng)
+        return GenerateConfig(**values)
+
+    def mutate(
+        self,
+        config: GenerateConfig,
+        rng: random.Random,
+        dimension: Optional[str] = None,
+    ) -> GenerateConfig:
+        """Change a single, by default randomly chosen, dimension"""
+        dimensions = self.dimensions
+        if not dimensions:
+            return config
+        if dimension is None:
+            dimension = rng.choice(dimensions)
+
+        values = config.dict()
+        choice = getattr(self.params, dimension)
+        if isinstance(choice, Partitions):
+            values[dimension] = mutate_partitions(
+                choice, values[dimension], rng
+            )
+        else:
+            values[dimension] = mutate_scalar(choice, values[dimension], rng)
+
+        return GenerateConfig(**values)
@@ -3,11 +3,11 @@ import json
 import logging
 from collections import OrderedDict
 from pathlib import Path, PosixPath
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from autojail.model.board import ParentClockInfo
 
-from ..model import GIC, Board, Clock, MemoryRegion
+from ..model import GIC, Board, Clock, InterruptStats, MemoryRegion
 from ..utils.draw_tree import draw_tree
 from .device_tree import DeviceTreeExtractor
 
@@ -123,6 +123,56 @@ class BoardInfoExtractor:
                             pagesize = int(value)
         return pagesize
 
+    def read_interrupts(self, filename: Path) -> Dict[int, InterruptStats]:
+        """Counts of the GIC interrupts by their jailhouse interrupt number
+
+        Interrupts of other chips, e.g. MSIs or GPIOs, and the IPIs are
+        not routed through the GIC distributor, so they are ignored.
+        """
+        interrupts = {}
+        if not filename.exists():
+            return interrupts
+
+        with filename.open() as interrupts_data:
+            lines = interrupts_data.readlines()
+        if not lines:
+            return interrupts
+
+        num_cpus = len(lines[0].split())
+        for line in lines[1:]:
+            irq, _sep, rest = line.partition(":")
+            irq = irq.strip()
+            if not irq.isdigit():
+                continue
+
+            fields = rest.split(None, num_cpus)
+            if len(fields) <= num_cpus:
+                continue
+            counts = [int(count) for count in fields[:num_cpus]]
+
+            chip_fields = fields[num_cpus].split(None, 3)
+            if len(chip_fields) < 3 or not chip_fields[0].startswith("GIC"):
+                continue
+            if not chip_fields[1].isdigit():
+                continue
+
+            interrupts[int(chip_fields[1])] = InterruptStats(
+                irq=int(irq),
+                counts=counts,
+                trigger=chip_fields[2],
+                name=chip_fields[3].strip() if len(chip_fields) > 3 else "",
+            )
+
+        return interrupts
+
+    def read_uptime(self, filename: Path) -> Optional[float]:
+        if not filename.exists():
+            return None
+
+        with filename.open() as uptime_data:
+            fields = uptime_data.read().split()
+        return float(fields[0]) if fields else None
+
     def extract_cpuinfo(self) -> List[Any]:
         path = self.data_root / "proc" / "cpuinfo"
 
@@ -242,6 +292,7 @@ class BoardInfoExtractor:
             extractor.interrupt_controllers,
             extractor.stdout_path,
             {x.name: x for x in extractor.cpus},
+            extractor.caches,
             extractor.devices,
         )
 
@@ -291,6 +342,7 @@ class BoardInfoExtractor:
             interrupt_controllers,
             stdout_path,
             cpuinfo_dt,
+            caches,
             devices,
         ) = self.extract_from_devicetree(memory_regions)
 
@@ -312,6 +364,10 @@ class BoardInfoExtractor:
         )
         ip_info = self._extract_ip_info()
         hw_info = self._extract_hw_info()
+        interrupt_stats = self.read_interrupts(
+            self.data_root / "proc" / "interrupts"
+        )
+        uptime = self.read_uptime(self.data_root / "proc" / "uptime")
 
         board = Board(
             name=self.name,
@@ -320,12 +376,15 @@ class BoardInfoExtractor:
             pagesize=pagesize,
             interrupt_controllers=interrupt_controllers,
             cpuinfo=cpuinfo,
+            caches=caches,
             stdout_path=stdout_path,
             clock_tree=clocks,
             devices=devices,
             clock_mapping=clock_mapping,
             ip_info=ip_info,
             hw_info=hw_info,
+            interrupt_stats=interrupt_stats,
+            uptime=uptime,
         )
 
         return board
@@ -1,6 +1,8 @@
 import logging
+import shutil
 import subprocess
 from pathlib import Path
+from typing import Optional, Tuple
 
 from ..model import AutojailConfig
 
@@ -8,21 +10,51 @@ MODULE_DIR = Path(__file__).parent.absolute() / "clocks"
 
 
 class ClockInfoExtractor:
-    def __init__(self, config: AutojailConfig):
+    """Extracts the clock configuration of a running target with a kernel module
+
+    The module only depends on the target kernel, so a prepared extractor
+    can be shared by all boards with the same kernel_key. Extractors for
+    different kernels should use separate module_dirs.
+    """
+
+    def __init__(
+        self, config: AutojailConfig, module_dir: Optional[Path] = None
+    ):
         self.config = config
+        self.module_dir = (
+            Path(module_dir).absolute() if module_dir else MODULE_DIR
+        )
+        self.prepared = False
 
         self.logger = logging.getLogger()
 
+    @staticmethod
+    def kernel_key(config: AutojailConfig) -> Tuple[str, str, str]:
+        return (
+            config.arch.lower(),
+            config.cross_compile,
+            str(Path(config.kernel_dir).absolute()),
+        )
+
     def prepare(self):
+        if self.prepared:
+            return
+
         self.logger.info("Building Kernel Module for target")
 
+        if self.module_dir != MODULE_DIR:
+            self.module_dir.mkdir(exist_ok=True, parents=True)
+            for source in ["Makefile", "extract-clocks.c"]:
+                shutil.copy(MODULE_DIR / source, self.module_dir / source)
+
         clean_command = [
             "make",
             "-C",
-            f"{MODULE_DIR}",
+            f"{self.module_dir}",
             f"ARCH={self.config.arch.lower()}",
             f"CROSS_COMPILE={self.config.cross_compile}",
             f"KDIR={Path(self.config.kernel_dir).absolute()}",
+            "clean",
         ]
 
         ret = subprocess.run(
@@ -36,7 +68,7 @@ class ClockInfoExtractor:
         compile_command = [
             "make",
             "-C",
-            f"{MODULE_DIR}",
+            f"{self.module_dir}",
             f"ARCH={self.config.arch.lower()}",
             f"CROSS_COMPILE={self.config.cross_compile}",
             f"KDIR={Path(self.config.kernel_dir).absolute()}",
@@ -48,8 +80,10 @@ class ClockInfoExtractor:
             self.logger.info(ret.stdout)
             self.logger.info(ret.stderr)
 
+        self.prepared = True
+
     def start(self, connection):
-        module_local = MODULE_DIR / "extract-clocks.ko"
+        module_local = self.module_dir / "extract-clocks.ko"
         if not module_local.exists():
             self.logger.warning("Kernel module does not exist")
 
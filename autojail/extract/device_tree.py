@@ -3,7 +3,7 @@ import subprocess
 from collections import OrderedDict, defaultdict
 from pathlib import Path
 from tempfile import mktemp
-from typing import Any, List, MutableMapping, Set, Tuple, Union
+from typing import Any, Dict, List, MutableMapping, Optional, Set, Tuple, Union
 
 import fdt
 import tabulate
@@ -15,6 +15,7 @@ from autojail.model.board import Interrupt
 from ..model import (
     CPU,
     GIC,
+    Cache,
     Device,
     DeviceData,
     DeviceMemoryRegion,
@@ -94,9 +95,18 @@ class DeviceTreeExtractor:
             str, MemoryRegionData
         ] = OrderedDict()
         self.devices: MutableMapping[str, DeviceData] = OrderedDict()
+        self.region_name_counters: MutableMapping[str, int] = defaultdict(int)
+        self.device_name_counters: MutableMapping[str, int] = defaultdict(int)
         self.interrupt_controllers: List[GIC] = []
         self.stdout_path: str = ""
         self.cpus: List[CPU] = []
+        self.caches: MutableMapping[str, Cache] = OrderedDict()
+        self.cache_name_counters: MutableMapping[str, int] = defaultdict(int)
+
+        # Lookup tables for the cache and cpu-map references
+        self.phandles: Dict[int, Node] = {}
+        self.cpu_phandles: Dict[int, CPU] = {}
+        self.cache_phandles: Dict[int, str] = {}
 
         self.logger = getLogger()
 
@@ -207,25 +217,44 @@ class DeviceTreeExtractor:
 
         return list(current_state.ranges)
 
+    def _unique_name(
+        self,
+        orig_name: str,
+        names: MutableMapping[str, Any],
+        counters: MutableMapping[str, int],
+    ) -> str:
+        """Returns orig_name or the first free orig_name.<n>
+
+        The counters remember the next candidate suffix for each name,
+        so repeated node names do not rescan all previous suffixes.
+        """
+        if orig_name not in names:
+            return orig_name
+
+        count = counters[orig_name]
+        name = orig_name + "." + str(count)
+        while name in names:
+            count += 1
+            name = orig_name + "." + str(count)
+        counters[orig_name] = count + 1
+
+        return name
+
     def _insert_named_region(
         self, orig_name: str, region: MemoryRegionData
     ) -> None:
-        count = 0
-        name = orig_name
         region.name = orig_name
-        while name in self.memory_regions:
-            name = orig_name + "." + str(count)
-            count += 1
+        name = self._unique_name(
+            orig_name, self.memory_regions, self.region_name_counters
+        )
 
         self.memory_regions[name] = region
 
     def _insert_named_device(self, orig_name: str, device: DeviceData):
-        count = 0
-        name = orig_name
         device.name = orig_name
-        while name in self.devices:
-            name = orig_name + "." + str(count)
-            count += 1
+        name = self._unique_name(
+            orig_name, self.devices, self.device_name_counters
+        )
 
         self.devices[name] = device
 
@@ -581,14 +610,66 @@ class DeviceTreeExtractor:
                         )
                     )
 
+    def _collect_phandles(self) -> None:
+        worklist = [self.fdt.root]
+        while worklist:
+            node = worklist.pop()
+            phandle = node.get_property("phandle")
+            if phandle is not None:
+                self.phandles[phandle.value] = node
+            worklist.extend(node.nodes)
+
+    def _property_value(self, node: Node, name: str) -> Optional[int]:
+        prop = node.get_property(name)
+        if prop is None:
+            return None
+        return prop.value
+
+    def _extract_cache(self, node: Node) -> Optional[str]:
+        """Returns the name of the cache referenced by next-level-cache
+
+        The referenced caches are added to self.caches on first use.
+        """
+        phandle = self._property_value(node, "next-level-cache")
+        if phandle is None:
+            return None
+
+        if phandle in self.cache_phandles:
+            return self.cache_phandles[phandle]
+
+        cache_node = self.phandles.get(phandle)
+        if cache_node is None:
+            self.logger.warning(
+                "Could not find next-level-cache of %s", node.name
+            )
+            return None
+
+        name = self._unique_name(
+            cache_node.name, self.caches, self.cache_name_counters
+        )
+        self.cache_phandles[phandle] = name
+
+        sets = self._property_value(cache_node, "cache-sets")
+        linesize = self._property_value(cache_node, "cache-line-size")
+        self.caches[name] = Cache(
+            name=name,
+            next_level_cache=None,
+            waysize=sets * linesize if sets and linesize else None,
+            sets=sets,
+            linesize=linesize,
+            size=self._property_value(cache_node, "cache-size"),
+            level=self._property_value(cache_node, "cache-level"),
+        )
+        self.caches[name].next_level_cache = self._extract_cache(cache_node)
+
+        return name
+
     def _extract_cpu(self, node):
         name = node.name
         num = node.get_property("reg")[0]
         compatible = node.get_property("compatible").value
         enable_method = node.get_property("enable-method").value
-        next_level_cache = None
-
-        # node.get_property('next-level-cache')
+        next_level_cache = self._extract_cache(node)
 
         cpu = CPU(
             name=name,
@@ -599,6 +680,43 @@ class DeviceTreeExtractor:
         )
         self.cpus.append(cpu)
 
+        phandle = self._property_value(node, "phandle")
+        if phandle is not None:
+            self.cpu_phandles[phandle] = cpu
+
+    def _extract_cpu_map(self) -> None:
+        """Assign the clusters of the cpu-map to the cpus
+
+        Leaf nodes (cores or threads) reference their cpu, the cluster of
+        a cpu is the path of the enclosing socket and cluster nodes.
+        """
+        if not self.fdt.exist_node("/cpus/cpu-map"):
+            return
+
+        worklist: List[Tuple[Node, List[str]]] = [
+            (self.fdt.get_node("/cpus/cpu-map"), [])
+        ]
+        while worklist:
+            node, path = worklist.pop()
+            phandle = self._property_value(node, "cpu")
+            if phandle is not None:
+                cpu = self.cpu_phandles.get(phandle)
+                if cpu is None:
+                    self.logger.warning(
+                        "Could not find cpu of cpu-map entry %s", node.name
+                    )
+                    continue
+                clusters = [
+                    name
+                    for name in path
+                    if name.startswith("cluster") or name.startswith("socket")
+                ]
+                cpu.cluster = "/".join(clusters) if clusters else None
+                continue
+
+            for child in node.nodes:
+                worklist.append((child, path + [child.name]))
+
     def _add_interrupts(self) -> None:
         interrupts: Set[int] = set()
         for device in self.devices.values():
@@ -705,6 +823,7 @@ class DeviceTreeExtractor:
                     cpu.next_level_cache
                     if cpu.next_level_cache is not None
                     else "--",
+                    cpu.cluster if cpu.cluster is not None else "--",
                 ]
             )
         self.logger.info("")
@@ -719,16 +838,48 @@ class DeviceTreeExtractor:
                     "Compatible",
                     "Enable Method",
                     "Next Level Cache",
+                    "Cluster",
                 ],
             ),
         )
 
+        if self.caches:
+            cache_table = [
+                [
+                    cache.name,
+                    cache.level if cache.level is not None else "--",
+                    cache.size if cache.size is not None else "--",
+                    cache.waysize if cache.waysize is not None else "--",
+                    cache.next_level_cache
+                    if cache.next_level_cache is not None
+                    else "--",
+                ]
+                for cache in self.caches.values()
+            ]
+            self.logger.info("")
+            self.logger.info("Extracted Caches:")
+            self.logger.info(
+                "\n%s",
+                tabulate.tabulate(
+                    cache_table,
+                    headers=[
+                        "Name",
+                        "Level",
+                        "Size",
+                        "Way Size",
+                        "Next Level Cache",
+                    ],
+                ),
+            )
+
         self.logger.info("stdout-path: %s", self.stdout_path)
 
     def run(self) -> None:
         self._extract_stdout()
         self._extract_aliases()
+        self._collect_phandles()
         self._walk_tree()
+        self._extract_cpu_map()
         self._add_interrupts()
 
         self.memory_regions = OrderedDict(
@@ -1,7 +1,8 @@
 # FIXME:  Dicts should be replaced by OrderedDict when 3.6 support is dropped
-from typing import Any, Dict, List, Optional, Union
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from .datatypes import ByteSize, ExpressionInt, HexInt, IntegerList
 
@@ -37,6 +38,7 @@ class MemoryRegionData(DTNode):
     flags: List[str] = []
     allocatable: bool = False
     shared: bool = False
+    colors: Optional[HexInt] = None  # Bitmap of the allowed cache colors
 
 
 class MemoryRegion(MemoryRegionData):
@@ -119,6 +121,9 @@ class HypervisorMemoryRegion(MemoryRegion):
 class ShMemNetRegion(BaseModel):
     start_addr: HexInt
     device_id: int
+    # Size of each output region, defaults to the layout of
+    # JAILHOUSE_SHMEM_NET_REGIONS
+    output_size: Optional[ByteSize] = None
 
     @property
     def virtual_start_addr(self):
@@ -130,7 +135,7 @@ class ShMemNetRegion(BaseModel):
 
     @property
     def size(self):
-        return 0x1000 + 2 * 0x7F000
+        return 0x1000 + 2 * int(self.output_size or 0x7F000)
 
     @property
     def flags(self):
@@ -140,6 +145,33 @@ class ShMemNetRegion(BaseModel):
     def allocatable(self):
         return False
 
+    def regions(self) -> List[MemoryRegion]:
+        """State table, read write and output regions of the link"""
+        output_size = int(self.output_size or 0x7F000)
+        regions = [
+            MemoryRegion(
+                physical_start_addr=self.start_addr,
+                virtual_start_addr=self.start_addr,
+                size=0x1000,
+                flags=["MEM_READ", "MEM_ROOTSHARED"],
+            ),
+            MemoryRegion(size=0),
+        ]
+        for device_id in range(2):
+            start_addr = self.start_addr + 0x1000 + device_id * output_size
+            flags = ["MEM_READ", "MEM_ROOTSHARED"]
+            if device_id == self.device_id:
+                flags.append("MEM_WRITE")
+            regions.append(
+                MemoryRegion(
+                    physical_start_addr=start_addr,
+                    virtual_start_addr=start_addr,
+                    size=output_size,
+                    flags=flags,
+                )
+            )
+        return regions
+
 
 class GIC(BaseModel):
     maintenance_irq: ExpressionInt
@@ -177,6 +209,8 @@ class CPU(BaseModel):
     compatible: str
     enable_method: str
     next_level_cache: Optional[str]
+    # cluster from the cpu-map e.g. cluster0 or socket0/cluster1
+    cluster: Optional[str] = None
 
 
 class Cache(BaseModel):
@@ -185,6 +219,29 @@ class Cache(BaseModel):
     waysize: Optional[int]
     sets: Optional[int]
     linesize: Optional[int]
+    size: Optional[int] = None
+    level: Optional[int] = None
+
+
+class InterruptStats(BaseModel):
+    """Counts of a GIC interrupt from /proc/interrupts"""
+
+    irq: int  # Linux irq number
+    counts: List[int]  # interrupts handled by each cpu
+    trigger: str = ""
+    name: str = ""
+
+
+class DRAMMapping(BaseModel):
+    """Mapping of physical addresses to DRAM channels, ranks and banks
+
+    Each bit of a field is the parity of the physical address masked with
+    the corresponding mask, the least significant bit comes first.
+    """
+
+    channel: List[HexInt] = []
+    rank: List[HexInt] = []
+    bank: List[HexInt] = []
 
 
 class SimpleBus(BaseModel):
@@ -206,12 +263,122 @@ class Board(BaseModel):
     virtual_address_bits: int = 48  # FIXME: that seems correct for most ARM64 Boards
     memory_regions: Dict[str, Union[DeviceMemoryRegion, MemoryRegion]]
     cpuinfo: Dict[str, CPU]
+    caches: Dict[str, Cache] = {}
+    dram_mapping: Optional[DRAMMapping] = None
     interrupt_controllers: List[GIC] = []
     clock_tree: Dict[str, Clock] = {}
     clock_mapping: Dict[str, List[ParentClockInfo]] = {}
 
+    # Interrupt counts by GIC interrupt id, and the uptime they were
+    # counted in seconds
+    interrupt_stats: Dict[int, InterruptStats] = {}
+    uptime: Optional[float] = None
+
     # This dict contains all devices (MemoryMapped Devices are represented by DeviceMemoryRegion, Devices without memory mapping or represnted by Device)
     devices: Dict[str, Union[Device, DeviceMemoryRegion]] = {}
     # TODO: generate structured formats for hw_info, and ipinfo
     ip_info: List[Dict[str, Any]] = []
     hw_info: List[Dict[str, Any]] = []
+
+    _index: Optional["BoardIndex"] = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> "BoardIndex":
+        """Secondary lookup tables for devices, built on first use"""
+        if self._index is None:
+            self._index = BoardIndex(self)
+        return self._index
+
+
+NamedDevice = Tuple[str, Union[Device, DeviceMemoryRegion]]
+
+
+class BoardIndex:
+    """Lookup tables for the devices of a board
+
+    Device trees of larger SoCs contain several hundred nodes, so the
+    configuration passes should not search them linearly. If several
+    devices share a key, lookups return the first one in board order.
+    """
+
+    def __init__(self, board: Board) -> None:
+        self._phandles: Dict[int, NamedDevice] = {}
+        self._paths: Dict[str, NamedDevice] = {}
+        self._aliases: Dict[str, NamedDevice] = {}
+        self._compatibles: Dict[str, List[NamedDevice]] = defaultdict(list)
+        self._positions: Dict[str, int] = {}
+
+        # Memory mapped devices by alias or path, the names and
+        # objects are the ones from board.memory_regions
+        self._mapped_devices: Dict[str, Tuple[str, DeviceMemoryRegion]] = {}
+
+        for position, (name, device) in enumerate(board.devices.items()):
+            self._positions[name] = position
+            if device.phandle is not None:
+                self._phandles.setdefault(device.phandle, (name, device))
+            if device.path is not None:
+                self._paths.setdefault(device.path, (name, device))
+            for alias in device.aliases:
+                self._aliases.setdefault(alias, (name, device))
+            for compatible in device.compatible:
+                self._compatibles[compatible].append((name, device))
+
+        for name, region in board.memory_regions.items():
+            if not isinstance(region, DeviceMemoryRegion):
+                continue
+            keys = list(region.aliases)
+            if region.path is not None:
+                keys.append(region.path)
+            for key in keys:
+                self._mapped_devices.setdefault(key, (name, region))
+
+        # Flattened clock tree, traversed in the same order as the
+        # previous linear searches so that duplicate names resolve
+        # to the same clock
+        self._clocks: Dict[str, Clock] = {}
+        worklist = list(board.clock_tree.values())
+        while worklist:
+            clock = worklist.pop()
+            self._clocks.setdefault(clock.name, clock)
+            worklist.extend(clock.derived_clocks.values())
+
+    def by_phandle(self, phandle: int) -> Optional[NamedDevice]:
+        return self._phandles.get(phandle)
+
+    def by_path(self, path: str) -> Optional[NamedDevice]:
+        return self._paths.get(path)
+
+    def by_alias(self, alias: str) -> Optional[NamedDevice]:
+        return self._aliases.get(alias)
+
+    def by_compatible(self, compatible: str) -> List[NamedDevice]:
+        return self._compatibles.get(compatible, [])
+
+    def first_compatible(
+        self, compatibles: Iterable[str]
+    ) -> Optional[NamedDevice]:
+        """Returns the first device in board order matching any of compatibles"""
+        candidates = [
+            self._compatibles[c][0]
+            for c in compatibles
+            if c in self._compatibles
+        ]
+        if not candidates:
+            return None
+
+        return min(candidates, key=lambda item: self._positions[item[0]])
+
+    def mapped_device(
+        self, name: str
+    ) -> Tuple[Optional[str], Optional[DeviceMemoryRegion]]:
+        """Find a memory mapped device in board.memory_regions by alias or path"""
+        return self._mapped_devices.get(name, (None, None))
+
+    def clock(self, name: str) -> Optional[Clock]:
+        return self._clocks.get(name)
+
+    def clock_parent(self, name: str) -> Optional[Clock]:
+        clock = self._clocks.get(name)
+        if clock is None or clock.parent is None:
+            return None
+        return self._clocks.get(clock.parent)
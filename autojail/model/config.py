@@ -73,6 +73,22 @@ class AutojailArch(str):
         return cls(v)
 
 
+class TargetBoard(BaseModel):
+    """Additional board of a pool of identical boards used for testing
+
+    Commands that are not given are taken from the autojail config.
+    """
+
+    login: AutojailLogin
+    password: Optional[str] = None
+    reset_command: List[str] = []
+    start_command: List[str] = []
+    stop_command: List[str] = []
+    # Serial console of the board, the console of the autojail config
+    # is only used for the board of its login
+    uart: Optional[str] = None
+
+
 class AutojailConfig(BaseModel):
     name: str
     board: str
@@ -92,3 +108,4 @@ class AutojailConfig(BaseModel):
     reset_command: List[str] = []
     start_command: List[str] = []
     stop_command: List[str] = []
+    test_pool: List[TargetBoard] = []
@@ -69,6 +69,8 @@ class PlatformInfo(BaseModel):
     pci_is_virtual: bool
     pci_domain: int
     pci_mmconfig_base: Optional[HexInt]
+    color_way_size: Optional[HexInt] = None
+    color_root_map_offset: Optional[HexInt] = None
     arch: Union[PlatformInfoArm, PlatformInfoX86, None] = None
 
 
@@ -171,10 +173,15 @@ class CellConfig(BaseModel):
     debug_console: Union[str, DebugConsole]
     platform_info: Optional[PlatformInfo]
     cpus: Optional[IntegerList]
+    cpu_placement: Literal["any", "isolated", "packed"] = "any"
+    cache_colors: Optional[int] = None
+    dram_banks: Optional[int] = None
     memory_regions: Optional[
         Dict[str, Union[str, ShMemNetRegion, MemoryRegion, DeviceMemoryRegion]]
     ] = {}
     irqchips: Optional[Dict[str, IRQChip]] = {}
+    irq_affinity: Dict[int, List[int]] = {}
+    start_after: List[str] = []
     pci_devices: Optional[Dict[str, PCIDevice]] = {}
     image_path: Optional[Path] = None
 
@@ -196,6 +203,8 @@ class InterfaceConfig(BaseModel):
 class ShmemConfigNet(ShmemConfig):
     protocol: Literal["SHMEM_PROTO_VETH"]
     network: Union[List[IPvAnyNetwork], Dict[str, InterfaceConfig]] = {}
+    state_table_size: Optional[ByteSize] = None
+    huge_pages: bool = False
 
 
 class JailhouseConfig(BaseModel):
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -11,6 +11,14 @@ class TestEntry(BaseModel):
     script: ScriptList
     check: CheckDict = Field(default_factory=dict)
     log: LogDict = Field(default_factory=dict)
+    fail: CheckDict = Field(default_factory=dict)
+    histogram: List[str] = Field(default_factory=list)
+    outlier_threshold: Optional[int] = None
+    cell_stats: List[str] = Field(default_factory=list)
+    timeout: Optional[int] = None
+    # Output files are created by the test and removed before it runs,
+    # other output files are only followed from their current end
+    remove_outputs: bool = False
 
 
 class TestConfig(BaseModel):
@@ -1,3 +1,4 @@
+from .pool import BoardPoolRunner
 from .runner import TestRunner
 
-__all__ = ["TestRunner"]
+__all__ = ["BoardPoolRunner", "TestRunner"]
@@ -0,0 +1,91 @@
+""" Boot milestones of hypervisor and cells from the serial console """
+
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+_cell_milestones: List[Tuple[str, Pattern]] = [
+    ("created", re.compile(r'Created cell "(?P<cell>[^"]+)"')),
+    ("loadable", re.compile(r'Cell "(?P<cell>[^"]+)" can be loaded')),
+    ("started", re.compile(r'Started cell "(?P<cell>[^"]+)"')),
+    ("closed", re.compile(r'Closing cell "(?P<cell>[^"]+)"')),
+]
+
+_hypervisor_milestones: List[Tuple[str, Pattern]] = [
+    ("init", re.compile(r"Initializing Jailhouse hypervisor")),
+    ("activated", re.compile(r"Activating hypervisor")),
+    ("shutdown", re.compile(r"Shutting down hypervisor")),
+]
+
+# Milestones of linux inmates, attributed to the last started cell
+_linux_milestones: List[Tuple[str, Pattern]] = [
+    ("kernel", re.compile(r"Booting Linux on physical CPU")),
+    ("init", re.compile(r"Run (/sbin/init|/init|/etc/init|/bin/sh)")),
+    ("login", re.compile(r"login:")),
+]
+
+# Metric name, start milestone and end milestone
+_hypervisor_metrics = [
+    ("hypervisor_enable_time", "init", "activated"),
+]
+_cell_metrics = [
+    ("setup_time", "created", "loadable"),
+    ("load_time", "loadable", "started"),
+    ("kernel_start_time", "started", "kernel"),
+    ("kernel_boot_time", "kernel", "init"),
+    ("userspace_boot_time", "init", "login"),
+    ("boot_time", "started", "login"),
+]
+
+
+def metric_prefix(cell: str) -> str:
+    return re.sub(r"\W", "_", cell.lower())
+
+
+class BootLog:
+    """Milestones found in the timestamped lines of a console log
+
+    Only the first occurrence of each milestone is used, so each section
+    of the log should cover a single start of the hypervisor.
+    """
+
+    def __init__(self, lines: List[Tuple[float, str]]) -> None:
+        self.hypervisor: Dict[str, float] = {}
+        self.cells: Dict[str, Dict[str, float]] = {}
+
+        current_cell: Optional[str] = None
+        for timestamp, line in lines:
+            for name, pattern in _hypervisor_milestones:
+                if pattern.search(line):
+                    self.hypervisor.setdefault(name, timestamp)
+
+            for name, pattern in _cell_milestones:
+                match = pattern.search(line)
+                if match:
+                    cell = match.group("cell")
+                    self.cells.setdefault(cell, {}).setdefault(name, timestamp)
+                    if name == "started":
+                        current_cell = cell
+
+            if current_cell is not None:
+                for name, pattern in _linux_milestones:
+                    if pattern.search(line):
+                        self.cells[current_cell].setdefault(name, timestamp)
+
+    def metrics(self) -> Dict[str, float]:
+        """Durations between milestones in milliseconds"""
+        metrics = {}
+        for metric, start, end in _hypervisor_metrics:
+            if start in self.hypervisor and end in self.hypervisor:
+                metrics[metric] = 1000.0 * (
+                    self.hypervisor[end] - self.hypervisor[start]
+                )
+
+        for cell, milestones in self.cells.items():
+            prefix = metric_prefix(cell)
+            for metric, start, end in _cell_metrics:
+                if start in milestones and end in milestones:
+                    metrics[f"{prefix}_{metric}"] = 1000.0 * (
+                        milestones[end] - milestones[start]
+                    )
+
+        return metrics
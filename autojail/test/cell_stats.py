@@ -0,0 +1,75 @@
+""" VM exit rates from snapshots of the jailhouse cell statistics """
+
+from typing import Dict, Iterable, Tuple
+
+from .boot_log import metric_prefix
+
+# Prints one tab separated line per cell, cpu and counter of the
+# statistics in sysfs, which are also shown by jailhouse-cell-stats
+SNAPSHOT_FUNCTION = (
+    "cell_stats() { time=$(date +%s.%N); "
+    "for cell in /sys/devices/jailhouse/cells/*/; do "
+    'name=$(cat "${cell}name"); '
+    'for file in "${cell}"statistics/cpu*/vmexits_*; do '
+    'test -e "$file" || continue; '
+    'cpu=$(basename "$(dirname "$file")"); '
+    "printf '%s\\t%s\\t%s\\t%s\\t%s\\t%s\\n' "
+    '"$1" "$time" "$name" "${cpu#cpu}" "$(basename "$file")" "$(cat "$file")"; '
+    "done; done; }"
+)
+
+CounterKey = Tuple[str, str, str]
+
+
+class CellStats:
+    """Snapshots of the vm exit counters of all cells and cpus
+
+    Each line of a snapshot has the fields label, time, cell, cpu, counter
+    and value separated by tabs, as printed by SNAPSHOT_FUNCTION.
+    """
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self.times: Dict[str, float] = {}
+        self.snapshots: Dict[str, Dict[CounterKey, int]] = {}
+
+        for line in lines:
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) != 6:
+                continue
+            label, time, cell, cpu, counter, value = fields
+            try:
+                self.times.setdefault(label, float(time))
+                self.snapshots.setdefault(label, {})[
+                    (cell, cpu, counter)
+                ] = int(value)
+            except ValueError:
+                continue
+
+    def rates(
+        self, before: str = "before", after: str = "after"
+    ) -> Dict[str, float]:
+        """VM exits per second between two snapshots
+
+        Rates are reported per cell and cpu as
+        <cell>_cpu<cpu>_<counter>_rate, and summed over the cpus of
+        each cell as <cell>_<counter>_rate.
+        """
+        if before not in self.snapshots or after not in self.snapshots:
+            return {}
+
+        duration = self.times[after] - self.times[before]
+        if duration <= 0:
+            return {}
+
+        rates: Dict[str, float] = {}
+        start = self.snapshots[before]
+        for (cell, cpu, counter), value in self.snapshots[after].items():
+            if (cell, cpu, counter) not in start:
+                continue
+            rate = (value - start[(cell, cpu, counter)]) / duration
+            prefix = metric_prefix(cell)
+            rates[f"{prefix}_cpu{cpu}_{counter}_rate"] = rate
+            total = f"{prefix}_{counter}_rate"
+            rates[total] = rates.get(total, 0.0) + rate
+
+        return rates
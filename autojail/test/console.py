@@ -0,0 +1,119 @@
+""" Background capture of the serial console of the target board """
+
+import datetime
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from ..utils.logging import getLogger
+from ..utils.serial import open_serial
+
+
+class ConsoleCapture:
+    """Records the serial console of the target board while tests are running
+
+    The console is read by a daemon thread, so a console that stops
+    sending never blocks the test run. As the console does not depend on
+    the network of the target, it keeps recording when the target is not
+    reachable by ssh. Each line is stored with the monotonic time it was
+    received, and written to the log prefixed with the seconds since the
+    start of the capture. mark() starts a new named section, e.g. for
+    each test, whose lines are returned by section() and section_lines().
+    """
+
+    READ_TIMEOUT = 0.5
+
+    def __init__(self, url: str, log_path: Optional[Path] = None) -> None:
+        self.url = url
+        self.log_path = log_path
+        self.lines: List[Tuple[float, str]] = []
+        self.logger = getLogger()
+
+        self._marks: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._port: Any = None
+        self._log: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = time.monotonic()
+
+    def start(self) -> None:
+        self._port = open_serial(self.url, timeout=self.READ_TIMEOUT)
+        self._started = time.monotonic()
+        if self.log_path is not None:
+            self.log_path.parent.mkdir(exist_ok=True, parents=True)
+            self._log = self.log_path.open("a")
+            started = datetime.datetime.now().isoformat(timespec="seconds")
+            self._log.write(f"==> console {self.url} at {started} <==\n")
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.READ_TIMEOUT)
+        try:
+            self._port.close()
+        except Exception:
+            pass
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def mark(self, name: str) -> None:
+        with self._lock:
+            self._marks.append((name, len(self.lines)))
+            if self._log is not None:
+                self._log.write(f"==> {name} <==\n")
+                self._log.flush()
+
+    def section_lines(self, name: str) -> List[Tuple[float, str]]:
+        """Timestamped console lines from mark(name) to the next mark"""
+        with self._lock:
+            for num, (mark, start) in enumerate(self._marks):
+                if mark == name:
+                    end = (
+                        self._marks[num + 1][1]
+                        if num + 1 < len(self._marks)
+                        else len(self.lines)
+                    )
+                    return self.lines[start:end]
+        return []
+
+    def section(self, name: str) -> str:
+        """Console output from mark(name) to the next mark"""
+        return "".join(line + "\n" for _time, line in self.section_lines(name))
+
+    def _append(self, line: str) -> None:
+        with self._lock:
+            timestamp = time.monotonic()
+            self.lines.append((timestamp, line))
+            if self._log is not None:
+                self._log.write(f"[{timestamp - self._started:12.6f}] {line}\n")
+                self._log.flush()
+
+    def _read(self) -> None:
+        partial = ""
+        while not self._stop.is_set():
+            try:
+                data = self._port.readline()
+            except Exception as e:
+                if not self._stop.is_set():
+                    self.logger.warning("Console capture stopped: %s", str(e))
+                break
+            if not data:
+                if isinstance(data, str):
+                    # End of file on sockets
+                    break
+                continue
+            if isinstance(data, bytes):
+                data = data.decode("utf-8", "replace")
+
+            partial += data
+            if partial.endswith("\n"):
+                self._append(partial.rstrip("\r\n"))
+                partial = ""
+
+        if partial:
+            self._append(partial.rstrip("\r\n"))
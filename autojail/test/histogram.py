@@ -0,0 +1,165 @@
+""" Latency distributions from cyclictest histograms """
+
+import re
+from pathlib import PurePosixPath
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+PERCENTILES = (50.0, 99.0, 99.9, 99.99)
+
+_summary_re = re.compile(r"#\s*(?P<name>[A-Za-z ]+):\s*(?P<values>[-0-9 \t]*)$")
+
+
+def histogram_cell(file: str) -> str:
+    """Cell of a histogram file
+
+    The generated tests write /tmp/cyclictest_<cell>.hist, other files
+    are identified by their name.
+    """
+    name = PurePosixPath(file).stem
+    if name.startswith("cyclictest_"):
+        return name[len("cyclictest_") :]
+    return name
+
+
+def percentile_name(q: float) -> str:
+    """Metric name of a percentile, e.g. p99_9_latency for 99.9"""
+    return "p" + f"{q:g}".replace(".", "_") + "_latency"
+
+
+@dataclass
+class LatencyHistogram:
+    """Latency distribution of the measurement threads of one cyclictest run
+
+    counts has one row per histogram bucket and one column per thread,
+    samples above the largest bucket are only counted in overflows.
+    """
+
+    latencies: np.ndarray
+    counts: np.ndarray
+    overflows: np.ndarray
+    max_latencies: Optional[np.ndarray] = None
+
+    @property
+    def threads(self) -> int:
+        return self.counts.shape[1]
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self.counts.sum(axis=0) + self.overflows
+
+    def percentiles(self, q: Sequence[float] = PERCENTILES) -> np.ndarray:
+        """Latency percentiles with shape (len(q), threads)
+
+        Percentiles falling into the overflow region are reported as the
+        maximum latency of the thread, or inf if it is unknown.
+        """
+        quantiles = np.asarray(q, dtype=float)
+        if not len(self.latencies):
+            return np.full((len(quantiles), self.threads), np.nan)
+
+        cumulative = self.counts.cumsum(axis=0)
+        targets = np.ceil(quantiles[:, None] / 100.0 * self.samples[None, :])
+        targets = np.maximum(targets, 1)
+
+        # First bucket whose cumulative count reaches the target
+        reached = cumulative[None, :, :] >= targets[:, None, :]
+        index = reached.argmax(axis=1)
+        result = self.latencies[index].astype(float)
+
+        overflow = ~reached.any(axis=1)
+        if self.max_latencies is not None:
+            maximum = np.broadcast_to(
+                self.max_latencies.astype(float), result.shape
+            )
+        else:
+            maximum = np.full(result.shape, np.inf)
+        result[overflow] = maximum[overflow]
+        result[:, self.samples == 0] = np.nan
+
+        return result
+
+    def outliers(self, threshold: Optional[float] = None) -> np.ndarray:
+        """Number of samples above threshold, including the overflows"""
+        outliers = self.overflows.copy()
+        if threshold is not None:
+            outliers += self.counts[self.latencies > threshold].sum(axis=0)
+        return outliers
+
+    def cdf(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Bucket latencies and the cumulative fraction of samples per thread
+
+        Both arrays can be passed directly to a step plot.
+        """
+        samples = self.samples.astype(float)
+        samples[samples == 0] = np.nan
+        return self.latencies, self.counts.cumsum(axis=0) / samples
+
+    def to_frame(
+        self,
+        percentiles: Sequence[float] = PERCENTILES,
+        outlier_threshold: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """One row of summary metrics per thread"""
+        frame = pd.DataFrame({"thread": np.arange(self.threads, dtype=float)})
+        frame["samples"] = self.samples.astype(float)
+        for q, values in zip(percentiles, self.percentiles(percentiles)):
+            frame[percentile_name(q)] = values
+        if self.max_latencies is not None:
+            frame["max_latency"] = self.max_latencies.astype(float)
+        frame["outliers"] = self.outliers(outlier_threshold).astype(float)
+        frame["overflows"] = self.overflows.astype(float)
+
+        return frame
+
+
+def parse_histogram(lines: Iterable[str]) -> LatencyHistogram:
+    """Parse the histogram written by cyclictest -h / --histfile
+
+    Data lines contain the latency of the bucket in microseconds followed
+    by the sample counts of all threads. The summary comment lines are
+    used for the overflow counts and maximum latencies.
+    """
+    rows = []
+    summary = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            match = _summary_re.match(line)
+            if match and match.group("values").strip():
+                summary[match.group("name").strip().lower()] = np.array(
+                    match.group("values").split(), dtype=np.int64
+                )
+            continue
+        rows.append(line)
+
+    if rows:
+        data = np.loadtxt(rows, dtype=np.int64, ndmin=2)
+    else:
+        data = np.zeros((0, 1), dtype=np.int64)
+
+    latencies = data[:, 0]
+    counts = data[:, 1:]
+    threads = counts.shape[1]
+
+    def thread_values(name: str) -> Optional[np.ndarray]:
+        values = summary.get(name)
+        if values is None or len(values) != threads:
+            return None
+        return values
+
+    overflows = thread_values("histogram overflows")
+    if overflows is None:
+        overflows = np.zeros(threads, dtype=np.int64)
+
+    return LatencyHistogram(
+        latencies=latencies,
+        counts=counts,
+        overflows=overflows,
+        max_latencies=thread_values("max latencies"),
+    )
@@ -0,0 +1,290 @@
+""" Incremental extraction of test metrics from output files """
+
+import math
+import re
+from array import array
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+import pandas as pd
+
+from .cell_stats import CellStats
+from .histogram import LatencyHistogram, histogram_cell, parse_histogram
+
+_group_re = re.compile(r"\(\?P<([A-Za-z_][A-Za-z0-9_]*)>")
+_backref_re = re.compile(r"\(\?P=([A-Za-z_][A-Za-z0-9_]*)\)")
+
+
+class CombinedPattern:
+    """Alternation of several regular expressions, matched in one pass
+
+    Named groups are renamed per alternative so that patterns may reuse
+    group names. For each line only the first matching alternative is
+    reported.
+    """
+
+    def __init__(self, patterns: List[str]) -> None:
+        self.patterns = patterns
+        self._groups: List[Dict[str, str]] = []
+
+        alternatives = []
+        for num, pattern in enumerate(patterns):
+            groups: Dict[str, str] = {}
+
+            def rename(match, num=num, groups=groups):
+                groups[f"_p{num}_{match.group(1)}"] = match.group(1)
+                return f"(?P<_p{num}_{match.group(1)}>"
+
+            def backref(match, num=num):
+                return f"(?P=_p{num}_{match.group(1)})"
+
+            renamed = _group_re.sub(rename, pattern)
+            renamed = _backref_re.sub(backref, renamed)
+            alternatives.append(f"(?P<_p{num}>{renamed})")
+            self._groups.append(groups)
+
+        self.regex: Pattern = re.compile("|".join(alternatives))
+
+    def _result(self, match) -> Tuple[int, Dict[str, Optional[str]]]:
+        num = int(match.lastgroup[2:])
+        values = {
+            name: match.group(group)
+            for group, name in self._groups[num].items()
+        }
+        return num, values
+
+    def match(
+        self, line: str
+    ) -> Optional[Tuple[int, Dict[str, Optional[str]]]]:
+        match = self.regex.match(line)
+        if match is None:
+            return None
+        return self._result(match)
+
+    def search(
+        self, line: str
+    ) -> Optional[Tuple[int, Dict[str, Optional[str]]]]:
+        match = self.regex.search(line)
+        if match is None:
+            return None
+        return self._result(match)
+
+
+class MetricBuffer:
+    """Column oriented storage of numeric metrics"""
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, array] = {}
+        self.rows = 0
+
+    def append(self, row: Dict[str, float]) -> None:
+        for name in row:
+            if name not in self.columns:
+                self.columns[name] = array("d", [math.nan] * self.rows)
+        for name, column in self.columns.items():
+            column.append(row.get(name, math.nan))
+        self.rows += 1
+
+    def last(self) -> Dict[str, float]:
+        if not self.rows:
+            return {}
+        return {name: column[-1] for name, column in self.columns.items()}
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {name: list(column) for name, column in self.columns.items()}
+        )
+
+
+class MetricStream:
+    """Extracts metrics and evaluates checks line by line
+
+    log patterns are matched at the start of each line and their named
+    groups are stored as metrics. check patterns must be found in the
+    respective file. A match of a fail pattern marks the stream as failed,
+    so that the running test can be aborted immediately. histogram files
+    are parsed as cyclictest histograms and cell_stats files as snapshots
+    of the jailhouse cell statistics once the stream is closed.
+    """
+
+    def __init__(
+        self,
+        check: Dict[str, List[str]],
+        log: Dict[str, List[str]],
+        fail: Optional[Dict[str, List[str]]] = None,
+        histogram: Optional[List[str]] = None,
+        outlier_threshold: Optional[float] = None,
+        cell_stats: Optional[List[str]] = None,
+    ) -> None:
+        self.metrics = MetricBuffer()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.cell_stats: Dict[str, CellStats] = {}
+        self.outlier_threshold = outlier_threshold
+        self._histogram_files = set(histogram or [])
+        self._cell_stats_files = set(cell_stats or [])
+
+        # Complete contents of the files that are parsed on close
+        self._collected: Dict[str, List[str]] = {
+            file: [] for file in self._histogram_files | self._cell_stats_files
+        }
+
+        self._log = {
+            file: CombinedPattern(patterns)
+            for file, patterns in log.items()
+            if patterns
+        }
+        self._fail = {
+            file: CombinedPattern(patterns)
+            for file, patterns in (fail or {}).items()
+            if patterns
+        }
+
+        # Checks are removed from the pending patterns once found
+        self._check_files = set(check)
+        self._pending_checks: Dict[str, List[Pattern]] = {
+            file: [re.compile(pattern) for pattern in patterns]
+            for file, patterns in check.items()
+        }
+
+        self.seen_files: Set[str] = set()
+        self.failure: Optional[str] = None
+        self._partial: Dict[str, str] = {}
+
+    @property
+    def failed(self) -> bool:
+        return self.failure is not None
+
+    @property
+    def missing_checks(self) -> Dict[str, List[str]]:
+        return {
+            file: [pattern.pattern for pattern in patterns]
+            for file, patterns in self._pending_checks.items()
+            if patterns
+        }
+
+    @property
+    def passed(self) -> bool:
+        if self.failed:
+            return False
+        if not self._check_files <= self.seen_files:
+            return False
+        return not self.missing_checks
+
+    def feed(self, file: str, data: str) -> None:
+        """Feed a chunk of file, lines may be split across chunks"""
+        self.seen_files.add(file)
+        data = self._partial.pop(file, "") + data
+        lines = data.split("\n")
+        if lines[-1]:
+            self._partial[file] = lines[-1]
+        for line in lines[:-1]:
+            self.feed_line(file, line)
+
+    def close(self) -> None:
+        """Process incomplete last lines"""
+        partial = self._partial
+        self._partial = {}
+        for file, line in partial.items():
+            self.feed_line(file, line)
+
+        for file, lines in sorted(self._collected.items()):
+            if file not in self.seen_files:
+                continue
+            if file in self._histogram_files:
+                self.histograms[file] = parse_histogram(lines)
+            if file in self._cell_stats_files:
+                self.cell_stats[file] = CellStats(lines)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Logged metrics, followed by histogram metrics and exit rates
+
+        The rows of the histogram metrics hold the cell of their histogram
+        in column cell.
+        """
+        frames = [self.metrics.to_frame()]
+        for file, histogram in self.histograms.items():
+            frame = histogram.to_frame(outlier_threshold=self.outlier_threshold)
+            frame.insert(0, "cell", histogram_cell(file))
+            frames.append(frame)
+        for stats in self.cell_stats.values():
+            rates = stats.rates()
+            if rates:
+                frames.append(pd.DataFrame([rates]))
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames, ignore_index=True, sort=False)
+
+    def feed_line(self, file: str, line: str) -> None:
+        self.seen_files.add(file)
+
+        collected = self._collected.get(file)
+        if collected is not None:
+            collected.append(line)
+
+        pending_checks = self._pending_checks.get(file)
+        if pending_checks:
+            # A line may satisfy several checks
+            for pattern in list(pending_checks):
+                if pattern.search(line):
+                    pending_checks.remove(pattern)
+
+        fail = self._fail.get(file)
+        if fail is not None and self.failure is None:
+            found = fail.search(line)
+            if found is not None:
+                num, _values = found
+                self.failure = (
+                    f"found {fail.patterns[num]} in {file}: {line.strip()}"
+                )
+
+        log = self._log.get(file)
+        if log is not None:
+            found = log.match(line)
+            if found is not None:
+                _num, values = found
+                row = {}
+                for name, value in values.items():
+                    try:
+                        row[name] = float(value)  # type: ignore
+                    except (TypeError, ValueError):
+                        pass
+                if row:
+                    self.metrics.append(row)
+
+
+class TailStreamWriter:
+    """File like sink for the followed output files of a test
+
+    The remote tail command precedes every line with a ==> file <==
+    header, as the lines of the followed files are interleaved. The
+    lines are fed to a MetricStream with the file of their header.
+    The number of received bytes per file is tracked in received.
+    """
+
+    _header_re = re.compile(r"^==> (.*) <==$")
+
+    def __init__(self, stream: MetricStream) -> None:
+        self.stream = stream
+        self.current_file: Optional[str] = None
+        self.received: Dict[str, int] = {}
+        self._partial = ""
+
+    def write(self, data: str) -> None:
+        data = self._partial + data
+        lines = data.split("\n")
+        self._partial = lines[-1]
+        for line in lines[:-1]:
+            header = self._header_re.match(line)
+            if header:
+                self.current_file = header.group(1)
+            elif self.current_file is not None:
+                self.received[self.current_file] = (
+                    self.received.get(self.current_file, 0)
+                    + len(line.encode("utf-8"))
+                    + 1
+                )
+                self.stream.feed_line(self.current_file, line)
+
+    def flush(self) -> None:
+        pass
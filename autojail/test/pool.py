@@ -0,0 +1,273 @@
+""" Parallel test execution on a pool of identical boards """
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dataclasses import dataclass, field
+
+from ..model.board import Board
+from ..model.config import AutojailConfig, TargetBoard
+from ..model.jailhouse import JailhouseConfig
+from ..model.test import TestConfig, TestEntry
+from ..utils.logging import getLogger
+from .runner import TestResult, TestRunner
+
+
+@dataclass
+class PoolTest:
+    name: str
+    entry: TestEntry
+    attempts: int = 0
+    failed_boards: Set[str] = field(default_factory=set)
+
+
+class BoardPoolRunner:
+    """Runs the tests on a pool of identical boards
+
+    All boards are reset and deployed concurrently. Afterwards each board
+    takes the next test from a shared queue, so the tests are sharded
+    dynamically according to their run time. A test that hangs or loses
+    its connection is retried on a different board, while the board it
+    hung on is reset and deployed again.
+    Each board is driven by the event loop of its own thread, so every
+    step is bounded by its timeout and by the timeout of the whole run.
+    """
+
+    def __init__(
+        self,
+        autojail_config: AutojailConfig,
+        board_info: Board,
+        jailhouse_config: JailhouseConfig,
+        test_config: TestConfig,
+        automate_context: Any,
+        boards: List[TargetBoard],
+        retries: int = 1,
+        timeout: Optional[float] = None,
+        select: Optional[List[str]] = None,
+    ) -> None:
+        self.autojail_config = autojail_config
+        self.retries = retries
+        self.timeout = timeout
+        self._deadline: Optional[float] = None
+        self.logger = getLogger()
+
+        self.runners = [
+            TestRunner(
+                self._board_config(board),
+                board_info,
+                jailhouse_config,
+                test_config,
+                automate_context,
+                select=select,
+            )
+            for board in boards
+        ]
+
+        self._condition = threading.Condition()
+        self._pending: List[PoolTest] = []
+        self._running = 0
+        self._live: Set[str] = set()
+        self._results: Dict[str, TestResult] = {}
+
+    def _board_config(self, board: TargetBoard) -> AutojailConfig:
+        update: Dict[str, Any] = {"login": board.login}
+        if board.password is not None:
+            update["password"] = board.password
+        for command in ["reset_command", "start_command", "stop_command"]:
+            if getattr(board, command):
+                update[command] = getattr(board, command)
+        if board.uart is not None:
+            update["uart"] = board.uart
+        elif board.login != self.autojail_config.login:
+            # The console of the project belongs to its own board
+            update["uart"] = None
+
+        return self.autojail_config.copy(update=update)
+
+    def run(self) -> Dict[str, TestResult]:
+        if not self.runners:
+            return {}
+
+        tests = self.runners[0]._prepare_tests()
+        self._pending = [PoolTest(name, entry) for name, entry in tests.items()]
+        self._running = 0
+        self._results = {}
+        if self.timeout is not None:
+            self._deadline = time.monotonic() + self.timeout
+        self._live = {
+            str(runner.autojail_config.login) for runner in self.runners
+        }
+
+        self.logger.info(
+            "Running %d tests on %d boards", len(tests), len(self.runners)
+        )
+        # Threads of boards that are still busy after the time limit
+        # are abandoned
+        threads = [
+            threading.Thread(
+                target=self._run_board, args=(runner,), daemon=True
+            )
+            for runner in self.runners
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            remaining = None
+            if self._deadline is not None:
+                remaining = max(self._deadline - time.monotonic(), 0.0)
+            thread.join(remaining)
+
+        with self._condition:
+            results = dict(self._results)
+            for item in self._pending:
+                self.logger.critical("No board left to run test %s", item.name)
+                results[item.name] = TestResult(passed=False)
+
+        for name in tests:
+            if name not in results:
+                self.logger.critical(
+                    "Test %s did not finish within the time limit of the run",
+                    name,
+                )
+                results[name] = TestResult(passed=False)
+
+        return {name: results[name] for name in tests}
+
+    def _retire(self, login: str) -> None:
+        with self._condition:
+            self._live.discard(login)
+            self._condition.notify_all()
+
+    def _next_test(self, login: str) -> Optional[PoolTest]:
+        """Take the next test, preferring tests not failed on this board"""
+        with self._condition:
+            while True:
+                for item in self._pending:
+                    others = self._live - item.failed_boards - {login}
+                    if login not in item.failed_boards or not others:
+                        self._pending.remove(item)
+                        self._running += 1
+                        return item
+
+                if not self._pending and self._running == 0:
+                    return None
+                self._condition.wait(1.0)
+
+    def _finish_test(
+        self, login: str, item: PoolTest, result: Optional[TestResult]
+    ) -> None:
+        with self._condition:
+            self._running -= 1
+            if result is not None:
+                self._results[item.name] = result
+            elif item.attempts <= self.retries:
+                self.logger.warning(
+                    "Test %s hung on %s, retrying on another board",
+                    item.name,
+                    login,
+                )
+                item.failed_boards.add(login)
+                self._pending.append(item)
+            else:
+                self.logger.critical(
+                    "Test %s hung %d times, giving up", item.name, item.attempts
+                )
+                self._results[item.name] = TestResult(passed=False)
+            self._condition.notify_all()
+
+    def _run_board(self, runner: TestRunner) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._run_board_async(runner))
+        finally:
+            loop.close()
+
+    async def _run_board_async(self, runner: TestRunner) -> None:
+        login = str(runner.autojail_config.login)
+        runner._start_console()
+        try:
+            self.logger.info("Resetting target board %s", login)
+            if not await runner._recover(self._deadline):
+                return
+
+            while True:
+                item = self._next_test(login)
+                if item is None:
+                    break
+
+                item.attempts += 1
+                if (
+                    self._deadline is not None
+                    and time.monotonic() >= self._deadline
+                ):
+                    self.logger.warning(
+                        "Skipping test %s, the time limit of the run is exceeded",
+                        item.name,
+                    )
+                    self._finish_test(login, item, TestResult(passed=False))
+                    continue
+
+                self.logger.debug("Starting test %s on %s", item.name, login)
+                if runner.console is not None:
+                    runner.console.mark(item.name)
+                result, hung = await self._run_pool_test(runner, item)
+                if runner.console is not None:
+                    runner._add_console(item.name, result)
+                if not hung:
+                    runner._log_result(item.name, result)
+                    self._finish_test(login, item, result)
+                    continue
+
+                self._finish_test(login, item, None)
+                self.logger.info("Resetting target board %s", login)
+                if not await runner._recover(self._deadline):
+                    return
+
+            self._retire(login)
+            try:
+                await runner._blocking(
+                    runner._run_stop, timeout=runner.COMMAND_TIMEOUT
+                )
+            except Exception:
+                self.logger.critical(
+                    "Could not stop %s, trying reset ...", login
+                )
+                await runner._reset_quietly()
+        finally:
+            self._retire(login)
+            runner._stop_console()
+
+    async def _run_pool_test(
+        self, runner: TestRunner, item: PoolTest
+    ) -> Tuple[TestResult, bool]:
+        """Run a test with its timeout, returns the result and if it hung
+
+        The thread of a hung test is unblocked when the board is recovered.
+        """
+        timeout = runner._limit(
+            item.entry.timeout or runner.DEFAULT_TEST_TIMEOUT, self._deadline
+        )
+        try:
+            result = await runner._blocking(
+                runner._run_test, item.entry, timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                "Test %s did not finish within %.0fs on %s",
+                item.name,
+                timeout,
+                runner.autojail_config.login,
+            )
+            return TestResult(passed=False), True
+        except Exception as e:
+            self.logger.warning(
+                "Test %s failed on %s: %s",
+                item.name,
+                runner.autojail_config.login,
+                str(e),
+            )
+            return TestResult(passed=False), True
+
+        return result, False
@@ -0,0 +1,248 @@
+""" Persistent storage and comparison of test metrics """
+
+import datetime
+import hashlib
+import math
+import re
+import subprocess
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from ..model.jailhouse import JailhouseConfig
+
+if TYPE_CHECKING:
+    from .runner import TestResult
+
+KEY_COLUMNS = [
+    "run",
+    "time",
+    "board",
+    "config_hash",
+    "revision",
+    "test",
+    "passed",
+    "sample",
+]
+
+
+def config_hash(config: JailhouseConfig) -> str:
+    return hashlib.sha256(config.json().encode("utf-8")).hexdigest()[:16]
+
+
+def git_revision(path: Optional[Path] = None) -> str:
+    try:
+        res = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+    except OSError:
+        return "unknown"
+
+    if res.returncode != 0:
+        return "unknown"
+
+    return res.stdout.strip()
+
+
+@dataclass
+class RunInfo:
+    board: str
+    config_hash: str
+    revision: str
+    run: str = ""
+    time: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.time:
+            self.time = datetime.datetime.now().isoformat(timespec="seconds")
+        if not self.run:
+            self.run = f"{self.time}-{uuid.uuid4().hex[:8]}"
+
+
+class ResultStore:
+    """Test metrics of all runs in a long format csv table
+
+    Each row holds one value of one metric sample together with the
+    run, board, configuration hash and git revision it was measured with.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def frame(
+        self, info: RunInfo, results: Dict[str, "TestResult"]
+    ) -> pd.DataFrame:
+        frames = []
+        for test, result in results.items():
+            metrics = result.metrics
+            if metrics is None or metrics.empty:
+                continue
+
+            samples = metrics.reset_index(drop=True)
+            samples.index.name = "sample"
+            samples = samples.reset_index()
+            if "cell" not in samples:
+                samples["cell"] = None
+            long = samples.melt(
+                id_vars=["sample", "cell"],
+                var_name="metric",
+                value_name="value",
+            )
+            long = long.dropna(subset=["value"])
+
+            # Metrics of a cell are stored as <cell>_<metric>
+            has_cell = long["cell"].notna()
+            long.loc[has_cell, "metric"] = (
+                long.loc[has_cell, "cell"] + "_" + long.loc[has_cell, "metric"]
+            )
+            long = long.drop(columns=["cell"])
+            long.insert(0, "passed", result.passed)
+            long.insert(0, "test", test)
+            frames.append(long)
+
+        if not frames:
+            return pd.DataFrame(columns=KEY_COLUMNS + ["metric", "value"])
+
+        frame = pd.concat(frames, ignore_index=True)
+        for column in ["revision", "config_hash", "board", "time", "run"]:
+            frame.insert(0, column, getattr(info, column))
+
+        return frame[KEY_COLUMNS + ["metric", "value"]]
+
+    def append(
+        self, info: RunInfo, results: Dict[str, "TestResult"]
+    ) -> pd.DataFrame:
+        frame = self.frame(info, results)
+        if frame.empty:
+            return frame
+
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        frame.to_csv(
+            self.path, mode="a", header=not self.path.exists(), index=False
+        )
+
+        return frame
+
+    def load(self) -> pd.DataFrame:
+        if not self.path.exists():
+            return pd.DataFrame(columns=KEY_COLUMNS + ["metric", "value"])
+
+        # Hashes and names may look like numbers
+        return pd.read_csv(
+            self.path,
+            dtype={
+                "run": str,
+                "board": str,
+                "config_hash": str,
+                "revision": str,
+            },
+        )
+
+
+def summarize(frame: pd.DataFrame) -> pd.DataFrame:
+    """min/avg/max/p99 of each metric per test"""
+    if frame.empty:
+        return pd.DataFrame(
+            columns=["test", "metric", "count", "min", "avg", "max", "p99"]
+        )
+
+    grouped = frame.groupby(["test", "metric"])["value"]
+    summary = grouped.agg(["count", "min", "mean", "max"])
+    summary["p99"] = grouped.quantile(0.99)
+    summary = summary.rename(columns={"mean": "avg"})
+
+    return summary.reset_index()
+
+
+@dataclass
+class Comparison:
+    test: str
+    metric: str
+    baseline_avg: float
+    current_avg: float
+    baseline_p99: float
+    current_p99: float
+    p_value: float
+    regression: bool
+
+
+def _welch_p_value(current: np.ndarray, baseline: np.ndarray) -> float:
+    """One sided p-value of current having a larger mean than baseline
+
+    Uses Welch's t statistic with a normal approximation, which is
+    adequate for the sample counts produced by latency measurements.
+    """
+    if len(current) < 2 or len(baseline) < 2:
+        return math.nan
+
+    variance = current.var(ddof=1) / len(current) + baseline.var(ddof=1) / len(
+        baseline
+    )
+    difference = current.mean() - baseline.mean()
+    if variance == 0.0:
+        if difference > 0:
+            return 0.0
+        return 1.0
+
+    t = difference / math.sqrt(variance)
+    return 0.5 * math.erfc(t / math.sqrt(2))
+
+
+def compare(
+    current: pd.DataFrame,
+    baseline: pd.DataFrame,
+    metrics: str = ".*latency",
+    alpha: float = 0.01,
+    threshold: float = 0.05,
+) -> List[Comparison]:
+    """Compare the metrics of the current run against a baseline
+
+    All compared metrics are assumed to be better when lower, like the
+    latencies measured by the built in tests. A metric is flagged as
+    regression if its mean has increased significantly at level alpha
+    and by more than threshold relative to the baseline.
+    """
+    metric_re = re.compile(metrics)
+    comparisons = []
+    for (test, metric), values in current.groupby(["test", "metric"]):
+        if not metric_re.fullmatch(metric):
+            continue
+
+        baseline_values = baseline[
+            (baseline["test"] == test) & (baseline["metric"] == metric)
+        ]["value"].to_numpy(dtype=float)
+        current_values = values["value"].to_numpy(dtype=float)
+        if len(baseline_values) == 0:
+            continue
+
+        p_value = _welch_p_value(current_values, baseline_values)
+        baseline_avg = float(baseline_values.mean())
+        current_avg = float(current_values.mean())
+        increase = current_avg - baseline_avg
+        regression = (
+            not math.isnan(p_value)
+            and p_value < alpha
+            and increase > threshold * abs(baseline_avg)
+        )
+        comparisons.append(
+            Comparison(
+                test=test,
+                metric=metric,
+                baseline_avg=baseline_avg,
+                current_avg=current_avg,
+                baseline_p99=float(np.percentile(baseline_values, 99)),
+                current_p99=float(np.percentile(current_values, 99)),
+                p_value=p_value,
+                regression=regression,
+            )
+        )
+
+    return comparisons
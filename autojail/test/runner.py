@@ -1,31 +1,103 @@
-import re
+import asyncio
+import io
 import shlex
 import subprocess
+import tarfile
 import tempfile
 import threading
+import time
+import uuid
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from mako.template import Template
 
 from ..model.board import Board
 from ..model.config import AutojailConfig
 from ..model.jailhouse import JailhouseConfig
 from ..model.test import TestConfig, TestEntry
-from ..utils.connection import Connection, connect
+from ..utils.connection import connect, connection_pool, is_healthy
 from ..utils.deploy import deploy_target
 from ..utils.logging import getLogger
+from .boot_log import BootLog
+from .console import ConsoleCapture
+from .histogram import LatencyHistogram
+from .metrics import MetricStream, TailStreamWriter
 from .test import TestProvider
 
+if TYPE_CHECKING:
+    from fabric.connection import Connection
+
+
+_driver_template = Template(
+    """#!/bin/bash
+
+run_test()
+{
+    local num=$1
+    local timeout=$2
+    shift 2
+
+    mkdir -p ${test_dir}/outputs/$num
+    timeout $timeout /bin/bash ${test_dir}/tests/$num.sh > ${test_dir}/outputs/$num/stdout 2>&1
+    echo $? > ${test_dir}/outputs/$num/exit_code
+
+    local file_num=0
+    for output_file in "$@"; do
+        if [ -f "$output_file" ]; then
+            cp "$output_file" ${test_dir}/outputs/$num/$file_num
+        fi
+        file_num=$((file_num+1))
+    done
+}
+
+%for num, timeout, output_files in tests:
+run_test ${num} ${timeout} ${output_files}
+%endfor
+
+tar czf ${test_dir}/outputs.tar.gz -C ${test_dir} outputs
+"""
+)
+
 
 @dataclass
 class TestResult:
     passed: bool
-    metrics: Dict[str, Union[float, int, bool]]
+    metrics: pd.DataFrame = field(default_factory=pd.DataFrame)
+    histograms: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    console: str = ""
+
+
+def _set_future(future: "asyncio.Future", result: Any, error: Any) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
 
 
 class TestRunner:
+    """Deploys the generated configuration and runs the tests on the target
+
+    The run is driven by an asyncio event loop. Blocking ssh operations
+    run in daemon threads and every step has a timeout, so that a hung
+    target can not block the run. If a test exceeds its timeout or the
+    target stops responding, the board is reset and deployed again
+    before the next test. With a timeout for the whole run, tests that
+    would start after it has expired are reported as failed.
+    """
+
+    DEFAULT_TEST_TIMEOUT = 600
+    COMMAND_TIMEOUT = 120
+    CONNECT_TIMEOUT = 180
+    DEPLOY_TIMEOUT = 300
+    POLL_INTERVAL = 0.2
+    PROGRESS_INTERVAL = 10.0
+    TAIL_TIMEOUT = 5.0
+
     def __init__(
         self,
         autojail_config: AutojailConfig,
@@ -33,123 +105,557 @@ class TestRunner:
         jailhouse_config: JailhouseConfig,
         test_config: TestConfig,
         automate_context: Any,
+        batch: bool = False,
+        timeout: Optional[float] = None,
+        select: Optional[List[str]] = None,
     ) -> None:
         self.autojail_config = autojail_config
         self.board_info = board_info
         self.jailhouse_config = jailhouse_config
         self.test_config = test_config
         self.automate_context = automate_context
+        self.batch = batch
+        self.timeout = timeout
+        # Names of the tests to run, all tests if None
+        self.select = select
 
         self.logger = getLogger()
 
-        self.threads: List[threading.Thread] = []
-        self.connection: Optional[Connection] = None
+        self.connection: Optional["Connection"] = None
+        self.console: Optional[ConsoleCapture] = None
+
+    def run(self) -> Dict[str, TestResult]:
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(self.run_async())
 
-    def run(self) -> None:
+    async def run_async(self) -> Dict[str, TestResult]:
         tests = self._prepare_tests()
 
-        self.logger.info("Resetting target board")
-        self._run_reset()
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+
+        self._start_console()
+        try:
+            self.logger.info("Resetting target board")
+            if not await self._recover(deadline):
+                return {}
+
+            if self.batch:
+                results = await self._run_tests_batched_async(tests, deadline)
+            else:
+                results = await self._run_tests_async(tests, deadline)
 
-        self._wait_for_connection()
+            try:
+                await self._blocking(
+                    self._run_stop, timeout=self.COMMAND_TIMEOUT
+                )
+            except Exception:
+                self.logger.critical("Could not stop target, trying reset ...")
+                await self._reset_quietly()
+        finally:
+            self._stop_console()
+
+        return results
+
+    async def _blocking(
+        self, func: Callable, *args: Any, timeout: Optional[float] = None
+    ) -> Any:
+        """Run a blocking function in a daemon thread with a timeout
+
+        The thread is abandoned if it does not finish in time, it does not
+        keep the process alive.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
 
+        def target() -> None:
+            result, error = None, None
+            try:
+                result = func(*args)
+            except Exception as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(_set_future, future, result, error)
+            except RuntimeError:
+                # The event loop has already been closed
+                pass
+
+        threading.Thread(target=target, daemon=True).start()
+
+        return await asyncio.wait_for(future, timeout)
+
+    def _limit(
+        self, timeout: Optional[float], deadline: Optional[float]
+    ) -> Optional[float]:
+        if deadline is None:
+            return timeout
+        remaining = max(deadline - time.monotonic(), 0.0)
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    async def _reset_quietly(self) -> None:
         try:
-            self._deploy()
+            await self._blocking(self._run_reset, timeout=self.COMMAND_TIMEOUT)
         except Exception as e:
-            print(str(e))
-            self.logger.critical("Could not deploy to target, trying reset ...")
-            self._run_reset()
-            return
+            self.logger.critical("Could not reset target: %s", repr(e))
+
+    async def _recover(self, deadline: Optional[float]) -> bool:
+        """Reset the target, reconnect and deploy
 
+        Closing the old connection also unblocks threads of hung tests.
+        """
+        if self.connection is not None:
+            connection_pool.close(self.autojail_config.login)
+            self.connection = None
+
+        try:
+            await self._blocking(
+                self._run_reset, timeout=self._limit(None, deadline)
+            )
+            await self._blocking(
+                self._wait_for_connection,
+                timeout=self._limit(self.CONNECT_TIMEOUT, deadline),
+            )
+            await self._blocking(
+                self._deploy, timeout=self._limit(self.DEPLOY_TIMEOUT, deadline)
+            )
+        except Exception as e:
+            self.logger.critical(
+                "Could not deploy to target: %s, trying reset ...", repr(e)
+            )
+            await self._reset_quietly()
+            return False
+
+        return True
+
+    async def _run_tests_async(
+        self, tests: Dict[str, TestEntry], deadline: Optional[float]
+    ) -> Dict[str, TestResult]:
         results: Dict[str, TestResult] = {}
-        for name, test in tests.items():
-            self.logger.debug("Starting test: %s", name)
-            result = self._run_test(test)
-            self.logger.info(
-                "%s, %s", name, "PASSED" if result.passed else "FAILED"
+        names = list(tests)
+        for num, name in enumerate(names):
+            test = tests[name]
+            timeout = self._limit(
+                test.timeout or self.DEFAULT_TEST_TIMEOUT, deadline
             )
+            if timeout is not None and timeout <= 0:
+                self.logger.warning(
+                    "Skipping test %s, the time limit of the run is exceeded",
+                    name,
+                )
+                results[name] = TestResult(passed=False)
+                continue
+
+            if not is_healthy(self.connection):
+                self.logger.warning("Target is not responding, resetting ...")
+                if not await self._recover(deadline):
+                    for remaining in names[num:]:
+                        results[remaining] = TestResult(passed=False)
+                    break
+
+            self.logger.debug("Starting test: %s", name)
+            if self.console is not None:
+                self.console.mark(name)
+
+            hung = False
+            try:
+                result = await self._blocking(
+                    self._run_test, test, timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.critical(
+                    "Test %s did not finish within %.0fs", name, timeout
+                )
+                result = TestResult(passed=False)
+                hung = True
+            except Exception as e:
+                self.logger.critical("Test %s failed: %s", name, repr(e))
+                result = TestResult(passed=False)
+                hung = True
+
+            if self.console is not None:
+                self._add_console(name, result)
+            self._log_result(name, result)
             results[name] = result
+
+            if hung and num + 1 < len(names):
+                self.logger.info("Resetting target board")
+                if not await self._recover(deadline):
+                    for remaining in names[num + 1 :]:
+                        results[remaining] = TestResult(passed=False)
+                    break
+
+        return results
+
+    async def _run_tests_batched_async(
+        self, tests: Dict[str, TestEntry], deadline: Optional[float]
+    ) -> Dict[str, TestResult]:
+        total = sum(
+            test.timeout or self.DEFAULT_TEST_TIMEOUT for test in tests.values()
+        )
+        timeout: Optional[float] = self._limit(
+            total + self.DEPLOY_TIMEOUT, deadline
+        )
         try:
-            self._run_stop()
-        except Exception:
-            self.logger.critical("Could not stop target, trying reset ...")
-            self._run_reset()
-
-    def _get_outputs(
-        self, output_files: Iterable[str]
-    ) -> Dict[str, Optional[str]]:
-        results: Dict[str, Optional[str]] = {}
-        for f in output_files:
-            self.logger.info("Getting output file %s", f)
-            with tempfile.SpooledTemporaryFile(mode="rw+b") as tmpfile:
-                try:
-                    assert self.connection is not None
-                    self.connection.get(f, local=tmpfile)
-                    tmpfile.seek(0)
-                    results[f] = tmpfile.read()
-                except Exception:
-                    results[f] = None
+            results = await self._blocking(
+                self._run_tests_batched, tests, timeout=timeout
+            )
+        except Exception as e:
+            self.logger.critical("Batched test run failed: %s", repr(e))
+            results = {name: TestResult(passed=False) for name in tests}
+
+        for name, result in results.items():
+            self._log_result(name, result)
 
         return results
 
-    def _check_results(
-        self, checks: Dict[str, List[str]], results: Dict[str, Any]
-    ):
-        result = True
-        for file, file_checks in checks.items():
-            data = results[file].decode("utf-8")
-            for check in file_checks:
-                check_regex = re.compile(check)
-                match = check_regex.search(data)
-                if not match:
-                    self.logger.warning(
-                        "Could not find pattern %s in %s", check, file
-                    )
-                    result = False
+    def _add_console(self, name: str, result: TestResult) -> None:
+        """Attach the console output and its boot milestones to a result"""
+        assert self.console is not None
 
-        return result
+        lines = self.console.section_lines(name)
+        result.console = "".join(line + "\n" for _time, line in lines)
 
-    def _extract_metrics(
-        self, logs: Dict[str, List[str]], results: Dict[str, Any]
-    ) -> Any:
-        result_list = []
-        for file, log_patterns in logs.items():
-            data = results[file].decode("utf-8")
-            data = data.splitlines()
-            extractors = [re.compile(p) for p in log_patterns]
-            for line in data:
-                for extractor in extractors:
-                    match = extractor.match(line)
-                    if match:
-                        matched_metrics = match.groupdict()
-                        result_dict = {}
-                        for k, v in matched_metrics.items():
-                            try:
-                                result_dict[k] = float(v)
-                            except ValueError:
-                                pass
-                        if result_dict:
-                            result_list.append(result_dict)
-        result_frame = pd.DataFrame(result_list)
-        return result_frame
-
-    def _run_test(self, test: TestEntry):
-        script = test.script
-        self._run_script(script)
-
-        output_files = set()
-
-        for f in test.check:
-            output_files.add(f)
-        for f in test.log:
-            output_files.add(f)
-        outputs = self._get_outputs(output_files)
-        result = self._check_results(test.check, outputs)
-        metrics = self._extract_metrics(test.log, outputs)
+        boot_metrics = BootLog(lines).metrics()
+        if boot_metrics:
+            self.logger.info("Boot milestones of %s: %s", name, boot_metrics)
+            result.metrics = pd.concat(
+                [result.metrics, pd.DataFrame([boot_metrics])],
+                ignore_index=True,
+                sort=False,
+            )
+
+    def _start_console(self) -> None:
+        uart = self.autojail_config.uart
+        if not uart:
+            return
+
+        console = ConsoleCapture(
+            uart,
+            log_path=Path(self.autojail_config.build_dir)
+            / "test_results"
+            / "console.log",
+        )
+        try:
+            console.start()
+        except Exception as e:
+            self.logger.warning("Could not open console %s: %s", uart, str(e))
+            return
+        self.console = console
+
+    def _stop_console(self) -> None:
+        if self.console is not None:
+            self.console.stop()
+            self.console = None
+
+    def _log_result(self, name: str, result: TestResult) -> None:
+        self.logger.info(
+            "%s, %s", name, "PASSED" if result.passed else "FAILED"
+        )
+
+    def _output_files(self, test: TestEntry) -> List[str]:
+        return sorted(
+            set(test.check)
+            | set(test.log)
+            | set(test.fail)
+            | set(test.histogram)
+            | set(test.cell_stats)
+        )
+
+    def _metric_stream(self, test: TestEntry) -> MetricStream:
+        return MetricStream(
+            test.check,
+            test.log,
+            test.fail,
+            histogram=test.histogram,
+            outlier_threshold=test.outlier_threshold,
+            cell_stats=test.cell_stats,
+        )
+
+    def _stream_result(
+        self, stream: MetricStream, passed: bool = True
+    ) -> TestResult:
+        stream.close()
+
+        for file in sorted(stream.missing_checks):
+            if file not in stream.seen_files:
+                self.logger.warning("Could not get output file %s", file)
+                continue
+            for pattern in stream.missing_checks[file]:
+                self.logger.warning(
+                    "Could not find pattern %s in %s", pattern, file
+                )
+        if stream.failed:
+            self.logger.warning("Test failed: %s", stream.failure)
+
+        metrics = stream.to_frame()
         if not metrics.empty:
             print(metrics)
 
-        return TestResult(passed=result, metrics={})
+        return TestResult(
+            passed=passed and stream.passed,
+            metrics=metrics,
+            histograms=stream.histograms,
+        )
+
+    def _evaluate_test(
+        self,
+        test: TestEntry,
+        outputs: Dict[str, Optional[bytes]],
+        passed: bool = True,
+    ) -> TestResult:
+        stream = self._metric_stream(test)
+        for file, data in outputs.items():
+            if data is not None:
+                stream.feed(file, data.decode("utf-8", "replace"))
+
+        return self._stream_result(stream, passed)
+
+    def _run_test(self, test: TestEntry) -> TestResult:
+        output_files = self._output_files(test)
+        if not output_files:
+            script_result = self._run_script(test.script)
+            return TestResult(passed=script_result.ok)
+
+        return self._run_test_streaming(test, output_files)
+
+    def _run_test_streaming(
+        self, test: TestEntry, output_files: List[str]
+    ) -> TestResult:
+        """Run a test while following its output files with tail
+
+        Metrics and checks are evaluated while the test is running, so the
+        output files never need to be downloaded. The test is aborted as
+        soon as one of its fail patterns is found.
+        """
+        assert self.connection is not None
+
+        stream = self._metric_stream(test)
+        session = f"/tmp/autojail_test_{uuid.uuid4().hex}"
+        files = " ".join(shlex.quote(f) for f in output_files)
+
+        # Outputs of earlier tests must not be parsed again
+        if test.remove_outputs:
+            self.connection.run(
+                f"rm -f {files}", in_stream=False, warn=True, hide="both"
+            )
+            offsets: Dict[str, int] = {}
+        else:
+            offsets = self._file_sizes(files)
+
+        writer = TailStreamWriter(stream)
+        tail = self.connection.run(
+            f"setsid /bin/sh -c {shlex.quote(self._tail_command(output_files, offsets))} & echo $! > {session}.tail; wait",
+            asynchronous=True,
+            in_stream=False,
+            warn=True,
+            hide="err",
+            out_stream=writer,
+        )
+
+        script_path = self._upload_script(test.script)
+        script = self.connection.run(
+            f"setsid /bin/bash {script_path} & echo $! > {session}.pid; wait $!; ret=$?; rm -f {script_path}; exit $ret",
+            asynchronous=True,
+            in_stream=False,
+            warn=True,
+        )
+
+        try:
+            last_progress = time.monotonic()
+            while not script.runner.process_is_finished:
+                if stream.failed:
+                    self.logger.warning("Aborting test: %s", stream.failure)
+                    self.connection.run(
+                        f"kill -TERM -- -$(cat {session}.pid)",
+                        in_stream=False,
+                        warn=True,
+                        hide="both",
+                    )
+                    break
+
+                if time.monotonic() - last_progress > self.PROGRESS_INTERVAL:
+                    last_progress = time.monotonic()
+                    self.logger.info(
+                        "%d samples, last: %s",
+                        stream.metrics.rows,
+                        stream.metrics.last(),
+                    )
+                time.sleep(self.POLL_INTERVAL)
+            script_result = script.join()
+        finally:
+            self._wait_for_tail(writer, files, offsets)
+            self.connection.run(
+                f"kill -TERM -- -$(cat {session}.tail); rm -f {session}.tail {session}.pid",
+                in_stream=False,
+                warn=True,
+                hide="both",
+            )
+            tail.join()
+
+        return self._stream_result(stream, passed=script_result.ok)
+
+    def _file_sizes(self, files: str) -> Dict[str, int]:
+        """Sizes of the existing files on the target"""
+        assert self.connection is not None
+
+        result = self.connection.run(
+            f"stat -c '%s %n' {files} 2>/dev/null",
+            in_stream=False,
+            warn=True,
+            hide="both",
+        )
+        sizes = {}
+        for line in result.stdout.splitlines():
+            size, _, name = line.partition(" ")
+            if size.isdigit():
+                sizes[name] = int(size)
+        return sizes
+
+    def _tail_command(
+        self, output_files: List[str], offsets: Dict[str, int]
+    ) -> str:
+        """Follow each output file from its offset
+
+        Every line is preceded by the header of its file, as the
+        outputs of the tail processes are interleaved. The lines are
+        forwarded by the shell, awk may buffer its input.
+        """
+        tails = []
+        for output_file in output_files:
+            tails.append(
+                f"tail -c +{offsets.get(output_file, 0) + 1} -F {shlex.quote(output_file)} 2>/dev/null"
+                " | while IFS= read -r line; do"
+                f" printf '==> %s <==\\n%s\\n' {shlex.quote(output_file)} \"$line\";"
+                " done &"
+            )
+        tails.append("wait")
+        return " ".join(tails)
+
+    def _wait_for_tail(
+        self, writer: TailStreamWriter, files: str, offsets: Dict[str, int]
+    ) -> None:
+        """Wait until tail has forwarded the complete output files
+
+        tail only polls for files that appear after it has been started,
+        so the output may lag behind the end of the test.
+        """
+        sizes = self._file_sizes(files)
+
+        deadline = time.monotonic() + self.TAIL_TIMEOUT
+        while time.monotonic() < deadline:
+            if all(
+                writer.received.get(name, 0) >= size - offsets.get(name, 0)
+                for name, size in sizes.items()
+            ):
+                break
+            time.sleep(self.POLL_INTERVAL)
+
+    def _build_test_archive(
+        self, tests: Dict[str, TestEntry], test_dir: str
+    ) -> bytes:
+        """Pack all test scripts and a driver running them into one archive"""
+
+        def add_file(archive: tarfile.TarFile, name: str, content: str):
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o755
+            archive.addfile(info, io.BytesIO(data))
+
+        driver_tests = []
+        archive_data = io.BytesIO()
+        with tarfile.open(fileobj=archive_data, mode="w:gz") as archive:
+            for num, test in enumerate(tests.values()):
+                add_file(
+                    archive,
+                    f"tests/{num}.sh",
+                    "".join(c + "\n" for c in test.script),
+                )
+                timeout = test.timeout or self.DEFAULT_TEST_TIMEOUT
+                output_files = " ".join(
+                    shlex.quote(f) for f in self._output_files(test)
+                )
+                driver_tests.append((num, timeout, output_files))
+
+            driver = _driver_template.render(
+                test_dir=test_dir, tests=driver_tests
+            )
+            add_file(archive, "driver.sh", driver)
+
+        return archive_data.getvalue()
+
+    def _run_tests_batched(
+        self, tests: Dict[str, TestEntry]
+    ) -> Dict[str, TestResult]:
+        """Run all tests with a single upload, run and download
+
+        The tests are run by a driver script on the target. It applies
+        the per test timeouts and collects the output files of each test
+        directly after it has finished.
+        """
+        assert self.connection is not None
+
+        test_dir = f"/tmp/autojail_tests_{uuid.uuid4().hex}"
+        tests_archive = self._build_test_archive(tests, test_dir)
+
+        self.logger.info("Running %d tests in batch mode", len(tests))
+        self.connection.put(
+            io.BytesIO(tests_archive), remote=f"{test_dir}.tar.gz"
+        )
+        outputs_archive = io.BytesIO()
+        try:
+            self.connection.run(
+                f"mkdir -p {test_dir} && tar xzf {test_dir}.tar.gz -C {test_dir} && /bin/bash {test_dir}/driver.sh",
+                in_stream=False,
+                warn=True,
+                hide="both",
+            )
+            self.connection.get(
+                f"{test_dir}/outputs.tar.gz", local=outputs_archive
+            )
+        finally:
+            self.connection.run(
+                f"rm -rf {test_dir} {test_dir}.tar.gz",
+                in_stream=False,
+                warn=True,
+            )
+
+        outputs_archive.seek(0)
+        members: Dict[str, bytes] = {}
+        with tarfile.open(fileobj=outputs_archive, mode="r:gz") as archive:
+            for member in archive.getmembers():
+                member_file = archive.extractfile(member)
+                if member_file is not None:
+                    members[member.name] = member_file.read()
+
+        results: Dict[str, TestResult] = {}
+        for num, (name, test) in enumerate(tests.items()):
+            prefix = f"outputs/{num}"
+            self.logger.debug(
+                "Output of test %s:\n%s",
+                name,
+                members.get(f"{prefix}/stdout", b"").decode("utf-8", "replace"),
+            )
+            exit_code = int(members.get(f"{prefix}/exit_code", b"-1").strip())
+            if exit_code == 124:
+                self.logger.warning("Test %s timed out", name)
+            elif exit_code != 0:
+                self.logger.warning(
+                    "Test %s exited with code %d", name, exit_code
+                )
+
+            outputs: Dict[str, Optional[bytes]] = {}
+            for file_num, output_file in enumerate(self._output_files(test)):
+                outputs[output_file] = members.get(f"{prefix}/{file_num}")
+
+            results[name] = self._evaluate_test(
+                test, outputs, passed=exit_code == 0
+            )
+
+        return results
 
     def _prepare_tests(self) -> Dict[str, TestEntry]:
         generic_provider = TestProvider(
@@ -159,6 +665,16 @@ class TestRunner:
         for name, test in self.test_config.items():
             tests[name] = test
 
+        if self.select is not None:
+            for name in self.select:
+                if name not in tests:
+                    self.logger.warning("Unknown test %s", name)
+            tests = {
+                name: test
+                for name, test in tests.items()
+                if name in self.select
+            }
+
         return tests
 
     def _deploy(self) -> None:
@@ -168,7 +684,9 @@ class TestRunner:
             / "deploy.tar.gz",
         )
 
-    def _run_script(self, script):
+    def _upload_script(self, script: List[str]) -> str:
+        assert self.connection is not None
+
         script_name = ""
         script_path = None
         with tempfile.NamedTemporaryFile(
@@ -184,20 +702,36 @@ class TestRunner:
                 if script_path and script_path.exists():
                     script_path.unlink()
 
-        self.connection.run(f"/bin/bash /tmp/{script_name}")
-        self.connection.run(f"rm -f /tmp/{script_name}")
+        return f"/tmp/{script_name}"
+
+    def _run_script(self, script: List[str]) -> Any:
+        assert self.connection is not None
+
+        script_path = self._upload_script(script)
+        return self.connection.run(
+            f"/bin/bash {script_path}; ret=$?; rm -f {script_path}; exit $ret",
+            warn=True,
+        )
 
     def _wait_for_connection(self):
-        if self.connection is None or not self.connection.is_connected:
-            self.connection = connect(
-                self.autojail_config, self.automate_context
-            )
+        # The pool reconnects if the board has been reset in between
+        self.connection = connect(self.autojail_config, self.automate_context)
 
-            assert self.connection.is_connected
+        assert self.connection.is_connected
 
     def _run_local_command(self, command) -> int:
         self.logger.info("Running: %s", str(command))
-        retval = subprocess.run(shlex.split(command))
+        try:
+            retval = subprocess.run(
+                shlex.split(command), timeout=self.COMMAND_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            self.logger.critical(
+                "Command %s did not finish within %ds",
+                command,
+                self.COMMAND_TIMEOUT,
+            )
+            return -1
         return retval.returncode
 
     def _run_start(self):
@@ -212,9 +746,9 @@ class TestRunner:
             self.logger.warning(
                 "No reset command given trying stop, followed by start"
             )
-            self._run_start()
             self._run_stop()
+            self._run_start()
 
     def _run_stop(self):
-        for command in self.autojail_config.start_command:
+        for command in self.autojail_config.stop_command:
             self._run_local_command(command)
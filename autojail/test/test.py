@@ -1,13 +1,30 @@
 """ Definition of standard tests """
 
+import re
+import shlex
 from collections import defaultdict
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..model import AutojailConfig, Board, CellConfig, JailhouseConfig
 from ..model.test import TestEntry
+from .cell_stats import SNAPSHOT_FUNCTION
 
 
 class TestProvider:
+    # Histogram range and outlier threshold of cyclictest in microseconds
+    CYCLICTEST_HISTOGRAM_RANGE = 1000
+    CYCLICTEST_OUTLIER_THRESHOLD = 100
+
+    BOOT_TIME_REPETITIONS = 10
+    BOOT_TIME_OUTPUT = "/tmp/boot_time.txt"
+
+    # Duration in seconds and message sizes in bytes of the iperf3 runs,
+    # and number of ping-pong round trips of the latency probe
+    NETWORK_DURATION = 10
+    NETWORK_MESSAGE_SIZES = [64, 1024, 16384]
+    NETWORK_PINGS = 1000
+
     def __init__(
         self,
         autojail_config: AutojailConfig,
@@ -57,7 +74,9 @@ class TestProvider:
                     f'Started cell "{cell.name}"'
                 )
         script.append("sudo /etc/jailhouse/enable.sh stop")
-        return TestEntry(script=script, check=dict(assertions))
+        return TestEntry(
+            script=script, check=dict(assertions), remove_outputs=True
+        )
 
     def _get_start_all(self):
         script = []
@@ -81,32 +100,359 @@ class TestProvider:
 
         return ip
 
+    def _network_links(self) -> Dict[str, Tuple[str, str, str, str]]:
+        """Client and server cells of each virtual ethernet link
+
+        The first peer is the client and the second peer the server, each
+        with its address on the link. Links without configured addresses
+        are left out.
+        """
+        links = {}
+        for name, shmem in (self.config.shmem or {}).items():
+            if shmem.protocol != "SHMEM_PROTO_VETH":
+                continue
+
+            network = getattr(shmem, "network", None)
+            if not isinstance(network, dict) or len(shmem.peers) != 2:
+                continue
+
+            client, server = shmem.peers
+            if client not in network or server not in network:
+                continue
+            if not network[client].addresses or not network[server].addresses:
+                continue
+
+            links[name] = (
+                client,
+                str(network[client].addresses[0].ip),
+                server,
+                str(network[server].addresses[0].ip),
+            )
+
+        return links
+
+    def _on_cell(self, cell_name: str, command: str) -> Optional[str]:
+        """Command running command on a cell, None if it is not reachable"""
+        if self.config.cells[cell_name].type == "root":
+            return command
+
+        cell_ip = self._get_cell_ip(cell_name)
+        if cell_ip is None:
+            return None
+        return f'ssh root@{cell_ip} "{command}"'
+
+    def _get_network(
+        self, name: str, client: str, server: str, server_ip: str
+    ) -> Optional[TestEntry]:
+        """Throughput and latency benchmark of a virtual ethernet link
+
+        iperf3 measures the throughput from the client to the server for
+        TCP and UDP with each of the message sizes, logged as metrics
+        net_<link>_<protocol>_<size>_throughput in Mbit/s. UDP runs
+        additionally log net_<link>_udp_<size>_jitter in ms and
+        net_<link>_udp_<size>_loss in percent. A ping-pong probe logs each
+        round trip time of the link as net_<link>_rtt in ms. The vm exits
+        of the cells are counted over the whole benchmark.
+        """
+        start_server = self._on_cell(server, "iperf3 -s -D")
+        stop_server = self._on_cell(server, "pkill iperf3")
+        if start_server is None or stop_server is None:
+            return None
+
+        link = re.sub(r"\W", "_", name)
+        # Group names of the patterns must not start with a digit
+        metric = f"net_{link}"
+
+        script = []
+        script.append("sudo /etc/jailhouse/enable.sh start")
+        script.append("sleep 10")
+        cell_stats = f"/tmp/network_{link}_cell_stats.txt"
+        script.extend(self._cell_stats_snapshot("before", cell_stats))
+        script.append(start_server)
+        script.append("sleep 1")
+
+        check: Dict[str, List[str]] = {}
+        log: Dict[str, List[str]] = {}
+        for protocol in ["tcp", "udp"]:
+            for size in self.NETWORK_MESSAGE_SIZES:
+                output = f"/tmp/iperf3_{link}_{protocol}_{size}.txt"
+                options = f"-t {self.NETWORK_DURATION} -f m -l {size}"
+                if protocol == "udp":
+                    options += " -u -b 0"
+                client_command = self._on_cell(
+                    client, f"iperf3 -c {server_ip} {options}"
+                )
+                if client_command is None:
+                    return None
+                script.append(f"{client_command} > {output}")
+
+                prefix = f"{metric}_{protocol}_{size}"
+                pattern = (
+                    r"\[\s*[0-9]+\]\s+[0-9.]+-[0-9.]+\s+sec\s+[0-9.]+ \w+\s+"
+                    f"(?P<{prefix}_throughput>[0-9.]+) Mbits/sec"
+                )
+                if protocol == "udp":
+                    pattern += (
+                        f"\\s+(?P<{prefix}_jitter>[0-9.]+) ms"
+                        r"\s+[0-9]+/[0-9]+\s+"
+                        f"\\((?P<{prefix}_loss>[0-9.e+-]+)%\\)"
+                    )
+                pattern += r"\s+receiver"
+
+                check[output] = ["receiver"]
+                log[output] = [pattern]
+
+        script.append(stop_server)
+
+        ping_output = f"/tmp/ping_{link}.txt"
+        # Intervals below 200 ms need root privileges
+        ping_command = f"ping -c {self.NETWORK_PINGS} -i 0.01 {server_ip}"
+        if self.config.cells[client].type == "root":
+            ping_command = f"sudo {ping_command}"
+        ping = self._on_cell(client, ping_command)
+        if ping is None:
+            return None
+        script.append(f"{ping} > {ping_output}")
+        check[ping_output] = ["bytes from"]
+        log[ping_output] = [
+            f"[0-9]+ bytes from .*time=(?P<{metric}_rtt>[0-9.]+) ms"
+        ]
+
+        script.extend(self._cell_stats_snapshot("after", cell_stats))
+        script.append("sudo /etc/jailhouse/enable.sh stop")
+
+        return TestEntry(
+            script=script,
+            check=check,
+            log=log,
+            cell_stats=[cell_stats],
+            remove_outputs=True,
+        )
+
+    def _cell_stats_snapshot(self, label: str, output: str) -> List[str]:
+        """Script lines appending a snapshot of the vm exit counters"""
+        lines = []
+        if label == "before":
+            lines.append(SNAPSHOT_FUNCTION)
+            lines.append(f"rm -f {output}")
+        lines.append(f"cell_stats {label} >> {output}")
+        return lines
+
     def _get_cyclictest(self):
         script = []
         script.append("sudo /etc/jailhouse/enable.sh start")
         script.append("sleep 10")
+        cell_stats = "/tmp/cyclictest_cell_stats.txt"
+        script.extend(self._cell_stats_snapshot("before", cell_stats))
         assertions = {}
+        histograms = []
+        fetch_histograms = []
         timeout = 30
         for name, cell in self.config.cells.items():
             if cell.type == "linux":
                 cell_ip = self._get_cell_ip(name)
                 if cell_ip is not None:
                     output_name = f"/tmp/cyclictest_{name}.txt"
+                    histogram_name = f"/tmp/cyclictest_{name}.hist"
                     script.append(
-                        f'ssh root@{cell_ip} "cyclictest  -D {timeout}s -m -q -a -t 4 -p 70 --priospread" > {output_name} &'
+                        f'ssh root@{cell_ip} "cyclictest  -D {timeout}s -m -q -a -t 4 -p 70 --priospread -h {self.CYCLICTEST_HISTOGRAM_RANGE} --histfile=/tmp/cyclictest.hist" > {output_name} &'
+                    )
+                    fetch_histograms.append(
+                        f'ssh root@{cell_ip} "cat /tmp/cyclictest.hist" > {histogram_name}'
                     )
                     assertion = r"T:\W*(?P<thread_num>[0-9]+)\W*\(\W*(?P<thread_id>[0-9]+)\)\W*P:\W*(?P<priority>[0-9]+)\W*I:\W*(?P<intervall>[0-9]+)\W+C:\W*(?P<cycles>[0-9]+)\W*Min:\W*(?P<min_latency>[0-9]+)\W*Act:\W*([0-9]+)\W*Avg:\W*(?P<avg_latency>[0-9]+)\W+Max:\W*(?P<max_latency>[0-9]+)"
                     assertions[output_name] = [assertion]
+                    histograms.append(histogram_name)
 
             elif cell.type == "root":
                 script.append(
                     f"stress --cpu 8 --io 4 --vm 2 --vm-bytes 128M --timeout {timeout}s &"
                 )
         script.append("wait")
+        script.extend(self._cell_stats_snapshot("after", cell_stats))
+        script.extend(fetch_histograms)
 
         script.append("sudo /etc/jailhouse/enable.sh stop")
 
-        return TestEntry(script=script, log=assertions)
+        return TestEntry(
+            script=script,
+            log=assertions,
+            histogram=histograms,
+            outlier_threshold=self.CYCLICTEST_OUTLIER_THRESHOLD,
+            cell_stats=[cell_stats],
+            remove_outputs=True,
+        )
+
+    def _boot_time_phases(
+        self, cell: CellConfig
+    ) -> List[Tuple[str, Optional[str], List[str]]]:
+        """Timed phases of the start of a cell
+
+        Each phase has a name, the image it loads if any, and the
+        command starting it. jailhouse cell linux creates, loads and
+        starts a linux cell in one step, so this is a single phase.
+        """
+        cell_name = self.cell_name_underscore(cell)
+        cell_config = f"/etc/jailhouse/{self.cell_name_dash(cell)}.cell"
+        image = None
+        if cell.image:
+            image = "/usr/share/jailhouse/" + Path(cell.image).name
+
+        if cell.type == "root":
+            return [
+                ("enable", None, ["/etc/jailhouse/enable.sh", "start_root"])
+            ]
+        if cell.type == "linux":
+            return [
+                (
+                    "linux",
+                    image,
+                    ["/etc/jailhouse/enable.sh", f"start_{cell_name}"],
+                )
+            ]
+
+        phases: List[Tuple[str, Optional[str], List[str]]] = [
+            (
+                "create",
+                None,
+                ["/usr/sbin/jailhouse", "cell", "create", cell_config],
+            )
+        ]
+        if image:
+            phases.append(
+                (
+                    "load",
+                    image,
+                    [
+                        "/usr/sbin/jailhouse",
+                        "cell",
+                        "load",
+                        "--name",
+                        cell.name,
+                        image,
+                    ],
+                )
+            )
+            phases.append(
+                (
+                    "start",
+                    None,
+                    [
+                        "/usr/sbin/jailhouse",
+                        "cell",
+                        "start",
+                        "--name",
+                        cell.name,
+                    ],
+                )
+            )
+        return phases
+
+    def _get_boot_time(self):
+        """Benchmark of the start up phases of the hypervisor and all cells
+
+        The phases are timed on the target using the monotonic clock of
+        /proc/timer_list over several repetitions, the test fails if it is
+        not readable. Each phase is logged as
+        metric <cell>_<phase>_time in microseconds, phases loading an image
+        additionally log <cell>_image_size in bytes and <cell>_load_rate in
+        MB/s to attribute the load time to the size of the image.
+        With guest cells, the time until all cells are started by enable.sh
+        is logged as system_ready_sequential_time and
+        system_ready_parallel_time, starting the cells one after the other
+        and concurrently.
+        """
+        output = self.BOOT_TIME_OUTPUT
+
+        cells = sorted(
+            self.config.cells.values(), key=lambda cell: cell.type != "root"
+        )
+        phases = []
+        for cell in cells:
+            for phase, image, command in self._boot_time_phases(cell):
+                phases.append(
+                    (self.cell_name_underscore(cell), phase, image, command)
+                )
+        if cells and cells[0].type == "root":
+            stop = ["/etc/jailhouse/enable.sh", "stop"]
+            phases.append(
+                (self.cell_name_underscore(cells[0]), "disable", None, stop)
+            )
+
+            # Time until all cells are started, one after the other and
+            # with independent cells started concurrently
+            if len(cells) > 1:
+                for phase, command in [
+                    ("sequential", "start_sequential"),
+                    ("parallel", "start"),
+                ]:
+                    phases.append(
+                        (
+                            "system",
+                            f"ready_{phase}",
+                            None,
+                            ["/etc/jailhouse/enable.sh", command],
+                        )
+                    )
+                    phases.append(("system", f"stop_{phase}", None, stop))
+
+        script = []
+        script.append("sudo /bin/bash -s <<'AUTOJAIL_BOOT_TIME'")
+        script.append(f"out={output}")
+        script.append('rm -f "$out"')
+        # The realtime clock can not be mixed with the monotonic clock
+        script.append(
+            "if ! test -r /proc/timer_list; then "
+            'echo "error: /proc/timer_list is not readable" >> "$out"; exit 1; fi'
+        )
+        script.append(
+            "now() { awk '/^now at/ { printf \"%.0f\\n\", $3 / 1000; exit }' /proc/timer_list; }"
+        )
+        script.append(
+            "phase() { cell=$1; name=$2; image=$3; shift 3; "
+            'size=0; if test -n "$image"; then size=$(stat -c %s "$image" 2>/dev/null || echo 0); fi; '
+            't0=$(now); "$@" > /dev/null 2>&1; status=$?; t1=$(now); '
+            "time=$((t1 - t0)); "
+            "rate=$(awk -v s=$size -v t=$time 'BEGIN { if (t > 0) printf \"%.3f\", s / t; else print 0 }'); "
+            'echo "cell: $cell phase: $name repetition: $repetition time: $time us size: $size rate: $rate status: $status" >> "$out"; }'
+        )
+        script.append(
+            f"for repetition in $(seq 1 {self.BOOT_TIME_REPETITIONS}); do"
+        )
+        for cell_name, phase, image, command in phases:
+            script.append(
+                "    phase "
+                + " ".join(
+                    shlex.quote(arg)
+                    for arg in [cell_name, phase, image or ""] + command
+                )
+            )
+        script.append("done")
+        script.append('echo "boot time benchmark done" >> "$out"')
+        script.append("AUTOJAIL_BOOT_TIME")
+
+        log = []
+        for cell_name, phase, image, _command in phases:
+            metric = re.sub(r"\W", "_", cell_name)
+            pattern = (
+                f"cell: {re.escape(cell_name)} phase: {phase} "
+                f"repetition: (?P<repetition>[0-9]+) "
+                f"time: (?P<{metric}_{phase}_time>[0-9]+) us "
+            )
+            if image:
+                pattern += (
+                    f"size: (?P<{metric}_image_size>[0-9]+) "
+                    f"rate: (?P<{metric}_load_rate>[0-9.]+)"
+                )
+            log.append(pattern)
+
+        return TestEntry(
+            script=script,
+            check={output: ["boot time benchmark done"]},
+            log={output: log},
+            fail={output: [r"status: [1-9][0-9]*$", "^error: "]},
+            remove_outputs=True,
+        )
 
     def tests(self):
         tests: Dict[str, TestEntry] = {}
@@ -117,5 +463,14 @@ class TestProvider:
             ] = self._get_start_cell(cell)
         tests["start_all"] = self._get_start_all()
         tests["cyclictest_all"] = self._get_cyclictest()
+        tests["boot_time"] = self._get_boot_time()
+
+        for (
+            name,
+            (client, _client_ip, server, server_ip),
+        ) in self._network_links().items():
+            test = self._get_network(name, client, server, server_ip)
+            if test is not None:
+                tests[f"network_{name}"] = test
 
         return tests
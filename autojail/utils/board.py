@@ -2,13 +2,13 @@ import shlex
 import subprocess
 
 
-def start_board(autojail_config, cwd=None):
+def start_board(autojail_config, cwd=None, timeout=None):
     if autojail_config.start_command:
         for command in autojail_config.start_command:
-            subprocess.run(shlex.split(command), cwd=cwd)
+            subprocess.run(shlex.split(command), cwd=cwd, timeout=timeout)
 
 
-def stop_board(autojail_config, cwd=None):
+def stop_board(autojail_config, cwd=None, timeout=None):
     if autojail_config.stop_command:
         for command in autojail_config.stop_command:
-            subprocess.run(shlex.split(command), cwd=cwd)
+            subprocess.run(shlex.split(command), cwd=cwd, timeout=timeout)
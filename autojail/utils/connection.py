@@ -1,18 +1,127 @@
+import atexit
 import getpass
+import threading
 import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from fabric.connection import Connection
-from paramiko.ssh_exception import (
-    AuthenticationException,
-    PasswordRequiredException,
-    SSHException,
-)
+from .logging import getLogger
 
 if TYPE_CHECKING:
+    from fabric.connection import Connection
+
     from ..model import AutojailConfig
 
-global_context = None
+
+def backoff_delays(retries: int, initial: float = 0.5, maximum: float = 16.0):
+    """Exponentially growing delays between connection attempts"""
+    delay = initial
+    for _retry in range(retries):
+        yield delay
+        delay = min(delay * 2, maximum)
+
+
+def is_healthy(connection: Any) -> bool:
+    """Check that an open connection is still usable
+
+    For ssh connections this sends an ignore message, which fails
+    on transports whose peer has gone away.
+    """
+    if connection is None or not getattr(connection, "is_connected", True):
+        return False
+
+    client = getattr(connection, "client", None)
+    transport = client.get_transport() if client is not None else None
+    if transport is None:
+        return True
+
+    if not transport.is_active():
+        return False
+    try:
+        transport.send_ignore()
+    except Exception:
+        return False
+
+    return True
+
+
+class ConnectionPool:
+    """Process wide pool of connections to target boards keyed by login
+
+    Connections are checked for health before they are handed out and
+    transparently reopened if the board has gone away, e.g. after a reset.
+    Users of the pool must not close the connections themselves, but use
+    close() to drop them from the pool.
+    """
+
+    def __init__(self, keepalive: int = 30) -> None:
+        self.keepalive = keepalive
+        self._connections: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self.logger = getLogger()
+
+    def _login_lock(self, login: str) -> threading.Lock:
+        with self._lock:
+            if login not in self._locks:
+                self._locks[login] = threading.Lock()
+            return self._locks[login]
+
+    def get(
+        self,
+        config: "AutojailConfig",
+        context: Any,
+        passwd_retries: int = 5,
+        timeout_retries: int = 10,
+    ) -> "Connection":
+        login = str(config.login)
+        with self._login_lock(login):
+            connection = self._connections.get(login)
+            if connection is not None:
+                if is_healthy(connection):
+                    return connection
+
+                self.logger.info("Reconnecting to %s", login)
+                self._close(connection)
+                del self._connections[login]
+
+            connection = _open_connection(
+                config, context, passwd_retries, timeout_retries
+            )
+            if not is_healthy(connection):
+                return connection
+
+            client = getattr(connection, "client", None)
+            transport = client.get_transport() if client is not None else None
+            if transport is not None and self.keepalive:
+                transport.set_keepalive(self.keepalive)
+
+            self._connections[login] = connection
+
+            return connection
+
+    def close(self, login: Optional[str] = None) -> None:
+        """Close the connection to login, or all connections"""
+        with self._lock:
+            if login is None:
+                connections = list(self._connections.values())
+                self._connections.clear()
+            else:
+                connection = self._connections.pop(str(login), None)
+                connections = [connection] if connection is not None else []
+
+        for connection in connections:
+            self._close(connection)
+
+    def _close(self, connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception as e:
+            self.logger.debug("Error while closing connection: %s", str(e))
+
+
+connection_pool = ConnectionPool()
+atexit.register(connection_pool.close)
 
 
 def connect(
@@ -20,12 +129,33 @@ def connect(
     context: Any,
     passwd_retries: int = 5,
     timeout_retries=10,
-) -> Connection:
+) -> "Connection":
+    """Get a connection to the target board from the shared connection pool"""
+    return connection_pool.get(config, context, passwd_retries, timeout_retries)
+
+
+def _open_connection(
+    config: "AutojailConfig",
+    context: Any,
+    passwd_retries: int = 5,
+    timeout_retries=10,
+) -> "Connection":
+    # fabric and paramiko are only imported when a connection is needed
+    # as they dominate the start-up time of the command line interface
+    from fabric.connection import Connection
+    from paramiko.ssh_exception import (
+        AuthenticationException,
+        PasswordRequiredException,
+        SSHException,
+    )
+
     login = config.login
     connection = None
     if login.is_ssh:
         try:
-            for _timeout_retry in range(timeout_retries):
+            for _timeout_retry, delay in enumerate(
+                backoff_delays(timeout_retries)
+            ):
                 try:
                     connect_kwargs = None
                     if config.password is not None:
@@ -43,16 +173,16 @@ def connect(
 
                     if isinstance(e, AuthenticationException):
                         if config.password is not None:
-                            time.sleep(5)
+                            time.sleep(delay)
                             continue
                         else:
                             raise e
-                    time.sleep(5)
+                    time.sleep(delay)
                     continue
                 except EOFError as e:
                     if _timeout_retry == timeout_retries - 1:
                         raise e
-                    time.sleep(5)
+                    time.sleep(delay)
                     continue
                 break
 
@@ -72,7 +202,7 @@ def connect(
                     )
                 )
                 try:
-                    for _timeout_retry in range(timeout_retries):
+                    for delay in backoff_delays(timeout_retries):
                         try:
                             connection = Connection(
                                 user=login.user,
@@ -84,10 +214,10 @@ def connect(
                         except SSHException as e:
                             if isinstance(e, AuthenticationException):
                                 raise e
-                            time.sleep(5)
+                            time.sleep(delay)
                             continue
                         except EOFError:
-                            time.sleep(5)
+                            time.sleep(delay)
                             continue
                         break
                 except (
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Type, TypeVar
+
+import ruamel.yaml
+from pydantic import BaseModel
+
+from .. import __version__
+from .logging import getLogger
+
+CACHE_VERSION = 1
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+
+def _cache_path(path: Path) -> Path:
+    return path.with_name("." + path.name + ".cache")
+
+
+def _model_fingerprint() -> str:
+    """Identifies the model definitions a cache entry was created with"""
+    model_dir = Path(__file__).parent.parent / "model"
+    entries = [__version__, str(CACHE_VERSION)]
+    for model_file in sorted(model_dir.glob("*.py")):
+        stat = model_file.stat()
+        entries.append(f"{model_file.name}:{stat.st_mtime_ns}:{stat.st_size}")
+
+    return ";".join(entries)
+
+
+def _load_cache(
+    cache_path: Path, key: Dict[str, Any], content_hash: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    try:
+        with cache_path.open("rb") as cache_file:
+            entry = pickle.load(cache_file)
+    except Exception as e:
+        getLogger().debug("Ignoring model cache %s: %s", str(cache_path), e)
+        return None
+
+    if not isinstance(entry, dict):
+        return None
+
+    for name, value in key.items():
+        if entry.get(name) != value:
+            return None
+
+    if content_hash is not None and entry.get("hash") != content_hash:
+        return None
+
+    return entry
+
+
+def load_yaml_model(
+    path: Path, model_cls: Type[ModelType], use_cache: bool = True
+) -> ModelType:
+    """Load and validate a yaml file into model_cls
+
+    The validated model is pickled to a hidden sidecar file next to path,
+    keyed by the modification time and content hash of path. As long as
+    the yaml file is unchanged, later loads skip parsing and validation
+    and rebuild the model with construct().
+    """
+    logger = getLogger()
+
+    path = Path(path)
+    cache_path = _cache_path(path)
+
+    stat = path.stat()
+    key = {
+        "model": f"{model_cls.__module__}.{model_cls.__qualname__}",
+        "fingerprint": _model_fingerprint(),
+    }
+
+    if use_cache and cache_path.exists():
+        # Unchanged modification time and size avoid reading the file
+        entry = _load_cache(
+            cache_path,
+            dict(key, mtime=stat.st_mtime_ns, size=stat.st_size),
+            None,
+        )
+        if entry is None:
+            content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+            entry = _load_cache(cache_path, key, content_hash)
+
+        if entry is not None:
+            logger.debug("Loading %s from %s", str(path), str(cache_path))
+            return model_cls.construct(
+                _fields_set=entry["fields_set"], **entry["values"]
+            )
+
+    content = path.read_bytes()
+    yaml = ruamel.yaml.YAML()
+    model_dict = yaml.load(content)
+    if not model_dict:
+        model_dict = {}
+    model = model_cls(**model_dict)
+
+    if use_cache:
+        entry = dict(
+            key,
+            mtime=stat.st_mtime_ns,
+            size=stat.st_size,
+            hash=hashlib.sha256(content).hexdigest(),
+            fields_set=set(model.__fields_set__),
+            values={name: getattr(model, name) for name in model.__fields__},
+        )
+        tmp_path = cache_path.with_name(cache_path.name + f".{os.getpid()}")
+        try:
+            with tmp_path.open("wb") as cache_file:
+                pickle.dump(entry, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.debug("Could not write model cache %s: %s", cache_path, e)
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    return model
@@ -1,18 +1,28 @@
 import io
 import socket
-from typing import Union
+from typing import Optional, Union
 from urllib.parse import urlparse
 
 import serial
 
 
 def open_serial(
-    url: str, encoding: str = "utf-8"
-) -> Union[io.RawIOBase, serial.Serial]:
+    url: str,
+    encoding: str = "utf-8",
+    baudrate: int = 115200,
+    timeout: Optional[float] = None,
+) -> Union[io.TextIOBase, serial.Serial]:
+    """Open a serial console
+
+    unix:// urls are connected as unix domain sockets, e.g. the console of
+    an emulator, and returned as text files. All other urls are opened with
+    pyserial, which reads and writes bytes. timeout is the read timeout of
+    serial ports, reads from sockets always block.
+    """
     parsed_url = urlparse(url)
     if parsed_url.scheme == "unix":
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         sock.connect(parsed_url.path)
         return sock.makefile("rw", encoding=encoding)
     else:
-        return serial.serial_for_url(url, encoding=encoding)
+        return serial.serial_for_url(url, baudrate=baudrate, timeout=timeout)
@@ -54,3 +54,54 @@ def test_board_from_yaml_bytesize():
         assert board_model.name == "board1"
         assert board_model.memory_regions["ram"].size == 768 * 1024 * 1024
         assert board_model.memory_regions["ram2"].size == 1024
+
+
+def test_board_index():
+    board_yaml = os.path.join(test_data_folder, "rpi4_net", "board.yml")
+    with open(board_yaml) as board_yaml_file:
+        board_dict = yaml.safe_load(board_yaml_file)
+        board_model = Board(**board_dict)
+
+    for device in board_model.devices.values():
+        if device.phandle is not None:
+            found_name, found_device = board_model.index.by_phandle(
+                device.phandle
+            )
+            assert found_device.phandle == device.phandle
+
+    name, device = board_model.index.by_alias("ethernet0")
+    assert "ethernet0" in device.aliases
+    assert board_model.index.by_path(device.path) == (name, device)
+
+    name, region = board_model.index.mapped_device("serial0")
+    assert region is board_model.memory_regions[name]
+    assert "serial0" in region.aliases
+    assert board_model.index.mapped_device("does-not-exist") == (None, None)
+
+    timer = board_model.index.first_compatible(
+        ["arm,armv8-timer", "arm,armv7-timer"]
+    )
+    assert timer is not None
+    assert timer[0] == "timer"
+
+    assert "index" not in board_model.dict()
+
+
+def test_board_clock_index():
+    board_yaml = os.path.join(test_data_folder, "rpi4_net", "board.yml")
+    with open(board_yaml) as board_yaml_file:
+        board_dict = yaml.safe_load(board_yaml_file)
+        board_model = Board(**board_dict)
+
+    pllb_arm = board_model.index.clock("pllb_arm")
+    assert pllb_arm is not None
+    assert pllb_arm.rate == 1500000000
+
+    pllb = board_model.index.clock_parent("pllb_arm")
+    assert pllb is not None
+    assert pllb.name == "pllb"
+    assert "pllb_arm" in pllb.derived_clocks
+
+    assert board_model.index.clock("osc") is not None
+    assert board_model.index.clock_parent("osc") is None
+    assert board_model.index.clock("does-not-exist") is None
@@ -0,0 +1,74 @@
+from autojail.config.cpu import CPUAllocatorPass, cache_domains
+from autojail.model import CPU, Board, CellConfig, JailhouseConfig
+from autojail.model.parameters import GenerateParameters
+
+
+def _board(clusters=2, cores=2):
+    cpus = {}
+    for num in range(clusters * cores):
+        cpus[f"cpu@{num}"] = CPU(
+            name=f"cpu@{num}",
+            num=num,
+            compatible="arm,cortex-a53",
+            enable_method="psci",
+            next_level_cache=f"l2-cache{num // cores}",
+            cluster=f"cluster{num // cores}",
+        )
+    return Board.construct(cpuinfo=cpus)
+
+
+def _config(**placements):
+    cells = {"root": CellConfig.construct(type="root", name="root", cpus=None)}
+    for name, placement in placements.items():
+        cells[name] = CellConfig.construct(
+            type="linux", name=name, cpus=None, cpu_placement=placement
+        )
+    return JailhouseConfig.construct(cells=cells)
+
+
+def _allocate(board, config):
+    _board, config = CPUAllocatorPass(None, None)(board, config)
+    return {name: list(cell.cpus) for name, cell in config.cells.items()}
+
+
+def test_cache_domains():
+    assert cache_domains(_board(2, 2)) == {
+        "l2-cache0": [0, 1],
+        "l2-cache1": [2, 3],
+    }
+
+
+def test_allocate_any():
+    assert _allocate(_board(), _config(a="any", b="any")) == {
+        "root": [0, 1, 2, 3],
+        "a": [0],
+        "b": [1],
+    }
+
+
+def test_allocate_isolated():
+    # The latency critical cell gets the cluster without the root cell
+    cpus = _allocate(_board(), _config(be="packed", rt="isolated"))
+    assert cpus["rt"] == [2, 3]
+    assert cpus["be"] == [1]
+
+
+def test_allocate_packed():
+    cpus = _allocate(_board(3, 2), _config(a="packed", b="packed", c="packed"))
+    # Best effort cells share the cluster of the root cell first
+    assert cpus["a"] == [1]
+    assert cpus["b"] == [2]
+    assert cpus["c"] == [3]
+
+
+def test_allocate_isolated_fallback():
+    # Without a free cluster the lowest cpu next to the root cell is used
+    cpus = _allocate(_board(1, 4), _config(rt="isolated"))
+    assert cpus["rt"] == [1]
+
+
+def test_allocate_gen_params():
+    gen_params = GenerateParameters()
+    CPUAllocatorPass(None, gen_params)(_board(), _config(a="any", b="any"))
+    assert gen_params.cpu_allocation.choices == [1, 2, 3]
+    assert gen_params.cpu_allocation.partitions == 2
@@ -0,0 +1,322 @@
+import math
+import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from ruamel.yaml import YAML
+
+from autojail.explore import (
+    AgingEvolution,
+    ExploreDatabase,
+    LinearCostModel,
+    SearchSpace,
+    objective_value,
+)
+from autojail.explore.build import build_candidate
+from autojail.explore.database import config_hash
+from autojail.explore.space import mutate_scalar, sample_partitions
+from autojail.model import AutojailConfig, Board, MemoryRegion
+from autojail.model.parameters import (
+    GenerateConfig,
+    GenerateParameters,
+    Partitions,
+    ScalarChoice,
+)
+from autojail.test import runner as test_runner
+from autojail.utils.model_cache import load_yaml_model
+
+project_folder = Path(__file__).parent / "test_data"
+
+
+def _space():
+    return SearchSpace(
+        GenerateParameters(
+            cpu_allocation=Partitions(choices=[0, 1, 2, 3], partitions=2),
+            mem_io_merge_threshold=ScalarChoice(
+                lower=4096, upper=1024 * 1024, integer=True, log=True
+            ),
+        )
+    )
+
+
+def test_sample_partitions():
+    rng = random.Random(1)
+    partitions = Partitions(choices=[0, 1, 2, 3, 4], partitions=3)
+    for _ in range(100):
+        groups = sample_partitions(partitions, rng)
+        assert len(groups) == 3
+        assert all(groups)
+        flat = [choice for group in groups for choice in group]
+        assert len(flat) == len(set(flat))
+        assert set(flat) <= set(partitions.choices)
+
+    with pytest.raises(ValueError):
+        sample_partitions(Partitions(choices=[0], partitions=2), rng)
+
+
+def test_scalar_bounds():
+    rng = random.Random(1)
+    choice = ScalarChoice(lower=1, upper=10, step=1, integer=True)
+    value = 5
+    for _ in range(100):
+        mutated = mutate_scalar(choice, value, rng)
+        assert mutated != value
+        assert isinstance(mutated, int)
+        assert 1 <= mutated <= 10
+        value = mutated
+
+
+def test_sample_and_mutate():
+    rng = random.Random(1)
+    space = _space()
+    assert space.dimensions == ["cpu_allocation", "mem_io_merge_threshold"]
+
+    for _ in range(50):
+        config = space.sample(rng)
+        assert 4096 <= config.mem_io_merge_threshold <= 1024 * 1024
+
+        for dimension in space.dimensions:
+            mutated = space.mutate(config, rng, dimension=dimension)
+            changed = [
+                name
+                for name in space.dimensions
+                if getattr(mutated, name) != getattr(config, name)
+            ]
+            assert changed == [dimension]
+
+
+def test_aging_evolution():
+    space = _space()
+
+    def objective(config: GenerateConfig) -> float:
+        return abs(config.mem_io_merge_threshold - 65536)
+
+    optimizer = AgingEvolution(space, random.Random(1234), population_size=8)
+    for _ in range(8):
+        config = optimizer.ask()
+        optimizer.tell(config, objective(config))
+    initial = optimizer.best.objective
+
+    for _ in range(100):
+        config = optimizer.ask()
+        optimizer.tell(config, objective(config))
+
+    assert optimizer.best.objective < initial
+    assert len(optimizer.population) == 8
+    assert len(optimizer.history) == 108
+
+
+def test_objective_value():
+    metrics = pd.DataFrame({"p99_latency": [10.0, 20.0, None]})
+    results = {
+        "cyclictest_all": test_runner.TestResult(passed=True, metrics=metrics),
+        "boot_time": test_runner.TestResult(passed=True),
+    }
+
+    assert objective_value(results, "p99_latency") == 20.0
+    assert objective_value(results, "p99_latency", reduce="min") == 10.0
+    assert objective_value(results, "p99_latency", test="boot_time") == math.inf
+    assert objective_value(results, "max_latency") == math.inf
+    assert objective_value({}, "p99_latency") == math.inf
+
+    results["boot_time"] = test_runner.TestResult(passed=False)
+    assert objective_value(results, "p99_latency") == math.inf
+    # Only the test of the metric decides the feasibility
+    assert (
+        objective_value(results, "p99_latency", test="cyclictest_all") == 20.0
+    )
+
+
+def test_database(tmp_path):
+    config = GenerateConfig(
+        cpu_allocation=[[2, 3], [1]], mem_io_merge_threshold="64K"
+    )
+    same = GenerateConfig(
+        mem_io_merge_threshold=65536, cpu_allocation=[[2, 3], [1]]
+    )
+    other = config.copy(update={"cpu_allocation": [[1], [2, 3]]})
+    assert config_hash(config) == config_hash(same)
+    assert config_hash(config) != config_hash(other)
+
+    path = tmp_path / "explore" / "results.yml"
+    database = ExploreDatabase(path, project="a")
+    database.add(None, 20.0, 0)
+    database.add(config, math.inf, 1)
+    database.add(other, float("nan"), 2)
+
+    database = ExploreDatabase(path, project="a")
+    assert database.get(None) == 20.0
+    assert database.get(same) == math.inf
+    assert database.get(other) == math.inf
+    assert database.entry(same).config == config
+    assert database.next_step == 3
+
+    measured = config.copy(update={"mem_io_merge_threshold": 4096})
+    pruned = config.copy(update={"mem_io_merge_threshold": 8192})
+    database.add(measured, 10.0, 3, features={"guest_irqs": 2.0})
+    database.add(pruned, math.inf, 4, features={"guest_irqs": 8.0}, pruned=True)
+    database = ExploreDatabase(path, project="a")
+    # Pruned configurations are evaluated again
+    assert database.entry(pruned) is None
+    assert database.measurements() == [({"guest_irqs": 2.0}, 10.0)]
+    assert database.next_step == 5
+    database.add(pruned, 30.0, 5, features={"guest_irqs": 8.0})
+    assert database.get(pruned) == 30.0
+
+    # Results of other projects are not reused
+    database = ExploreDatabase(path, project="b")
+    assert database.get(None) is None
+    assert database.project_entries == []
+    assert database.next_step == 6
+
+
+def test_build_candidates(tmp_path):
+    project = tmp_path / "rpi4_default"
+    shutil.copytree(project_folder / "rpi4_default", project)
+
+    with (project / "autojail.yml").open() as f:
+        autojail_config = AutojailConfig(**YAML().load(f))
+    autojail_config.cross_compile = "no-such-cross-compiler-"
+    board = load_yaml_model(project / "board.yml", Board)
+
+    gen_params = GenerateParameters()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        result = pool.submit(
+            build_candidate,
+            board,
+            autojail_config,
+            project / "cells.yml",
+            tmp_path / "0" / "build",
+            tmp_path / "0" / "deploy",
+            gen_params=gen_params,
+        ).result()
+
+        assert result.ret == 0
+        assert (
+            tmp_path / "0" / "build" / "report" / "generated_cells.yml"
+        ).exists()
+        space = SearchSpace(result.gen_params)
+        assert space.dimensions
+
+        rng = random.Random(1)
+        configs = [space.sample(rng) for _ in range(2)]
+        futures = [
+            pool.submit(
+                build_candidate,
+                board,
+                autojail_config,
+                project / "cells.yml",
+                tmp_path / str(step) / "build",
+                tmp_path / str(step) / "deploy",
+                set_params=config,
+            )
+            for step, config in enumerate(configs, start=1)
+        ]
+        for step, future in enumerate(futures, start=1):
+            assert future.result().ret == 0
+            assert (tmp_path / str(step) / "deploy" / "etc").exists()
+            assert (tmp_path / str(step) / "build" / "raspberry-pi4.c").exists()
+
+
+def _cost_config(rt_cpus):
+    from autojail.model import CellConfig, JailhouseConfig
+    from autojail.model.jailhouse import IRQChip
+
+    return JailhouseConfig.construct(
+        cells={
+            "root": CellConfig.construct(
+                type="root",
+                cpus=[0, 1, 2, 3],
+                memory_regions={
+                    # 4 KiB uart mapped with 1 MiB of unused address space
+                    "mmio_0": MemoryRegion(
+                        physical_start_addr=0xFE200000,
+                        size=0x101000,
+                        flags=["MEM_READ", "MEM_WRITE", "MEM_IO"],
+                    ),
+                    "ram": MemoryRegion(
+                        physical_start_addr=0x0,
+                        size=0x10000000,
+                        flags=["MEM_READ", "MEM_WRITE"],
+                    ),
+                },
+                irqchips={},
+            ),
+            "rt": CellConfig.construct(
+                type="linux",
+                cpus=rt_cpus,
+                memory_regions={},
+                irqchips={
+                    "gic": IRQChip.construct(
+                        address=0, pin_base=32, interrupts=[32, 33]
+                    )
+                },
+            ),
+        }
+    )
+
+
+def test_cost_features():
+    from autojail.model.board import CPU
+
+    board = Board.construct(
+        cpuinfo={
+            f"cpu@{num}": CPU(
+                name=f"cpu@{num}",
+                num=num,
+                compatible="arm,cortex-a53",
+                enable_method="psci",
+                next_level_cache=f"l2-cache{num // 2}",
+            )
+            for num in range(4)
+        },
+        memory_regions={
+            "uart": MemoryRegion(
+                physical_start_addr=0xFE300000,
+                size=0x1000,
+                flags=["MEM_READ", "MEM_WRITE", "MEM_IO"],
+            )
+        },
+    )
+
+    model = LinearCostModel()
+    shared = model.features(board, _cost_config([3]))
+    assert shared == {
+        "shared_cache_cpus": 1.0,
+        "unused_io_size": 1.0,
+        "guest_irqs": 2.0,
+    }
+
+    isolated = model.features(board, _cost_config([2, 3]))
+    assert isolated["shared_cache_cpus"] == 0.0
+    assert model.predict(isolated) < model.predict(shared)
+
+
+def test_cost_calibration():
+    rng = random.Random(1)
+    samples = []
+    for _ in range(20):
+        features = {
+            "shared_cache_cpus": float(rng.randrange(4)),
+            "unused_io_size": rng.uniform(0, 64),
+            "guest_irqs": float(rng.randrange(8)),
+        }
+        objective = (
+            20.0
+            + 15.0 * features["shared_cache_cpus"]
+            + 0.5 * features["guest_irqs"]
+        )
+        samples.append((features, objective))
+
+    model = LinearCostModel()
+    model.calibrate(samples[:3])
+    assert not model.calibrated
+
+    model.calibrate(samples + [(samples[0][0], math.inf)])
+    assert model.calibrated
+    assert model.bias == pytest.approx(20.0, abs=0.1)
+    assert model.weights["shared_cache_cpus"] == pytest.approx(15.0, abs=0.1)
+    assert model.predict(samples[5][0]) == pytest.approx(samples[5][1], abs=0.1)
@@ -1,6 +1,8 @@
 import os.path
 import shutil
+import subprocess
 import tarfile
+import time
 from pathlib import Path
 
 import pytest
@@ -65,6 +67,22 @@ def test_parse_raspberrypi4b():
     assert "System RAM" in regions
 
 
+def test_parse_interrupts():
+    interrupts_name = Path(
+        os.path.join(test_data_folder, "interrupts_raspberrypi4b")
+    )
+    extractor = BoardInfoExtractor("rpi4b", "rpi4b", "")
+    interrupts = extractor.read_interrupts(interrupts_name)
+
+    # MSIs and IPIs are not routed through the GIC
+    assert len(interrupts) == 11
+    assert interrupts[189].irq == 31
+    assert interrupts[189].counts == [912577, 0, 0, 0]
+    assert interrupts[189].name == "eth0"
+    assert interrupts[158].name == "mmc1, mmc0"
+    assert interrupts[30].trigger == "Level"
+
+
 def test_parse_getconf():
     getconf_name = Path(os.path.join(test_data_folder, "getconf_x86"))
     extractor = BoardInfoExtractor("x86", "x6", "")
@@ -100,3 +118,92 @@ def test_extract_command(test_project):
     tester = CommandTester(command)
 
     tester.execute("-b board_data")
+
+
+def test_batch_extract(tmp_path, monkeypatch):
+    from autojail.commands.extract import ExtractCommand
+
+    for name in ["fast", "slow"]:
+        (tmp_path / name).mkdir()
+        shutil.copy(
+            os.path.join(test_data_folder, "rpi4_net", "autojail.yml"),
+            tmp_path / name / "autojail.yml",
+        )
+
+    # Login specs use the current project, here with the kernel of "fast"
+    config_text = (tmp_path / "fast" / "autojail.yml").read_text()
+    (tmp_path / "autojail.yml").write_text(
+        config_text.replace(
+            "kernel_dir: kernel", f"kernel_dir: {tmp_path / 'fast' / 'kernel'}"
+        )
+    )
+
+    module_builds = []
+
+    def fake_make(command, *args, **kwargs):
+        if command[-1] != "clean":
+            module_builds.append(command[-1])
+        return subprocess.CompletedProcess(command, 0)
+
+    def fake_extract_job(self, job, clock_info_extractor, timeout):
+        if job.cwd is not None:
+            assert job.config.kernel_dir == str(job.cwd / "kernel")
+        if job.target.endswith("slow"):
+            for _ in range(50):
+                if job.status == "timeout":
+                    raise Exception("aborted")
+                time.sleep(0.1)
+        job.board_yml.write_text("")
+
+    monkeypatch.setattr("autojail.commands.extract.which", lambda name: name)
+    monkeypatch.setattr("autojail.extract.clock_info.subprocess.run", fake_make)
+    monkeypatch.setattr(ExtractCommand, "_extract_job", fake_extract_job)
+
+    os.chdir(tmp_path)
+    application = AutojailApp()
+    command = application.find("extract")
+    tester = CommandTester(command)
+
+    assert tester.execute("--timeout 1 -j 2 fast slow ssh:pi@10.0.0.2") == 1
+    assert (tmp_path / "fast" / "board.yml").exists()
+    assert not (tmp_path / "slow" / "board.yml").exists()
+    assert (tmp_path / "boards" / "10.0.0.2" / "board.yml").exists()
+    assert len(module_builds) == len(set(module_builds)) == 2
+
+    output = tester.io.fetch_output()
+    assert "timeout" in output
+    assert "ok" in output
+
+
+def test_cache_topology(tmp_path):
+    import fdt
+
+    with open(os.path.join(test_data_folder, "cache_topology.dts")) as f:
+        tree = fdt.parse_dts(f.read())
+    dtb = tmp_path / "cache_topology.dtb"
+    dtb.write_bytes(tree.to_dtb(version=17))
+
+    extractor = DeviceTreeExtractor(dtb)
+    extractor.run()
+
+    assert [cpu.num for cpu in extractor.cpus] == [0, 1, 2, 3]
+    assert [cpu.next_level_cache for cpu in extractor.cpus] == [
+        "l2-cache0",
+        "l2-cache0",
+        "l2-cache1",
+        "l2-cache1",
+    ]
+    assert [cpu.cluster for cpu in extractor.cpus] == [
+        "cluster0",
+        "cluster0",
+        "cluster1",
+        "cluster1",
+    ]
+
+    assert set(extractor.caches) == {"l2-cache0", "l2-cache1", "l3-cache"}
+    l2 = extractor.caches["l2-cache1"]
+    assert l2.level == 2
+    assert l2.size == 0x100000
+    assert l2.waysize == 1024 * 64
+    assert l2.next_level_cache == "l3-cache"
+    assert extractor.caches["l3-cache"].next_level_cache is None
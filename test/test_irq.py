@@ -0,0 +1,102 @@
+from autojail.config.irq import PlanIRQsPass, interrupt_load
+from autojail.model import (
+    CPU,
+    Board,
+    CellConfig,
+    InterruptStats,
+    IRQChip,
+    JailhouseConfig,
+)
+
+
+def _board():
+    cpus = {}
+    for num in range(4):
+        cpus[f"cpu@{num}"] = CPU(
+            name=f"cpu@{num}",
+            num=num,
+            compatible="arm,cortex-a53",
+            enable_method="psci",
+            next_level_cache=f"l2-cache{num // 2}",
+        )
+    stats = {
+        30: InterruptStats(irq=3, counts=[100, 200, 300, 400]),
+        40: InterruptStats(irq=10, counts=[5000, 0, 0, 0], name="eth0"),
+        41: InterruptStats(irq=11, counts=[3000, 0, 0, 0], name="mmc0"),
+        42: InterruptStats(irq=12, counts=[10, 0, 0, 0], name="uart"),
+        43: InterruptStats(irq=13, counts=[0, 0, 0, 0], name="spi"),
+    }
+    return Board.construct(
+        cpuinfo=cpus,
+        devices={},
+        memory_regions={},
+        interrupt_stats=stats,
+        uptime=10.0,
+    )
+
+
+def _config(placement="isolated"):
+    root = CellConfig.construct(
+        type="root",
+        name="root",
+        cpus=[0, 1, 2, 3],
+        vpci_irq_base=None,
+        irqchips={
+            "gic": IRQChip(address=0x1000, pin_base=32, interrupts="40-50")
+        },
+    )
+    guest = CellConfig.construct(
+        type="linux",
+        name="guest",
+        cpus=[2, 3],
+        cpu_placement=placement,
+        vpci_irq_base=100,
+        irqchips={"gic": IRQChip(address=0x1000, pin_base=32, interrupts=[42])},
+    )
+    return JailhouseConfig.construct(cells={"root": root, "guest": guest})
+
+
+def test_prune_root_interrupts():
+    _board_, config = PlanIRQsPass()(_board(), _config())
+    assert config.cells["root"].irqchips["gic"].interrupts == [40, 41, 42, 43]
+
+
+def test_prune_root_interrupts_keeps_empty_irqchips():
+    config = _config()
+    root = config.cells["root"]
+    root.irqchips = {
+        "gic0": IRQChip(address=0x800, pin_base=160, interrupts="170-175"),
+        **root.irqchips,
+    }
+    _board_, config = PlanIRQsPass()(_board(), config)
+    irqchips = config.cells["root"].irqchips
+    assert list(irqchips) == ["gic0", "gic"]
+    assert irqchips["gic0"].interrupts == []
+
+
+def test_place_interrupts():
+    _board_, config = PlanIRQsPass()(_board(), _config())
+    # High rate interrupts are balanced over the root cpus
+    assert config.cells["root"].irq_affinity == {40: [0], 41: [1]}
+
+
+def test_place_interrupts_without_critical_cells():
+    _board_, config = PlanIRQsPass()(_board(), _config(placement="any"))
+    assert config.cells["root"].irq_affinity == {}
+
+
+def test_interrupt_load():
+    board, config = PlanIRQsPass()(_board(), _config())
+    assert interrupt_load(board, config) == {
+        0: 510.0,
+        1: 320.0,
+        2: 30.5,
+        3: 40.5,
+    }
+
+
+def test_no_interrupt_stats():
+    board = _board()
+    board.interrupt_stats = {}
+    _board_, config = PlanIRQsPass()(board, _config())
+    assert len(config.cells["root"].irqchips["gic"].interrupts) == 11
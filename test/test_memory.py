@@ -0,0 +1,157 @@
+import pytest
+
+from autojail.config.memory import (
+    AllocateMemoryPass,
+    color_footprint,
+    dram_bank,
+    dram_bank_runs,
+    dram_block_size,
+    format_ranges,
+    last_level_caches,
+)
+from autojail.model import (
+    CPU,
+    Board,
+    Cache,
+    CellConfig,
+    DRAMMapping,
+    JailhouseConfig,
+)
+
+
+def _board(way_size=0x10000):
+    caches = {
+        "l2-cache0": Cache(
+            name="l2-cache0", next_level_cache="l3-cache", waysize=0x8000
+        ),
+        "l2-cache1": Cache(
+            name="l2-cache1", next_level_cache="l3-cache", waysize=0x8000
+        ),
+        "l3-cache": Cache(
+            name="l3-cache", next_level_cache=None, waysize=way_size
+        ),
+    }
+    cpus = {}
+    for num in range(4):
+        cpus[f"cpu@{num}"] = CPU(
+            name=f"cpu@{num}",
+            num=num,
+            compatible="arm,cortex-a53",
+            enable_method="psci",
+            next_level_cache=f"l2-cache{num // 2}",
+        )
+    return Board.construct(cpuinfo=cpus, caches=caches, pagesize=0x1000)
+
+
+def _config(**budgets):
+    cells = {
+        "root": CellConfig.construct(
+            type="root", name="root", platform_info=None
+        )
+    }
+    for name, budget in budgets.items():
+        cells[name] = CellConfig.construct(
+            type="linux", name=name, cache_colors=budget, dram_banks=None
+        )
+    return JailhouseConfig.construct(cells=cells)
+
+
+def _assign(board, config):
+    allocator = AllocateMemoryPass()
+    allocator.board = board
+    allocator.config = config
+    allocator._assign_colors()
+    return allocator
+
+
+def test_last_level_caches():
+    assert [cache.name for cache in last_level_caches(_board())] == ["l3-cache"]
+
+
+def test_color_footprint():
+    # Half of the colors need twice the address range
+    assert color_footprint(0x100000, 0xFF, 0x10000, 0x1000) == 0x200000
+    assert color_footprint(0x100000, 0xFFFF, 0x10000, 0x1000) == 0x100000
+    # Partially used ways are rounded up
+    assert color_footprint(0x1000, 0x3, 0x10000, 0x1000) == 0x10000
+
+
+def test_assign_colors():
+    allocator = _assign(_board(), _config(a=4, b=8, c=None))
+    assert allocator.colors == {"a": 0xF, "b": 0xFF0}
+    assert allocator.color_way_size == 0x10000
+
+
+def test_assign_colors_exceeds_cache():
+    with pytest.raises(Exception, match="only has 16"):
+        _assign(_board(), _config(a=8, b=9))
+
+
+def test_assign_colors_not_positive():
+    with pytest.raises(Exception, match="must be positive"):
+        _assign(_board(), _config(a=4, b=0))
+
+
+def test_assign_colors_without_geometry():
+    with pytest.raises(Exception, match="way size"):
+        _assign(Board.construct(cpuinfo={}, caches={}), _config(a=4))
+
+
+def test_dram_bank():
+    mapping = DRAMMapping(channel=[0x10000], bank=[0x2000, 0x4000 | 0x20000])
+    assert dram_block_size(mapping) == 0x2000
+    assert dram_bank(mapping, 0x0) == 0
+    assert dram_bank(mapping, 0x2000) == 1
+    assert dram_bank(mapping, 0x4000) == 2
+    assert dram_bank(mapping, 0x10000) == 4
+    # Bank bits are the parity of the masked address
+    assert dram_bank(mapping, 0x20000) == 2
+    assert dram_bank(mapping, 0x24000) == 0
+
+
+def test_dram_bank_runs():
+    mapping = DRAMMapping(bank=[0x2000, 0x4000])
+    assert dram_bank_runs(mapping, {0, 1}, 0x1000, 0x10000) == [
+        (0x2000, 0x4000),
+        (0x8000, 0xC000),
+    ]
+
+    # Runs repeat with the period of the highest mapping bit
+    mapping = DRAMMapping(channel=[0x10000], bank=[0x2000, 0x4000 | 0x20000])
+    start, end = 0x3000, 0x93000
+    expected = []
+    for addr in range(0x4000, end - 0x1000, 0x2000):
+        if dram_bank(mapping, addr) in {1, 2, 4}:
+            if expected and expected[-1][1] == addr:
+                expected[-1] = (expected[-1][0], addr + 0x2000)
+            else:
+                expected.append((addr, addr + 0x2000))
+    assert dram_bank_runs(mapping, {1, 2, 4}, start, end) == expected
+
+
+def test_format_ranges():
+    assert format_ranges([6, 0, 1, 2, 3, 8, 9]) == "0-3,6,8-9"
+    assert format_ranges([]) == ""
+
+
+def test_assign_banks():
+    board = _board()
+    board.dram_mapping = DRAMMapping(bank=[0x2000, 0x4000, 0x8000])
+    config = _config()
+    config.cells["rt"] = CellConfig.construct(
+        type="linux", name="rt", cache_colors=None, dram_banks=2
+    )
+    config.cells["be"] = CellConfig.construct(
+        type="linux", name="be", cache_colors=None, dram_banks=6
+    )
+    allocator = _assign(board, config)
+    allocator._assign_banks()
+    assert allocator.banks == {"rt": {0, 1}, "be": {2, 3, 4, 5, 6, 7}}
+
+    config.cells["be"].dram_banks = 7
+    with pytest.raises(Exception, match="only has 8"):
+        allocator._assign_banks()
+
+    config.cells["be"].dram_banks = 0
+    with pytest.raises(Exception, match="must be positive"):
+        allocator._assign_banks()
@@ -1,5 +1,6 @@
 import filecmp
 import os
+import re
 import shutil
 import stat
 import subprocess
@@ -164,6 +165,152 @@ def test_config_rpi4_fixed_pci_mmconfig_base(tmpdir):
     assert filecmp.cmp("raspberry-pi4.c", "golden/raspberry-pi4.c")
 
 
+def test_config_rpi4_net_cache_coloring(tmpdir):
+    """ Tests that the memory of the guest in rpi4_net is cache colored"""
+
+    os.chdir(tmpdir)
+    shutil.copytree(Path(project_folder) / "rpi4_net", "rpi4_net")
+    os.chdir("rpi4_net")
+
+    yaml = YAML()
+    with open("cells.yml") as f:
+        cells = yaml.load(f)
+    cells["cells"]["guest1"]["cache_colors"] = 8
+    with open("cells.yml", "w") as f:
+        yaml.dump(cells, f)
+
+    # Cortex-A72 with 1 MB 16-way L2 cache
+    with open("board.yml") as f:
+        board = yaml.load(f)
+    board["caches"] = {
+        "l2-cache0": {
+            "name": "l2-cache0",
+            "next_level_cache": None,
+            "waysize": 0x10000,
+            "sets": 1024,
+            "linesize": 64,
+            "size": 0x100000,
+            "level": 2,
+        }
+    }
+    for cpu in board["cpuinfo"].values():
+        cpu["next_level_cache"] = "l2-cache0"
+    with open("board.yml", "w") as f:
+        yaml.dump(board, f)
+
+    application = AutojailApp()
+    command = application.find("generate")
+    tester = CommandTester(command)
+
+    # Colored loadable regions can only be loaded through a root map offset
+    with pytest.raises(Exception, match="color_root_map_offset"):
+        tester.execute(interactive=False, args="--skip-check --generate-only")
+
+    cells["cells"]["root"]["platform_info"] = {
+        "pci_mmconfig_end_bus": 0,
+        "pci_is_virtual": 1,
+        "pci_domain": 1,
+        "color_root_map_offset": 0xC000000000,
+    }
+    with open("cells.yml", "w") as f:
+        yaml.dump(cells, f)
+
+    assert (
+        tester.execute(interactive=False, args="--skip-check --generate-only")
+        == 0
+    )
+
+    root_config = Path("rpi4-net.c").read_text()
+    assert ".way_size = 0x10000," in root_config
+    assert ".root_map_offset = 0xc000000000," in root_config
+    # Colored loadable regions are not mapped into the root cell
+    assert "Boot Memory@guest1" not in root_config
+
+    guest_config = Path("rpi4-net-guest.c").read_text()
+    assert guest_config.count("JAILHOUSE_MEM_COLORED") == 1
+    assert ".colors = 0xff," in guest_config
+
+
+def test_config_rpi4_net_dram_banks(tmpdir):
+    """ Tests that the memory of the guest in rpi4_net is bank partitioned"""
+
+    os.chdir(tmpdir)
+    shutil.copytree(Path(project_folder) / "rpi4_net", "rpi4_net")
+    os.chdir("rpi4_net")
+
+    yaml = YAML()
+    with open("cells.yml") as f:
+        cells = yaml.load(f)
+    cells["cells"]["guest1"]["dram_banks"] = 4
+    with open("cells.yml", "w") as f:
+        yaml.dump(cells, f)
+
+    with open("board.yml") as f:
+        board = yaml.load(f)
+    board["dram_mapping"] = {"bank": [0x2000, 0x4000, 0x8000]}
+    with open("board.yml", "w") as f:
+        yaml.dump(board, f)
+
+    application = AutojailApp()
+    command = application.find("generate")
+    tester = CommandTester(command)
+
+    assert (
+        tester.execute(interactive=False, args="--skip-check --generate-only")
+        == 0
+    )
+
+    # Banks 0-3 are the 32K halves of each 64K block
+    guest_config = Path("rpi4-net-guest.c").read_text()
+    assert guest_config.count("/*Boot Memory 0x") == 32
+    assert "/*Boot Memory 0x30000000-0x30008000*/" in guest_config
+    assert "/*Boot Memory 0x30010000-0x30018000*/" in guest_config
+
+    root_config = Path("rpi4-net.c").read_text()
+    assert root_config.count("/*Boot Memory@guest1 0x") == 32
+
+
+def test_config_rpi4_net_shmem_huge_pages(tmpdir):
+    """ Tests the region sizes of the shmem-net link in rpi4_net"""
+
+    os.chdir(tmpdir)
+    shutil.copytree(Path(project_folder) / "rpi4_net", "rpi4_net")
+    os.chdir("rpi4_net")
+
+    yaml = YAML()
+    with open("cells.yml") as f:
+        cells = yaml.load(f)
+    cells["shmem"]["net1"]["per_device_region_size"] = "1 MB"
+    cells["shmem"]["net1"]["huge_pages"] = True
+    with open("cells.yml", "w") as f:
+        yaml.dump(cells, f)
+
+    application = AutojailApp()
+    command = application.find("generate")
+    tester = CommandTester(command)
+
+    assert (
+        tester.execute(interactive=False, args="--skip-check --generate-only")
+        == 0
+    )
+
+    guest_config = Path("rpi4-net-guest.c").read_text()
+    starts = [
+        int(start, 16)
+        for start in re.findall(r"/\*net1 (0x[0-9a-f]+)-", guest_config)
+    ]
+    sizes = [
+        int(size, 16)
+        for size in re.findall(
+            r"/\*net1 0x[0-9a-f]+-0x[0-9a-f]+\*/\n\t\{\n.*\n.*\n\t\t\.size = (0x[0-9a-f]+),",
+            guest_config,
+        )
+    ]
+    assert sizes == [0x1000, 0x1FF000, 0x200000, 0x200000]
+    assert starts[0] % 0x200000 == 0
+    assert starts[2] % 0x200000 == 0
+
+
 def prepare_qemu_scripts():
     def ensure_executable(script_path: Path):
         curr_mode = script_path.stat().st_mode
@@ -0,0 +1,681 @@
+import re
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from invoke import Context
+
+# Imported as modules, pytest would try to collect the Test* classes
+from autojail.model import test as test_model
+from autojail.test import runner as test_runner
+
+
+class LocalConnection(Context):
+    """Runs the commands of the test runner on the local machine"""
+
+    is_connected = True
+
+    def put(self, local, remote):
+        if isinstance(local, str):
+            subprocess.run(["cp", local, remote], check=True)
+            return
+        with open(remote, "wb") as f:
+            f.write(local.read())
+
+    def get(self, remote, local):
+        with open(remote, "rb") as f:
+            local.write(f.read())
+
+
+def test_batched_tests(tmp_path):
+    output_file = str(tmp_path / "output.txt")
+    tests = {
+        "passing": test_model.TestEntry(
+            script=[f"echo 'latency: 42' > {output_file}"],
+            check={output_file: ["latency"]},
+            log={output_file: [r"latency: (?P<latency>[0-9]+)"]},
+        ),
+        "failing_check": test_model.TestEntry(
+            script=[f"echo 'nothing' > {output_file}"],
+            check={output_file: ["latency"]},
+        ),
+        "missing_output": test_model.TestEntry(
+            script=["true"], check={str(tmp_path / "missing.txt"): ["."]}
+        ),
+        "failing_script": test_model.TestEntry(script=["exit 3"]),
+        "timeout": test_model.TestEntry(script=["sleep 10"], timeout=1),
+    }
+
+    runner = test_runner.TestRunner(
+        None, None, None, test_model.TestConfig(__root__={}), None, batch=True
+    )
+    runner.connection = LocalConnection()
+    results = runner._run_tests_batched(tests)
+
+    assert list(results) == list(tests)
+    assert results["passing"].passed
+    assert not results["failing_check"].passed
+    assert not results["missing_output"].passed
+    assert not results["failing_script"].passed
+    assert not results["timeout"].passed
+
+
+def test_streaming_test(tmp_path, monkeypatch):
+    # Local script files must not collide with the uploaded ones in /tmp
+    (tmp_path / "local").mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "local"))
+
+    output_file = str(tmp_path / "output.txt")
+    runner = test_runner.TestRunner(
+        None, None, None, test_model.TestConfig(__root__={}), None
+    )
+    runner.connection = LocalConnection()
+
+    # Existing content of the output files is kept, but not parsed
+    with open(output_file, "w") as f:
+        f.write("T: 0 Max: 999\n")
+
+    passing = test_model.TestEntry(
+        script=[
+            f'for i in 1 2 3; do echo "T: 0 Max: $i" >> {output_file}; done',
+            "sleep 2",
+        ],
+        check={output_file: ["Max: 3"]},
+        log={
+            output_file: [r"T: (?P<thread>[0-9]+) Max: (?P<max_latency>[0-9]+)"]
+        },
+    )
+    result = runner._run_test(passing)
+    assert result.passed
+    assert list(result.metrics["max_latency"]) == [1, 2, 3]
+    with open(output_file) as f:
+        assert f.readline() == "T: 0 Max: 999\n"
+
+    aborted = test_model.TestEntry(
+        script=[f"echo 'Max: 999' > {output_file}", "sleep 60"],
+        fail={output_file: ["Max: [0-9]{3}"]},
+        remove_outputs=True,
+    )
+    start = time.monotonic()
+    assert not runner._run_test(aborted).passed
+    assert time.monotonic() - start < 30
+
+
+def test_metric_stream():
+    from autojail.test.metrics import MetricStream, TailStreamWriter
+
+    stream = MetricStream(
+        check={"/tmp/a": ["started", "done"]},
+        log={
+            "/tmp/a": [
+                r"T: (?P<thread>[0-9]+) Max: (?P<max_latency>[0-9]+)",
+                r"T: (?P<thread>[0-9]+) Avg: (?P<avg_latency>[0-9]+)",
+            ]
+        },
+        fail={"/tmp/b": ["Oops"]},
+    )
+
+    writer = TailStreamWriter(stream)
+    writer.write("==> /tmp/a <==\nstarted\nT: 0 Ma")
+    writer.write("x: 10\nT: 1 Avg: 5\n\n==> /tmp/b <==\nall good\n")
+    assert not stream.failed
+    assert not stream.passed
+    assert stream.missing_checks == {"/tmp/a": ["done"]}
+
+    writer.write("==> /tmp/a <==\ndone\n")
+    assert stream.passed
+
+    frame = stream.metrics.to_frame()
+    assert list(frame.columns) == ["thread", "max_latency", "avg_latency"]
+    assert list(frame["thread"]) == [0, 1]
+    assert frame["max_latency"][0] == 10
+    assert frame["avg_latency"].isna()[0]
+    assert frame["avg_latency"][1] == 5
+
+    stream.feed("/tmp/b", "Oops: kernel")
+    assert not stream.failed
+    stream.close()
+    assert stream.failed
+    assert not stream.passed
+
+
+def test_result_store(tmp_path):
+    import numpy as np
+    import pandas as pd
+
+    from autojail.test.results import ResultStore, RunInfo, compare, summarize
+
+    store = ResultStore(tmp_path / "results" / "metrics.csv")
+    assert store.load().empty
+
+    rng = np.random.default_rng(0)
+
+    def run(revision, offset):
+        info = RunInfo(board="4", config_hash="1e10", revision=revision)
+        metrics = pd.DataFrame(
+            {
+                "thread": [0.0, 1.0] * 50,
+                "max_latency": rng.normal(20.0 + offset, 1.0, 100),
+            }
+        )
+        results = {"cyclictest": test_runner.TestResult(True, metrics)}
+        return store.append(info, results)
+
+    baseline = run("v1", 0.0)
+    assert len(baseline) == 200
+    unchanged = run("v2", 0.0)
+    regressed = run("v3", 5.0)
+
+    history = store.load()
+    assert len(history) == 600
+    assert set(history["revision"]) == {"v1", "v2", "v3"}
+    assert set(history["config_hash"]) == {"1e10"}
+    assert set(history["board"]) == {"4"}
+
+    summary = summarize(history[history["revision"] == "v1"])
+    row = summary[summary["metric"] == "max_latency"].iloc[0]
+    assert row["count"] == 100
+    assert row["min"] <= row["avg"] <= row["p99"] <= row["max"]
+
+    stored_baseline = history[history["revision"] == "v1"]
+    (comparison,) = compare(unchanged, stored_baseline)
+    assert comparison.metric == "max_latency"
+    assert not comparison.regression
+
+    (comparison,) = compare(regressed, stored_baseline)
+    assert comparison.regression
+    assert comparison.current_avg > comparison.baseline_avg
+
+
+def test_latency_histogram():
+    import numpy as np
+
+    from autojail.test.histogram import parse_histogram
+    from autojail.test.metrics import MetricStream
+    from autojail.test.results import ResultStore, RunInfo
+
+    lines = ["# Histogram"]
+    for latency in range(10):
+        # Thread 0: 100 samples at 5us, thread 1: 10 samples per bucket
+        lines.append(
+            f"{latency:06d} {100 if latency == 5 else 0:06d}\t{10:06d}"
+        )
+    lines += [
+        "# Total: 000000101 000000100",
+        "# Min Latencies: 00005 00000",
+        "# Avg Latencies: 00005 00004",
+        "# Max Latencies: 00250 00009",
+        "# Histogram Overflows: 00001 00000",
+        "# Histogram Overflow at cycle number:",
+        "# Thread 0: 00042",
+        "# Thread 1:",
+    ]
+
+    histogram = parse_histogram(lines)
+    assert histogram.threads == 2
+    assert list(histogram.samples) == [101, 100]
+    assert list(histogram.overflows) == [1, 0]
+
+    percentiles = histogram.percentiles([50, 99, 99.99])
+    assert list(percentiles[:, 0]) == [5, 5, 250]
+    assert list(percentiles[:, 1]) == [4, 9, 9]
+    assert list(histogram.outliers(7)) == [1, 20]
+
+    latencies, cdf = histogram.cdf()
+    assert latencies.shape == (10,)
+    assert cdf.shape == (10, 2)
+    assert np.isclose(cdf[-1, 1], 1.0)
+
+    files = ["/tmp/cyclictest_guest1.hist", "/tmp/cyclictest_guest2.hist"]
+    stream = MetricStream(
+        check={}, log={}, histogram=files, outlier_threshold=7
+    )
+    for file in files:
+        stream.feed(file, "\n".join(lines))
+    stream.close()
+    frame = stream.to_frame()
+    assert list(frame["cell"]) == ["guest1", "guest1", "guest2", "guest2"]
+    assert list(frame["thread"]) == [0, 1, 0, 1]
+    assert list(frame["p99_99_latency"]) == [250, 9, 250, 9]
+    assert list(frame["outliers"]) == [1, 20, 1, 20]
+
+    # The distributions of the cells are stored as separate metrics
+    store = ResultStore(Path("metrics.csv"))
+    long = store.frame(
+        RunInfo(board="rpi4", config_hash="abcd", revision="v1"),
+        {"cyclictest": test_runner.TestResult(True, frame)},
+    )
+    p99 = long[long["metric"] == "guest2_p99_99_latency"]
+    assert list(p99["value"]) == [250, 9]
+    assert "cell" not in set(long["metric"])
+
+
+def test_boot_time_test(tmp_path, monkeypatch):
+    from autojail.model import CellConfig, JailhouseConfig
+    from autojail.test.test import TestProvider
+
+    (tmp_path / "local").mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "local"))
+
+    output_file = str(tmp_path / "boot_time.txt")
+    monkeypatch.setattr(TestProvider, "BOOT_TIME_OUTPUT", output_file)
+    monkeypatch.setattr(TestProvider, "BOOT_TIME_REPETITIONS", 3)
+
+    config = JailhouseConfig.construct(
+        cells={
+            "root": CellConfig.construct(type="root", name="Root Cell"),
+            "inmate": CellConfig.construct(
+                type="bare", name="Inmate", image="build/inmate.bin"
+            ),
+        }
+    )
+    provider = TestProvider(None, config, None)
+    test = provider._get_boot_time()
+
+    # Replace the jailhouse tools by local commands
+    fake = tmp_path / "fake.sh"
+    fake.write_text("#!/bin/sh\nsleep 0.01\n")
+    fake.chmod(0o755)
+    script = [
+        line.replace("sudo /bin/bash", "/bin/bash")
+        .replace("/etc/jailhouse/enable.sh", str(fake))
+        .replace("/usr/sbin/jailhouse", str(fake))
+        for line in test.script
+    ]
+    test = test.copy(update={"script": script})
+
+    runner = test_runner.TestRunner(
+        None, None, None, test_model.TestConfig(__root__={}), None
+    )
+    runner.connection = LocalConnection()
+    result = runner._run_test(test)
+
+    assert result.passed
+    metrics = result.metrics
+    for metric in [
+        "root_cell_enable_time",
+        "inmate_create_time",
+        "inmate_load_time",
+        "inmate_image_size",
+        "inmate_load_rate",
+        "inmate_start_time",
+        "root_cell_disable_time",
+        "system_ready_sequential_time",
+        "system_ready_parallel_time",
+    ]:
+        assert metrics[metric].count() == 3
+    assert (metrics["inmate_start_time"].dropna() >= 10000).all()
+
+    # Without the monotonic clock the test fails
+    script = [
+        line.replace("/proc/timer_list", str(tmp_path / "no_timer_list"))
+        for line in script
+    ]
+    result = runner._run_test(test.copy(update={"script": script}))
+    assert not result.passed
+
+
+def test_network_test():
+    from autojail.model import CellConfig, JailhouseConfig, ShmemConfigNet
+    from autojail.test.metrics import MetricStream
+    from autojail.test.test import TestProvider
+
+    config = JailhouseConfig.construct(
+        cells={
+            "root": CellConfig.construct(type="root", name="Root Cell"),
+            "guest": CellConfig.construct(type="linux", name="Guest"),
+        },
+        shmem={
+            "net1": ShmemConfigNet(
+                protocol="SHMEM_PROTO_VETH",
+                peers=["root", "guest"],
+                network={
+                    "root": {"addresses": ["10.0.0.1/24"]},
+                    "guest": {"addresses": ["10.0.0.2/24"]},
+                },
+            )
+        },
+    )
+    provider = TestProvider(None, config, None)
+    tests = provider.tests()
+    test = tests["network_net1"]
+
+    assert 'ssh root@10.0.0.2 "iperf3 -s -D"' in test.script
+    assert test.cell_stats == ["/tmp/network_net1_cell_stats.txt"]
+    assert "cell_stats after >> /tmp/network_net1_cell_stats.txt" in test.script
+    assert (
+        "iperf3 -c 10.0.0.2 -t 10 -f m -l 1024 -u -b 0 > /tmp/iperf3_net1_udp_1024.txt"
+        in test.script
+    )
+
+    stream = MetricStream(check=test.check, log=test.log)
+    stream.feed(
+        "/tmp/iperf3_net1_tcp_64.txt",
+        "[  5]   0.00-10.00  sec   120 MBytes   101 Mbits/sec    0             sender\n"
+        "[  5]   0.00-10.04  sec   119 MBytes  99.5 Mbits/sec                  receiver\n",
+    )
+    stream.feed(
+        "/tmp/iperf3_net1_udp_1024.txt",
+        "[  5]   0.00-10.00  sec   512 MBytes   429 Mbits/sec  0.000 ms  0/524288 (0%)  sender\n"
+        "[  5]   0.00-10.00  sec   500 MBytes   419 Mbits/sec  0.021 ms  12288/524288 (2.3%)  receiver\n",
+    )
+    stream.feed(
+        "/tmp/ping_net1.txt",
+        "PING 10.0.0.2 (10.0.0.2) 56(84) bytes of data.\n"
+        "64 bytes from 10.0.0.2: icmp_seq=1 ttl=64 time=0.112 ms\n"
+        "64 bytes from 10.0.0.2: icmp_seq=2 ttl=64 time=0.098 ms\n",
+    )
+    stream.close()
+
+    frame = stream.to_frame()
+    assert frame["net_net1_tcp_64_throughput"].dropna().tolist() == [99.5]
+    assert frame["net_net1_udp_1024_throughput"].dropna().tolist() == [419.0]
+    assert frame["net_net1_udp_1024_jitter"].dropna().tolist() == [0.021]
+    assert frame["net_net1_udp_1024_loss"].dropna().tolist() == [2.3]
+    assert frame["net_net1_rtt"].dropna().tolist() == [0.112, 0.098]
+    # Only some of the runs have been fed
+    assert not stream.passed
+
+    # Links named with a leading digit give valid metric names
+    config.shmem = {"10g": config.shmem["net1"]}
+    test = TestProvider(None, config, None).tests()["network_10g"]
+    MetricStream(check=test.check, log=test.log)
+
+
+def test_select_tests():
+    from autojail.model import CellConfig, JailhouseConfig
+
+    config = JailhouseConfig.construct(
+        cells={"root": CellConfig.construct(type="root", name="Root Cell")},
+        shmem=None,
+    )
+    test_config = test_model.TestConfig(
+        __root__={"custom": test_model.TestEntry(script=["true"])}
+    )
+    runner = test_runner.TestRunner(
+        None, None, config, test_config, None, select=["boot_time", "custom"]
+    )
+    assert list(runner._prepare_tests()) == ["boot_time", "custom"]
+
+
+def test_board_pool():
+    import threading
+
+    from autojail.model import AutojailConfig, AutojailLogin, TargetBoard
+    from autojail.test.pool import BoardPoolRunner
+
+    config = AutojailConfig.construct(
+        login=AutojailLogin.validate("board0"),
+        reset_command=[],
+        start_command=[],
+        stop_command=[],
+    )
+    boards = [TargetBoard(login="board0"), TargetBoard(login="board1")]
+    tests = {
+        f"test{num}": test_model.TestEntry(script=[str(num)])
+        for num in range(6)
+    }
+    tests["hangs_on_board0"] = test_model.TestEntry(script=["hang"])
+
+    pool = BoardPoolRunner(
+        config, None, None, test_model.TestConfig(__root__={}), None, boards
+    )
+
+    executed = []
+    lock = threading.Lock()
+    for runner in pool.runners:
+        login = str(runner.autojail_config.login)
+
+        def run_test(test, login=login):
+            if test.script == ["hang"] and login == "ssh:board0":
+                raise EOFError("connection lost")
+            time.sleep(0.2)
+            with lock:
+                executed.append((test.script[0], login))
+            return test_runner.TestResult(passed=True)
+
+        runner._prepare_tests = lambda: dict(tests)
+        runner._run_reset = lambda: None
+        runner._wait_for_connection = lambda: None
+        runner._deploy = lambda: None
+        runner._run_stop = lambda: None
+        runner._run_test = run_test
+
+    start = time.monotonic()
+    results = pool.run()
+    duration = time.monotonic() - start
+
+    assert list(results) == list(tests)
+    assert all(result.passed for result in results.values())
+    assert ("hang", "ssh:board1") in executed
+    assert {login for _script, login in executed} == {
+        "ssh:board0",
+        "ssh:board1",
+    }
+    # 7 tests of 0.2s on two boards
+    assert duration < 7 * 0.2
+
+
+def test_board_pool_setup_timeout():
+    import threading
+
+    from autojail.model import AutojailConfig, AutojailLogin, TargetBoard
+    from autojail.test.pool import BoardPoolRunner
+
+    config = AutojailConfig.construct(
+        login=AutojailLogin.validate("board0"),
+        reset_command=[],
+        start_command=[],
+        stop_command=[],
+        uart=None,
+    )
+    boards = [TargetBoard(login="board0"), TargetBoard(login="board1")]
+    tests = {
+        f"test{num}": test_model.TestEntry(script=[str(num)])
+        for num in range(3)
+    }
+    unblock = threading.Event()
+
+    def make_pool(hanging):
+        pool = BoardPoolRunner(
+            config,
+            None,
+            None,
+            test_model.TestConfig(__root__={}),
+            None,
+            boards,
+            timeout=1.0,
+        )
+        for runner in pool.runners:
+            login = str(runner.autojail_config.login)
+
+            def deploy(login=login):
+                if login in hanging:
+                    unblock.wait(60)
+
+            runner._prepare_tests = lambda: dict(tests)
+            runner._run_reset = lambda: None
+            runner._wait_for_connection = lambda: None
+            runner._deploy = deploy
+            runner._run_stop = lambda: None
+            runner._run_test = lambda test: test_runner.TestResult(passed=True)
+        return pool
+
+    try:
+        # The tests run on the other board
+        start = time.monotonic()
+        results = make_pool({"ssh:board0"}).run()
+        assert time.monotonic() - start < 2.0
+        assert all(result.passed for result in results.values())
+
+        # The run ends at its time limit if all boards hang
+        start = time.monotonic()
+        results = make_pool({"ssh:board0", "ssh:board1"}).run()
+        assert time.monotonic() - start < 2.0
+        assert list(results) == list(tests)
+        assert not any(result.passed for result in results.values())
+    finally:
+        unblock.set()
+
+    # The console of the project is only opened for its own board
+    pool = BoardPoolRunner(
+        config.copy(update={"uart": "/dev/ttyUSB0"}),
+        None,
+        None,
+        test_model.TestConfig(__root__={}),
+        None,
+        boards + [TargetBoard(login="board2", uart="/dev/ttyUSB2")],
+    )
+    assert [runner.autojail_config.uart for runner in pool.runners] == [
+        "/dev/ttyUSB0",
+        None,
+        "/dev/ttyUSB2",
+    ]
+
+
+def test_hung_test_recovery():
+    import threading
+
+    from autojail.model import AutojailConfig, AutojailLogin
+
+    tests = {
+        "before": test_model.TestEntry(script=["before"]),
+        "hangs": test_model.TestEntry(script=["hangs"], timeout=1),
+        "after": test_model.TestEntry(script=["after"]),
+    }
+    config = AutojailConfig.construct(
+        login=AutojailLogin.validate("board0"), uart=None
+    )
+    runner = test_runner.TestRunner(
+        config, None, None, test_model.TestConfig(__root__={}), None
+    )
+
+    resets = []
+    unblock = threading.Event()
+
+    def run_test(test):
+        if test.script == ["hangs"]:
+            unblock.wait(60)
+        return test_runner.TestResult(passed=True)
+
+    def wait_for_connection():
+        runner.connection = LocalConnection()
+
+    def recover_connection():
+        resets.append(time.monotonic())
+        if len(resets) > 1:
+            unblock.set()
+
+    runner._prepare_tests = lambda: dict(tests)
+    runner._run_reset = recover_connection
+    runner._wait_for_connection = wait_for_connection
+    runner._deploy = lambda: None
+    runner._run_stop = lambda: None
+    runner._run_test = run_test
+
+    start = time.monotonic()
+    results = runner.run()
+
+    assert time.monotonic() - start < 10
+    assert results["before"].passed
+    assert not results["hangs"].passed
+    assert results["after"].passed
+    assert len(resets) == 2
+
+    # Tests starting after the time limit of the run are skipped
+    resets.clear()
+    unblock.clear()
+    runner.timeout = 0.5
+    results = runner.run()
+    assert results["before"].passed
+    assert not results["hangs"].passed
+    assert not results["after"].passed
+
+
+def test_console_capture(tmp_path):
+    from autojail.test.console import ConsoleCapture
+
+    console = ConsoleCapture("loop://", log_path=tmp_path / "console.log")
+    console.start()
+    try:
+        console.mark("first")
+        console._port.write(b"Jailhouse booting\r\npartial")
+        console._port.write(b" line\n")
+        time.sleep(1.5)
+        console.mark("second")
+        console._port.write(b"Created cell\n")
+        time.sleep(1.5)
+    finally:
+        console.stop()
+
+    assert console.section("first") == "Jailhouse booting\npartial line\n"
+    assert console.section("second") == "Created cell\n"
+    log = (tmp_path / "console.log").read_text()
+    assert "==> second <==" in log
+    assert re.search(r"^\[ *[0-9]+\.[0-9]{6}\] Created cell$", log, re.M)
+
+
+def test_boot_log():
+    from autojail.test.boot_log import BootLog
+
+    lines = [
+        (0.0, "Booting Linux on physical CPU 0x0000000000 [0x410fd083]"),
+        (10.0, "Initializing Jailhouse hypervisor v0.12 on CPU 2"),
+        (10.1, "Initializing processors:"),
+        (10.25, "Activating hypervisor"),
+        (12.0, 'Created cell "Guest Linux"'),
+        (12.5, 'Cell "Guest Linux" can be loaded'),
+        (14.0, 'Started cell "Guest Linux"'),
+        (14.5, "[    0.000000] Booting Linux on physical CPU 0x0000000002"),
+        (16.0, "[    1.500000] Run /sbin/init as init process"),
+        (18.0, "guest login: "),
+    ]
+
+    metrics = BootLog(lines).metrics()
+    assert metrics == pytest.approx(
+        {
+            "hypervisor_enable_time": 250.0,
+            "guest_linux_setup_time": 500.0,
+            "guest_linux_load_time": 1500.0,
+            "guest_linux_kernel_start_time": 500.0,
+            "guest_linux_kernel_boot_time": 1500.0,
+            "guest_linux_userspace_boot_time": 2000.0,
+            "guest_linux_boot_time": 4000.0,
+        }
+    )
+
+
+def test_cell_stats():
+    from autojail.test.cell_stats import CellStats
+    from autojail.test.metrics import MetricStream
+
+    lines = [
+        "before\t100.0\tRoot Cell\t0\tvmexits_mmio\t10",
+        "before\t100.0\tRoot Cell\t1\tvmexits_mmio\t20",
+        "before\t100.0\tGuest Linux\t2\tvmexits_hypercall\t5",
+        "after\t110.0\tRoot Cell\t0\tvmexits_mmio\t110",
+        "after\t110.0\tRoot Cell\t1\tvmexits_mmio\t70",
+        "after\t110.0\tGuest Linux\t2\tvmexits_hypercall\t5",
+    ]
+    assert CellStats(lines).rates() == {
+        "root_cell_cpu0_vmexits_mmio_rate": 10.0,
+        "root_cell_cpu1_vmexits_mmio_rate": 5.0,
+        "root_cell_vmexits_mmio_rate": 15.0,
+        "guest_linux_cpu2_vmexits_hypercall_rate": 0.0,
+        "guest_linux_vmexits_hypercall_rate": 0.0,
+    }
+    assert CellStats(lines[:3]).rates() == {}
+
+    stream = MetricStream(
+        check={},
+        log={"/tmp/out": [r"Max: (?P<max_latency>[0-9]+)"]},
+        cell_stats=["/tmp/stats"],
+    )
+    stream.feed("/tmp/out", "Max: 12\n")
+    stream.feed("/tmp/stats", "\n".join(lines) + "\n")
+    stream.close()
+    frame = stream.to_frame()
+    assert frame["max_latency"][0] == 12
+    assert frame["root_cell_vmexits_mmio_rate"][1] == 15.0
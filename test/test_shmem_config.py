@@ -1,8 +1,10 @@
 import os.path
 
+import pytest
 import yaml
 
-from autojail.model import ShmemConfig
+from autojail.config.shmem import check_ivshmem_net_sizes, ivshmem_net_queue
+from autojail.model import ShmemConfig, ShMemNetRegion
 
 test_data_folder = os.path.join(os.path.dirname(__file__), "test_data")
 
@@ -16,3 +18,39 @@ def test_shmem_config_yaml():
         assert shmem_model.protocol == "SHMEM_PROTO_UNDEFINED"
         assert "root" in shmem_model.peers
         assert shmem_model.common_output_region_size == 0x9000
+
+
+def test_ivshmem_net_queue():
+    # 4 KiB output regions only fit the shortest queues
+    assert ivshmem_net_queue(0x1000) == (32, 0x700)
+    # Output regions of JAILHOUSE_SHMEM_NET_REGIONS
+    assert ivshmem_net_queue(0x7F000) == (2048, 0xD080)
+
+
+def test_check_ivshmem_net_sizes():
+    check_ivshmem_net_sizes("net", 0x1000, 0, 0x1000, 0x1000)
+    check_ivshmem_net_sizes("net", 0x1000, 0x1FF000, 0x200000, 0x1000)
+
+    with pytest.raises(Exception, match="page size"):
+        check_ivshmem_net_sizes("net", 0x1000, 0, 0x1800, 0x1000)
+
+    with pytest.raises(Exception, match="state table"):
+        check_ivshmem_net_sizes("net", 0, 0, 0x1000, 0x1000)
+
+    with pytest.raises(Exception, match="too small"):
+        check_ivshmem_net_sizes("net", 0x100, 0, 0x100, 0x100)
+
+
+def test_shmem_net_region_sizes():
+    region = ShMemNetRegion(start_addr=0x40000000, device_id=1)
+    assert region.size == 0xFF000
+
+    region = ShMemNetRegion(
+        start_addr=0x40000000, device_id=1, output_size=0x200000
+    )
+    assert region.size == 0x401000
+    regions = region.regions()
+    assert [r.size for r in regions] == [0x1000, 0, 0x200000, 0x200000]
+    assert regions[3].physical_start_addr == 0x40201000
+    assert "MEM_WRITE" in regions[3].flags
+    assert "MEM_WRITE" not in regions[2].flags
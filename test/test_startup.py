@@ -0,0 +1,46 @@
+import os.path
+import subprocess
+import sys
+
+import autojail
+
+# Dependencies that must only be imported when a command actually runs
+HEAVY_MODULES = [
+    "automate",
+    "fabric",
+    "hannah_optimizer",
+    "mako",
+    "numpy",
+    "ortools",
+    "pandas",
+    "paramiko",
+    "rich",
+]
+
+
+def test_import_time():
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import autojail.main"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        cwd=os.path.dirname(os.path.dirname(autojail.__file__)),
+        check=True,
+    )
+
+    imports = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _self_time, cumulative_time, module = line[12:].split("|")
+        imports.append((int(cumulative_time), module.strip()))
+
+    loaded = {module for _time, module in imports}
+    slowest = ", ".join(
+        f"{module}: {time / 1000:.1f}ms"
+        for time, module in sorted(imports, reverse=True)[:10]
+    )
+    for module in HEAVY_MODULES:
+        assert (
+            module not in loaded
+        ), f"{module} imported on start-up ({slowest})"
@@ -0,0 +1,116 @@
+import subprocess
+
+import pytest
+
+from autojail.config.startup import GenerateStartupPass, startup_stages
+from autojail.model import AutojailConfig, Board, CellConfig, JailhouseConfig
+
+
+def make_config(**start_after):
+    cells = {"root": CellConfig.construct(type="root", name="Root")}
+    for name in ["a", "b", "c"]:
+        cells[name] = CellConfig.construct(
+            type="bare",
+            name=name,
+            image=f"{name}.bin",
+            start_after=start_after.get(name, []),
+        )
+    return JailhouseConfig.construct(cells=cells)
+
+
+def test_startup_stages():
+    assert startup_stages(make_config()) == [["a", "b", "c"]]
+    assert startup_stages(make_config(a=["root"], c=["a", "b"])) == [
+        ["a", "b"],
+        ["c"],
+    ]
+    assert startup_stages(make_config(a=["b"], b=["c"])) == [
+        ["c"],
+        ["b"],
+        ["a"],
+    ]
+
+    with pytest.raises(Exception, match="Cyclic"):
+        startup_stages(make_config(a=["b"], b=["a"]))
+
+    with pytest.raises(Exception, match="unknown"):
+        startup_stages(make_config(a=["d"]))
+
+
+def run_enable(tmp_path, config):
+    startup_pass = GenerateStartupPass(
+        AutojailConfig.construct(deploy_dir=str(tmp_path / "deploy"))
+    )
+    startup_pass(Board.construct(interrupt_stats={}), config)
+    script = (
+        tmp_path / "deploy" / "etc" / "jailhouse" / "enable.sh"
+    ).read_text()
+
+    # Replace the jailhouse tools by a command logging its arguments
+    log = tmp_path / "jailhouse.log"
+    fake = tmp_path / "fake.sh"
+    fake.write_text(
+        f'#!/bin/sh\necho "$@" >> {log}\nsleep 0.1\n'
+        'case "$*" in *c.bin*) exit 1;; esac\n'
+    )
+    fake.chmod(0o755)
+    script = (
+        script.replace("/usr/sbin/jailhouse", str(fake))
+        .replace(" jailhouse cell create", f" {fake} cell create")
+        .replace("modprobe", str(fake))
+        .replace("cat ", "true ")
+        .replace("/proc/", f"{tmp_path}/proc/")
+    )
+    enable = tmp_path / "enable.sh"
+    enable.write_text(script)
+    enable.chmod(0o755)
+
+    ret = subprocess.run([str(enable), "start"])
+    return ret.returncode, log.read_text().splitlines()
+
+
+def test_parallel_startup(tmp_path):
+    config = make_config(b=["a"])
+    config.cells["c"].image = None
+
+    ret, log = run_enable(tmp_path, config)
+    assert ret == 0
+    assert log[0] == "jailhouse"
+    assert log[1].startswith("enable")
+    # b is started after a, c is started concurrently with a
+    assert log.index("cell start --name a") < log.index(
+        "cell create /etc/jailhouse/b.cell"
+    )
+    assert log.index("cell create /etc/jailhouse/c.cell") < log.index(
+        "cell start --name a"
+    )
+
+
+def test_parallel_startup_failure(tmp_path):
+    ret, log = run_enable(tmp_path, make_config(b=["c"]))
+    assert ret != 0
+    assert "cell load --name c /usr/share/jailhouse/c.bin" in log
+    # b is not started after c has failed
+    assert "cell create /etc/jailhouse/b.cell" not in log
+
+
+def test_irq_affinity(tmp_path):
+    config = make_config()
+    config.cells["c"].image = None
+    config.cells["root"].irq_affinity = {40: [0], 48: [1]}
+
+    # Linux irq numbers differ from the GIC interrupt numbers
+    proc = tmp_path / "proc"
+    (proc / "irq" / "17").mkdir(parents=True)
+    (proc / "interrupts").write_text(
+        "           CPU0       CPU1\n"
+        " 11:        100        200     GICv2  30 Level     arch_timer\n"
+        " 17:          5          0     GICv2  40 Level     eth0\n"
+        "IPI0:         1          1       Rescheduling interrupts\n"
+    )
+
+    ret, _log = run_enable(tmp_path, config)
+    assert ret == 0
+    assert (proc / "irq" / "17" / "smp_affinity").read_text() == "1\n"
+    # Interrupts without a Linux irq are skipped
+    assert sorted(path.name for path in (proc / "irq").iterdir()) == ["17"]
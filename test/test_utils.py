@@ -1,6 +1,13 @@
+import os.path
+import shutil
+
 import pytest
 
+from autojail.model import Board
 from autojail.utils import SortedCollection, get_overlap, remove_prefix
+from autojail.utils.model_cache import load_yaml_model
+
+test_data_folder = os.path.join(os.path.dirname(__file__), "test_data")
 
 
 @pytest.mark.parametrize(
@@ -75,3 +82,74 @@ def test_sorted_2():
 
     collection.insert((2, "a"))
     assert collection.index((2, "a")) == 3
+
+
+def test_load_yaml_model_cache(tmp_path):
+    board_yml = tmp_path / "board.yml"
+    shutil.copy(
+        os.path.join(test_data_folder, "rpi4_net", "board.yml"), board_yml
+    )
+    cache_file = tmp_path / ".board.yml.cache"
+
+    board = load_yaml_model(board_yml, Board)
+    assert cache_file.exists()
+
+    cached_board = load_yaml_model(board_yml, Board)
+    assert cached_board == board
+    assert cached_board.__fields_set__ == board.__fields_set__
+    assert cached_board.index.clock("osc") is not None
+
+    content = board_yml.read_text()
+    board_yml.write_text(
+        content.replace("name: rpi4_onlyroot", "name: changed", 1)
+    )
+    changed_board = load_yaml_model(board_yml, Board)
+    assert changed_board.name == "changed"
+
+
+def test_connection_pool(monkeypatch):
+    from autojail.model import AutojailConfig
+    from autojail.utils.connection import ConnectionPool, backoff_delays
+
+    class FakeConnection:
+        def __init__(self):
+            self.is_connected = True
+
+        def close(self):
+            self.is_connected = False
+
+    opened = []
+
+    def fake_open(config, context, passwd_retries, timeout_retries):
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    monkeypatch.setattr("autojail.utils.connection._open_connection", fake_open)
+
+    config = AutojailConfig(
+        name="test",
+        board="test",
+        login="ssh:pi@10.0.0.2",
+        arch="ARM64",
+        cross_compile="aarch64-linux-gnu-",
+        kernel_dir="kernel",
+        jailhouse_dir="jailhouse",
+    )
+    pool = ConnectionPool()
+
+    connection = pool.get(config, None)
+    assert pool.get(config, None) is connection
+    assert len(opened) == 1
+
+    # Connections lost e.g. by a board reset are reopened
+    connection.is_connected = False
+    reconnected = pool.get(config, None)
+    assert reconnected is not connection
+    assert len(opened) == 2
+
+    pool.close(config.login)
+    assert not reconnected.is_connected
+    pool.get(config, None)
+    assert len(opened) == 3
+
+    assert list(backoff_delays(7)) == [0.5, 1, 2, 4, 8, 16, 16]